@@ -1,16 +1,57 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
 from typing import Literal
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
-import io
-from PIL import Image
-from pyrate.ui.renderer import render_frame_to_surface
-from pydantic import BaseModel
-import pygame
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, ValidationError
 
-from pyrate.engine.game import Game
+from pyrate.engine.events import EVENT_FIELDS, JsonLinesSink, event_to_dict
+from pyrate.engine.game import ACTIONS
+from pyrate.engine.replay import ReplayRecorder
+from pyrate.server.lockstep import StepRejected
+from pyrate.server.observations import etag_matches, tick_etag
+from pyrate.server.rooms import RoomLimitReached, RoomRegistry
+from pyrate.server.scheduler import SharedScheduler
+from pyrate.server.spectate import SpectatorEncoder
+from pyrate.server.stream import StreamSettings
+from pyrate.settings import (SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE, STREAM_FPS, STREAM_BUFFER_SIZE, SEED, EVENT_LOG_FILE, REPLAY_FILE,
+                             LONG_POLL_TIMEOUT, LOCKSTEP_TIMEOUT, MAX_MATCHES, MAX_ENEMIES, MATCH_TICK_BUDGET, STREAM_PRESETS,
+                             STREAM_DEFAULT_PRESET, SHARED_MEMORY, ASSETS_DIR)
 
-app = FastAPI()
-game = Game()
+# Routes without the /matches/{match_id} prefix address this match
+DEFAULT_MATCH = "default"
+
+registry = RoomRegistry(SharedScheduler(TICK_RATE, MATCH_TICK_BUDGET), MAX_MATCHES, STREAM_FPS, STREAM_BUFFER_SIZE,
+                        max_enemies=MAX_ENEMIES)
+registry.create(DEFAULT_MATCH, seed=SEED, shared_memory=SHARED_MEMORY)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Every match runs on its own clock, independently of video viewers
+    default = registry.get(DEFAULT_MATCH).game
+    if EVENT_LOG_FILE:
+        default.events.add_sink(JsonLinesSink(EVENT_LOG_FILE))
+    if REPLAY_FILE:
+        ReplayRecorder.attach(REPLAY_FILE, default)
+    registry.start()
+    yield
+    registry.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.mount("/assets", StaticFiles(directory=ASSETS_DIR), name="assets")  # sprites drawn by the spectator page
+router = APIRouter()  # per-match routes, mounted at / (default match) and /matches/{match_id}
+
+
+def get_room(match_id: str = DEFAULT_MATCH):
+    room = registry.get(match_id)
+    if room is None:
+        raise HTTPException(404, f"No match with id '{match_id}'")
+    return room
 
 
 class FireTimestamp(BaseModel):
@@ -36,97 +77,466 @@ class CommandResponse(BaseModel):
     status: str
 
 
+class PlayerCommand(Command):
+    player_id: int
+
+
+class BatchCommand(BaseModel):
+    commands: list[PlayerCommand]
+
+
+class BatchCommandResponse(BaseModel):
+    status: str
+    queued: int
+    tick: int
+
+
+class StepRequest(BaseModel):
+    player_id: int
+    commands: list[Command] = []
+
+
+class Observation(BaseModel):
+    tick: int
+    state: str
+    status: ShipStatus
+    nearby_ships: list[dict]
+
+
 class ControlMode(BaseModel):
     mode: str
 
 
+class PhaseTiming(BaseModel):
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class Metrics(BaseModel):
+    enabled: bool
+    tick: int
+    phases: dict[str, PhaseTiming]
+
+
+class MetricsControl(BaseModel):
+    enabled: bool
+
+
+class MatchConfig(BaseModel):
+    n_players: int = 4
+    n_enemies: int = 3
+    min_distance: float = 300
+    seed: int | None = None
+    lockstep: bool = False
+    agents: list[int] | None = None  # lockstep: players waited for every tick, all by default
+    step_timeout: float = LOCKSTEP_TIMEOUT
+    shared_memory: bool = False  # also publish the match to a shared-memory segment for local agents
+
+
+class MatchInfo(BaseModel):
+    id: str
+    tick: int
+    state: str
+    control_mode: str
+    lockstep: bool
+    shared_memory: str | None  # name of the segment for SharedMemoryAgent
+    n_players: int
+    n_enemies: int
+    seed: int | None
+    viewers: int
+    overruns: int
+    error: str | None  # why the match stopped ticking, after an error in its tick
+
+
+def _match_info(room):
+    game, view = room.game, room.scheduler.view
+    shared_memory = room.shared_memory.name if room.shared_memory is not None else None
+    return MatchInfo(id=room.id, tick=view.tick, state=view.state, control_mode=view.control_mode,
+                     lockstep=room.lockstep is not None, shared_memory=shared_memory,
+                     n_players=len(view.players), n_enemies=len(game.ships_by_uid) - len(view.players),
+                     seed=game.seed, viewers=room.producer.subscribers, overruns=room.scheduler.overruns,
+                     error=room.scheduler.error)
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the PyRate API!"}
 
 
-@app.get("/players/{player_id}/status", response_model=ShipStatus)
-def get_player_status(player_id: int):
-    """
-    Retrieve a single player ship's status by its index.
-    """
+@app.get("/spectate")
+def spectator_page():
+    """ Browser spectator drawing a match from /spectate/ws; pass ?match=<id> for another match than the default. """
+    return FileResponse(os.path.join(os.path.dirname(__file__), "web", "spectator.html"))
+
+
+@app.post("/matches", response_model=MatchInfo, status_code=201)
+def create_match(config: MatchConfig):
+    """ Start hosting a new match; its routes live under /matches/{id}/. """
     try:
-        p = game.player_ships[player_id]
-    except IndexError:
-        raise HTTPException(404, f"No player with id {player_id}")
-    
+        room = registry.create(n_players=config.n_players, n_enemies=config.n_enemies,
+                               min_distance=config.min_distance, seed=config.seed, lockstep=config.lockstep,
+                               agents=config.agents, step_timeout=config.step_timeout,
+                               shared_memory=config.shared_memory)
+    except RoomLimitReached as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return _match_info(room)
+
+
+@app.get("/matches", response_model=list[MatchInfo])
+def list_matches():
+    return [_match_info(room) for room in registry.list()]
+
+
+@app.get("/matches/{match_id}", response_model=MatchInfo)
+def get_match(match_id: str):
+    return _match_info(get_room(match_id))
+
+
+@app.delete("/matches/{match_id}", status_code=204)
+def delete_match(match_id: str):
+    """ Stop a match and close its streams, agent channels and logs. """
+    if match_id == DEFAULT_MATCH:
+        raise HTTPException(400, "The default match cannot be deleted")
+    try:
+        registry.delete(match_id)
+    except KeyError:
+        raise HTTPException(404, f"No match with id '{match_id}'")
+    return Response(status_code=204)
+
+
+def _ship_status(p):
+    """ Status of a ShipView. """
+    left, right = p.last_fire_time
     return ShipStatus(
-        angle=p.angle, 
+        angle=p.angle,
         rotation_velocity=p.rotation_velocity,
         speed=p.speed,
         health=p.health,
         is_living=p.is_living,
-        last_fire_time=p.last_fire_time
+        last_fire_time=FireTimestamp(left=left, right=right)
     )
 
 
-@app.get("/players/{player_id}/sensor")
-def get_sensor_status(player_id: int):
+def _player_observation(room, player_id):
+    """
+    Tick, state, status and sensor reading of a player, as pushed to agents.
+    It reads the Game holding the tick lock: call it in a worker thread.
+    """
+    game, scheduler = room.game, room.scheduler
+    with scheduler.lock:
+        view = scheduler.view
+        return {
+            "tick": view.tick,
+            "state": view.state,
+            "status": _ship_status(view.players[player_id]).model_dump(),
+            "nearby_ships": game.get_ship_sensor(game.player_ships[player_id]),
+        }
+
+
+async def _wait_for_tick(room, after_tick):
+    """ Long-poll: return once the game is past `after_tick`, has ended, or LONG_POLL_TIMEOUT has passed. """
+    scheduler = room.scheduler
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LONG_POLL_TIMEOUT
+    while (scheduler.view.tick <= after_tick and scheduler.view.state == "playing"
+           and registry.get(room.id) is room):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        try:
+            await asyncio.wait_for(room.scheduler.next_tick(), remaining)
+        except asyncio.TimeoutError:
+            return
+
+
+def _build_locked(room, build):
+    """ (view, build(view)) of the tick published now, holding the tick lock; call it in a worker thread. """
+    with room.scheduler.lock:
+        view = room.scheduler.view
+        return view, build(view)
+
+
+async def _observation(room, kind, player_id, after_tick, if_none_match, build, needs_game=False):
+    """
+    Response with a player's observation of the last tick, serialized once per tick
+    by `build(view)` -> bytes, its tick as ETag, or 304 when the client already has it.
+    Builds reading the Game itself (`needs_game`) run in a worker thread holding the
+    tick lock, so the event loop never waits for a tick to end.
+    """
+    if after_tick is not None:
+        await _wait_for_tick(room, after_tick)
+    view = room.scheduler.view
+    if not 0 <= player_id < len(view.players):
+        raise HTTPException(404, f"No player with id {player_id}")
+    etag = tick_etag(view.tick)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    body = room.observations.get(view.tick, kind, player_id)
+    if body is None:
+        if needs_game:
+            view, body = await asyncio.to_thread(_build_locked, room, build)
+            etag = tick_etag(view.tick)
+        else:
+            body = build(view)
+        room.observations.put(view.tick, kind, player_id, body)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/players/{player_id}/status", response_model=ShipStatus)
+async def get_player_status(player_id: int, after_tick: int | None = None,
+                            if_none_match: str | None = Header(None), room=Depends(get_room)):
+    """
+    Retrieve a single player ship's status by its index.
+    The ETag is the tick; pass `after_tick` to wait for a newer one.
+    """
+    return await _observation(room, "status", player_id, after_tick, if_none_match,
+                              lambda view: _ship_status(view.players[player_id]).model_dump_json().encode())
+
+
+@router.get("/players/{player_id}/sensor")
+async def get_sensor_status(player_id: int, after_tick: int | None = None,
+                            if_none_match: str | None = Header(None), room=Depends(get_room)):
     """
     Retrieve the list of enemy ship statuses.
+    The ETag is the tick; pass `after_tick` to wait for a newer one.
+    """
+    game = room.game
+    return await _observation(room, "sensor", player_id, after_tick, if_none_match,
+                              lambda view: json.dumps({"nearby_ships": game.get_ship_sensor(game.player_ships[player_id])}).encode(),
+                              needs_game=True)
+
+
+@router.websocket("/players/{player_id}/ws")
+async def player_channel(websocket: WebSocket, player_id: int, match_id: str = DEFAULT_MATCH):
     """
+    Persistent agent channel: pushes the player's status and sensor reading
+    after every tick, and accepts commands (one object or a list) on the same socket.
+    """
+    room = registry.get(match_id)
+    if room is None:
+        await websocket.close(code=4404, reason=f"No match with id '{match_id}'")
+        return
+    scheduler = room.scheduler
+    if not 0 <= player_id < len(scheduler.view.players):
+        await websocket.close(code=4404, reason=f"No player with id {player_id}")
+        return
+
+    await websocket.accept()
+    receiver = asyncio.create_task(_receive_commands(websocket, room, player_id))
+    last_tick = None
     try:
-        p = game.player_ships[player_id]
-    except IndexError:
-        raise HTTPException(404, f"No player with id {player_id}")
-    return {"nearby_ships": game.get_ship_sensor(p)}
+        while not receiver.done():
+            if registry.get(match_id) is not room:
+                await websocket.close(code=4410, reason="Match deleted")
+                break
+            if scheduler.view.tick != last_tick:
+                observation = await asyncio.to_thread(_player_observation, room, player_id)
+                last_tick = observation["tick"]
+                await websocket.send_json(observation)
+            try:
+                await asyncio.wait_for(scheduler.next_tick(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
 
 
-@app.post("/players/{player_id}/command", response_model=CommandResponse)
-def command_player(player_id: int, cmd: Command):
+@router.websocket("/spectate/ws")
+async def spectator_channel(websocket: WebSocket, match_id: str = DEFAULT_MATCH):
     """
-    Issue a command to control a specific player ship.
+    Spectator channel: the match state as a compact binary message after every
+    tick (see pyrate/server/spectate.py), drawn by the browser instead of the server.
+    A slow spectator skips ticks.
     """
+    room = registry.get(match_id)
+    if room is None:
+        await websocket.close(code=4404, reason=f"No match with id '{match_id}'")
+        return
+
+    await websocket.accept()
+    scheduler = room.scheduler
+    encoder = SpectatorEncoder((SCREEN_WIDTH, SCREEN_HEIGHT))
+    last_tick = None
     try:
-        ship = game.player_ships[player_id]
-    except IndexError:
-        raise HTTPException(404, f"No player with id {player_id}")
+        while True:
+            if registry.get(match_id) is not room:
+                await websocket.close(code=4410, reason="Match deleted")
+                break
+            view = scheduler.view
+            if view.tick != last_tick:
+                last_tick = view.tick
+                await websocket.send_bytes(encoder.encode(view))
+            try:
+                await asyncio.wait_for(scheduler.next_tick(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+    except WebSocketDisconnect:
+        pass
+
+
+async def _receive_commands(websocket, room, player_id):
+    """ Queue every command received on an agent channel until the client disconnects. """
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                commands = [Command.model_validate(c)
+                            for c in (message if isinstance(message, list) else [message])]
+            except (ValueError, ValidationError) as e:
+                await websocket.send_json({"error": f"Invalid command: {e}"})
+                continue
+
+            actions = [cmd.action.lower() for cmd in commands]
+            unknown = [action for action in actions if action not in ACTIONS]
+            if unknown:
+                await websocket.send_json({"error": f"Unknown command '{unknown[0]}'"})
+                continue
 
+            room.commands.put([(player_id, action, cmd.side) for cmd, action in zip(commands, actions)])
+    except WebSocketDisconnect:
+        pass
+
+
+@router.post("/players/{player_id}/command", response_model=CommandResponse)
+async def command_player(player_id: int, cmd: Command, room=Depends(get_room)):
+    """
+    Issue a command to control a specific player ship.
+    The command is queued and applied at the start of the next tick.
+    """
     action = cmd.action.lower()
-    if action == "accelerate":
-        ship.accelerate()
-    elif action == "decelerate":
-        ship.decelerate()
-    elif action == "turn_left":
-        ship.turn_left()
-    elif action == "turn_right":
-        ship.turn_right()
-    elif action == "fire":
-        ship.fire(cmd.side)
-    else:
+    if action not in ACTIONS:
         raise HTTPException(400, "Unknown command")
+    if not 0 <= player_id < len(room.scheduler.view.players):
+        raise HTTPException(404, f"No player with id {player_id}")
+    room.commands.put([(player_id, action, cmd.side)])
 
     return CommandResponse(status="ok")
 
 
-@app.get("/video/stream")
-def stream_video():
-    def generate():
-        clock = pygame.time.Clock()
-        while True:
-            surface = render_frame_to_surface(game)
-            raw_str = pygame.image.tostring(surface, "RGB")
-            img = Image.frombytes("RGB", surface.get_size(), raw_str)
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG")
+@router.post("/players/commands", response_model=BatchCommandResponse)
+async def command_players(batch: BatchCommand, room=Depends(get_room)):
+    """
+    Queue several commands, for one or more player ships, in a single request.
+    The batch is validated as a whole: either every command is queued or none is.
+    """
+    actions = [cmd.action.lower() for cmd in batch.commands]
+    for action in actions:
+        if action not in ACTIONS:
+            raise HTTPException(400, f"Unknown command '{action}'")
+
+    n_players = len(room.scheduler.view.players)
+    for cmd in batch.commands:
+        if not 0 <= cmd.player_id < n_players:
+            raise HTTPException(404, f"No player with id {cmd.player_id}")
+    next_tick = room.commands.put([(cmd.player_id, action, cmd.side) for cmd, action in zip(batch.commands, actions)])
+
+    return BatchCommandResponse(status="ok", queued=len(actions), tick=next_tick)
+
+
+@router.post("/game/update", response_model=Observation)
+async def step_game(step: StepRequest, room=Depends(get_room)):
+    """
+    Lockstep matches only: submit a player's commands for the next tick, wait until
+    every agent of the match has too (or its step timeout passes) and the tick has run,
+    and get the player's observation of the new tick.
+    """
+    if room.lockstep is None:
+        raise HTTPException(409, "Not a lockstep match, see POST /matches")
+    actions = [cmd.action.lower() for cmd in step.commands]
+    for action in actions:
+        if action not in ACTIONS:
+            raise HTTPException(400, f"Unknown command '{action}'")
+    if not 0 <= step.player_id < len(room.scheduler.view.players):
+        raise HTTPException(404, f"No player with id {step.player_id}")
+    try:
+        await room.lockstep.submit(step.player_id, [(action, cmd.side) for cmd, action in zip(step.commands, actions)])
+    except StepRejected as e:
+        raise HTTPException(409, str(e))
+    return await asyncio.to_thread(_player_observation, room, step.player_id)
+
+
+@router.get("/video/stream")
+async def stream_video(room=Depends(get_room),
+                 preset: str = STREAM_DEFAULT_PRESET,
+                 scale: float | None = Query(None, gt=0, le=1),
+                 quality: int | None = Query(None, ge=1, le=95),
+                 fps: float | None = Query(None, gt=0)):
+    if preset not in STREAM_PRESETS:
+        raise HTTPException(400, f"preset must be one of {list(STREAM_PRESETS)}")
+    settings = StreamSettings(*STREAM_PRESETS[preset])
+    settings = StreamSettings(scale or settings.scale, quality or settings.quality, fps or settings.fps)
+    producer = room.producer
+
+    async def generate():
+        # Frames are rendered and encoded once per scale and quality by the
+        # match's producer thread; each viewer only forwards the newest one
+        async for jpeg in producer.view(settings):
             yield (
                 b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n" + buf.getvalue() + b"\r\n"
+                b"Content-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
             )
-            # NOTE: Can be lowered to reduce load on the server
-            clock.tick(30) # Video stream frate rate
     return StreamingResponse(generate(),
         media_type="multipart/x-mixed-replace; boundary=frame")
 
 
-@app.post("/game/control")
-def set_control_mode(cm: ControlMode):
+@router.post("/game/control")
+async def set_control_mode(cm: ControlMode, room=Depends(get_room)):
     if cm.mode not in ("keyboard", "api"):
         raise HTTPException(400, "mode must be 'keyboard' or 'api'")
-    game.control_mode = cm.mode
+    def set_mode():
+        with room.scheduler.lock:
+            room.game.control_mode = cm.mode
+            room.scheduler.publish()
+
+    await asyncio.to_thread(set_mode)
     return {"status": "ok", "mode": cm.mode}
+
+
+@router.get("/events")
+async def get_events(after: int = 0, kind: list[str] | None = Query(None), room=Depends(get_room)):
+    """
+    Game events (hits, misses, collisions, destructions, state changes) newer
+    than sequence number `after`, from the in-memory ring buffer.
+    Pass the returned `last_seq` as `after` to poll for the next ones.
+    """
+    unknown = [k for k in kind or () if k not in EVENT_FIELDS]
+    if unknown:
+        raise HTTPException(400, f"Unknown event kind '{unknown[0]}'")
+    def read_events():
+        with room.scheduler.lock:
+            return room.game.events.since(after, set(kind) if kind else None), room.game.events.seq
+
+    events, last_seq = await asyncio.to_thread(read_events)
+    return {"last_seq": last_seq, "events": [event_to_dict(e) for e in events]}
+
+
+@router.get("/metrics", response_model=Metrics)
+async def get_metrics(room=Depends(get_room)):
+    """
+    Per-phase timings of the last ticks, rendered frames and encoded frames.
+    Empty unless profiling is enabled (PROFILING setting or POST /metrics).
+    """
+    profiler = room.game.profiler
+    return Metrics(enabled=profiler.enabled, tick=room.scheduler.view.tick, phases=profiler.summary())
+
+
+@router.post("/metrics", response_model=Metrics)
+async def set_metrics(control: MetricsControl, room=Depends(get_room)):
+    """ Turn profiling on (starting from an empty window) or off. """
+    if control.enabled:
+        room.game.profiler.enable()
+    else:
+        room.game.profiler.disable()
+    return await get_metrics(room)
+
+
+app.include_router(router)
+app.include_router(router, prefix="/matches/{match_id}")
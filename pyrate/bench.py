@@ -0,0 +1,403 @@
+# pyrate/bench.py
+"""
+Reproducible benchmarks of the engine, sensors, renderer and API.
+
+Every benchmark starts from a seeded Game and plays seeded actions, so two
+runs on the same machine measure the same work. Results are saved as JSON
+with the machine they ran on. Pass an earlier results file to --compare to
+check for regressions: a result worse than it by more than the threshold
+is one, and the exit status is then 1. Timings only compare on the same
+machine, so results from another machine or library versions are refused.
+
+    python -m pyrate.bench --output before.json             # everything
+    python -m pyrate.bench --only engine sensors --quick
+    python -m pyrate.bench --compare before.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # the renderer opens a display
+
+import numpy as np
+
+from pyrate.engine.game import Game, sat_mtv
+from pyrate.engine.input import ACTIONS
+from pyrate.engine.profiler import _percentile
+
+FORMAT_VERSION = 1
+THRESHOLD = 0.10  # relative slowdown reported as a regression
+
+ENGINE_PLAYERS = (2, 4, 6)
+ENGINE_ENEMIES = (3, 30, 100)
+ENGINE_PROJECTILES = (0, 200)  # cannonballs kept in flight
+
+GROUPS = ("engine", "collisions", "sensors", "render", "api")
+
+# One measurement: `higher` tells whether a larger value is better (rates) or worse (times)
+BenchResult = namedtuple("BenchResult", "name value unit higher")
+
+
+@contextmanager
+def _no_gc():
+    """ Time without the garbage collector kicking in halfway, like timeit. """
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _per_call_us(function, calls, repeat):
+    """
+    Time of one call in microseconds, from the fastest of `repeat` runs: as timeit advises,
+    slower runs of a tight loop measure the rest of the machine rather than the code.
+    """
+    runs = []
+    for _ in range(repeat):
+        with _no_gc():
+            start = time.perf_counter()
+            for _ in range(calls):
+                function()
+            runs.append((time.perf_counter() - start) / calls * 1e6)
+    return min(runs)
+
+
+def _random_actions(game, rng):
+    """ Queue random actions for the living players, like the random tournament policy. """
+    for player_id, ship in enumerate(game.player_ships):
+        if ship.is_living and rng.random() < 0.5:
+            game.queue_action(player_id, rng.choice(ACTIONS), rng.choice(("left", "right")))
+
+
+def _keep_projectiles(game, count, rng):
+    """ Spawn harmless cannonballs until `count` are in flight. """
+    pool = game.projectiles
+    for _ in range(count - len(pool)):
+        pool.spawn(rng.uniform(0, 1280), rng.uniform(0, 720), rng.uniform(0, 360), damage=0)
+
+
+def _setup_game(n_players, n_enemies, seed=0, warmup=30):
+    game = Game(n_players, n_enemies, min_distance=300 if n_enemies <= 3 else 40, seed=seed)
+    game.control_mode = "api"
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        _random_actions(game, rng)
+        game.update()
+    return game
+
+
+# -- Benchmarks ----------------------------------------------------------------
+# Each one yields BenchResults; `quick` trades accuracy for time.
+
+def bench_engine(repeat, quick):
+    """ Game.update() ticks per second across player, enemy and cannonball counts. """
+    ticks = 60 if quick else 300
+    for n_players, n_enemies, n_projectiles in itertools.product(ENGINE_PLAYERS, ENGINE_ENEMIES, ENGINE_PROJECTILES):
+        game = _setup_game(n_players, n_enemies)
+        start = game.snapshot()
+        rates = []
+        for _ in range(repeat):
+            game.restore(start)
+            rng = random.Random(1)
+            elapsed, played = 0.0, 0
+            with _no_gc():
+                for _ in range(ticks):
+                    _random_actions(game, rng)
+                    _keep_projectiles(game, n_projectiles, rng)
+                    t = time.perf_counter()
+                    game.update()
+                    elapsed += time.perf_counter() - t
+                    played += 1
+                    if game.state != "playing":
+                        break  # later ticks would return at once
+            rates.append(played / elapsed)
+        yield BenchResult(f"engine.update[players={n_players},enemies={n_enemies},projectiles={n_projectiles}]",
+                          statistics.median(rates), "ticks/s", True)
+
+
+def bench_collisions(repeat, quick):
+    """ Ship hitbox tests of the collision phase: Game.collide and sat_mtv, overlapping or not. """
+    calls = 2000 if quick else 20000
+    game = _setup_game(2, 0, warmup=0)
+    a, b = game.player_ships
+    b.x, b.y, b.angle = a.x + 60, a.y + 10, a.angle + 30  # overlapping
+    overlapping = (a.get_hitbox(), b.get_hitbox())
+    yield BenchResult("collisions.collide[overlap]", _per_call_us(lambda: game.collide(a, b), calls, repeat), "us", False)
+    yield BenchResult("collisions.sat_mtv[overlap]", _per_call_us(lambda: sat_mtv(*overlapping), calls, repeat), "us", False)
+    b.x = a.x + 300
+    separated = (a.get_hitbox(), b.get_hitbox())
+    yield BenchResult("collisions.collide[apart]", _per_call_us(lambda: game.collide(a, b), calls, repeat), "us", False)
+    yield BenchResult("collisions.sat_mtv[apart]", _per_call_us(lambda: sat_mtv(*separated), calls, repeat), "us", False)
+
+
+def bench_sensors(repeat, quick):
+    """ get_ship_sensor(): every player's reading of a new tick, then a reading served from the tick's cache. """
+    calls = 200 if quick else 2000
+    for n_enemies in (3, 30):
+        game = _setup_game(4, n_enemies)
+
+        def new_tick():
+            game.sensors.invalidate()
+            for ship in game.player_ships:
+                game.get_ship_sensor(ship)
+
+        ship = game.player_ships[0]
+        yield BenchResult(f"sensors.new_tick[players=4,enemies={n_enemies}]",
+                          _per_call_us(new_tick, calls, repeat), "us", False)
+        yield BenchResult(f"sensors.cached[players=4,enemies={n_enemies}]",
+                          _per_call_us(lambda: game.get_ship_sensor(ship), calls * 10, repeat), "us", False)
+
+
+def bench_render(repeat, quick):
+    """ Frames per second of FrameRenderer, render_frame_to_surface and the stream's JPEG encoding. """
+    import pygame
+    from PIL import Image
+    from pyrate.ui.renderer import FrameRenderer, render_frame_to_surface
+
+    frames = 30 if quick else 120
+    game = _setup_game(4, 30)
+    rng = random.Random(1)
+    views = []
+    for _ in range(frames):
+        _random_actions(game, rng)
+        game.update()
+        views.append(game.view(sensors=True))
+
+    def rate(draw):
+        runs = []
+        for _ in range(repeat):
+            with _no_gc():
+                start = time.perf_counter()
+                for k in range(frames):
+                    draw(k)
+                runs.append(frames / (time.perf_counter() - start))
+        return statistics.median(runs)
+
+    def incremental(k):
+        if k == 0:
+            renderer.invalidate()
+        renderer.render(views[k])
+
+    renderer = FrameRenderer()
+    yield BenchResult("render.frame_renderer[enemies=30]", rate(incremental), "frames/s", True)
+    yield BenchResult("render.frame_to_surface[enemies=30]", rate(lambda k: render_frame_to_surface(game)), "frames/s", True)
+
+    surface = renderer.render(views[-1])
+
+    def encode(k):
+        image = Image.frombytes("RGB", surface.get_size(), pygame.image.tostring(surface, "RGB"))
+        image.save(io.BytesIO(), format="JPEG", quality=75)
+
+    yield BenchResult("render.jpeg_encode[quality=75]", rate(encode), "frames/s", True)
+
+
+async def _asgi_request(app, method, path, body=None):
+    """ Call an ASGI app in-process, without a server or socket; returns (status, body bytes). """
+    path, _, query = path.partition("?")
+    data = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(data)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    pending = [{"type": "http.request", "body": data, "more_body": False}]
+    response = {"status": None, "body": []}
+
+    async def receive():
+        return pending.pop() if pending else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+
+def bench_api(repeat, quick):
+    """
+    Latency of agent requests through the whole FastAPI app, in-process. The
+    match is ticked between requests (not by the server's clock), so every
+    observation is of a new tick, as for an agent polling once per tick.
+    """
+    from pyrate.api import app, registry
+
+    requests = 100 if quick else 500
+
+    async def run():
+        status, body = await _asgi_request(app, "POST", "/matches", {"n_players": 4, "n_enemies": 3, "seed": 0})
+        if status != 201:
+            raise RuntimeError(f"Could not create the benchmark match: {status} {body!r}")
+        match_id = json.loads(body)["id"]
+        match, room = f"/matches/{match_id}", registry.get(match_id)
+        await _asgi_request(app, "POST", f"{match}/game/control", {"mode": "api"})
+        calls = {
+            "status": ("GET", f"{match}/players/0/status", None),
+            "sensor": ("GET", f"{match}/players/0/sensor", None),
+            "command": ("POST", f"{match}/players/0/command", {"action": "accelerate", "side": "left"}),
+            "commands": ("POST", f"{match}/players/commands",
+                         {"commands": [{"player_id": p, "action": "turn_left", "side": "left"} for p in range(4)]}),
+        }
+        results = []
+        try:
+            for name, (method, path, body) in calls.items():
+                samples = []
+                for _ in range(repeat):
+                    with _no_gc():
+                        for _ in range(requests):
+                            room.scheduler.step()
+                            t = time.perf_counter()
+                            status, _ = await _asgi_request(app, method, path, body)
+                            samples.append((time.perf_counter() - t) * 1e3)
+                            if status != 200:
+                                raise RuntimeError(f"{method} {path} answered {status}")
+                samples.sort()
+                results.append(BenchResult(f"api.{name}[p50]", _percentile(samples, 50), "ms", False))
+                results.append(BenchResult(f"api.{name}[p99]", _percentile(samples, 99), "ms", False))
+        finally:
+            await _asgi_request(app, "DELETE", match)
+        return results
+
+    yield from asyncio.run(run())
+
+
+BENCHMARKS = {
+    "engine": bench_engine,
+    "collisions": bench_collisions,
+    "sensors": bench_sensors,
+    "render": bench_render,
+    "api": bench_api,
+}
+
+
+# -- Results -------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_metadata():
+    """ What a result depends on besides the code: machine, interpreter and library versions. """
+    import pygame
+    import PIL
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "pillow": PIL.__version__,
+        "commit": _git_commit(),
+    }
+
+
+def run(groups=GROUPS, repeat=5, quick=False, log=None):
+    """ Run the benchmark groups and return the results document (see FORMAT_VERSION). """
+    started = datetime.datetime.now(datetime.timezone.utc)
+    results = {}
+    for group in groups:
+        for result in BENCHMARKS[group](repeat, quick):
+            results[result.name] = {"value": result.value, "unit": result.unit, "higher_is_better": result.higher}
+            if log is not None:
+                log(f"{result.name:<58} {result.value:>12.3f} {result.unit}")
+    return {
+        "version": FORMAT_VERSION,
+        "created": started.isoformat(timespec="seconds"),
+        "duration_s": round((datetime.datetime.now(datetime.timezone.utc) - started).total_seconds(), 1),
+        "config": {"groups": list(groups), "repeat": repeat, "quick": quick},
+        "machine": machine_metadata(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """
+    [(name, change, regressed)] for the results present in both documents; `change` is the
+    relative improvement (positive) or slowdown (negative) against the baseline.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        if result["higher_is_better"]:
+            change = result["value"] / reference["value"] - 1
+        else:
+            change = reference["value"] / result["value"] - 1 if result["value"] else float("inf")
+        rows.append((name, change, change < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the PyRate benchmarks and compare them with a baseline.")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS), help="benchmark groups to run")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs of each benchmark, the median (the fastest for per-call timings) is kept")
+    parser.add_argument("--quick", action="store_true", help="shorter runs, for a smoke test")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare with the results in this JSON file, measured on the same machine")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="relative slowdown against the compared results counted as a regression")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # checked before running: other hardware or library versions make every timing differ
+        machine = machine_metadata()
+        differences = [key for key, value in machine.items()
+                       if key != "commit" and baseline["machine"].get(key) != value]
+        if differences:
+            print(f"Not comparing with {args.compare}: measured with another {', '.join(differences)}", file=sys.stderr)
+            return 2
+
+    results = run(args.only, args.repeat, args.quick, log=print)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline is None:
+        return 0
+    if baseline["config"]["quick"] != results["config"]["quick"]:
+        print("Warning: only one of the compared runs used --quick, their runs differ in length")
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nAgainst {args.compare} (regression: slower by more than {args.threshold:.0%})")
+    for name, change, regressed in rows:
+        print(f"{name:<58} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    regressions = sum(regressed for _, _, regressed in rows)
+    print(f"{regressions} regression(s) out of {len(rows)} results")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
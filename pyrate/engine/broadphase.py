@@ -0,0 +1,76 @@
+# pyrate/engine/broadphase.py
+from collections import defaultdict
+
+# Boxes closer than this are kept as candidates, so float rounding never hides a contact from SAT
+AABB_MARGIN = 1e-6
+
+
+def aabb(points):
+    """ Axis-aligned bounding box (min_x, min_y, max_x, max_y) of a polygon. """
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def aabb_overlap(a, b, margin=AABB_MARGIN):
+    """ False only when the boxes are separated by more than `margin`. """
+    return not (a[2] + margin < b[0] or b[2] + margin < a[0] or
+                a[3] + margin < b[1] or b[3] + margin < a[1])
+
+
+class SpatialHash:
+    """
+    Uniform grid bucketing items by the cells their bounding box covers.
+    Items only need to be hashable; boxes are (min_x, min_y, max_x, max_y).
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+
+    def _cells(self, box):
+        size = self.cell_size
+        min_x, min_y, max_x, max_y = box
+        for cx in range(int(min_x // size), int(max_x // size) + 1):
+            for cy in range(int(min_y // size), int(max_y // size) + 1):
+                yield cx, cy
+
+
+    def clear(self):
+        self.cells.clear()
+
+
+    def insert(self, item, box):
+        for cell in self._cells(box):
+            self.cells[cell].append(item)
+
+
+    def remove(self, item, box):
+        for cell in self._cells(box):
+            bucket = self.cells[cell]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[cell]
+
+
+    def query(self, box):
+        """ Items sharing at least one cell with `box`. """
+        found = set()
+        for cell in self._cells(box):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+
+    def pairs(self):
+        """ Every (a, b) with a < b of items sharing at least one cell. """
+        found = set()
+        for bucket in self.cells.values():
+            if len(bucket) < 2:
+                continue
+            for k, a in enumerate(bucket):
+                for b in bucket[k + 1:]:
+                    found.add((a, b) if a < b else (b, a))
+        return found
@@ -0,0 +1,220 @@
+# pyrate/engine/enemy_ai.py
+import math
+from operator import attrgetter
+
+import numpy as np
+
+from pyrate.engine.entities.ship import Ship
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_AI_LOD_INTERVAL, ENEMY_AI_LOD_DISTANCE
+
+EDGE_MARGIN = 60  # enemies closer than this to a border head back to the center (EnemyShip.plan)
+SCALAR_MAX_ENEMIES = 24  # up to this many enemies the per-ship loop is faster than array set-up
+GRID_MIN_ENEMIES = 64  # from this many enemies, close pairs are found with a grid instead of a distance matrix
+
+_STATE = attrgetter("x", "y", "angle", "speed", "rotation_velocity")
+_PARAMS = attrgetter("agro_radius", "preferred_distance", "patrol_radius", "avoidance_radius", "anchor_x", "anchor_y",
+                     "max_speed", "acceleration", "rotation_acceleration", "rotation_max_speed",
+                     "friction", "rotation_friction")
+
+
+def _wrap180(angle):
+    """ (angle + 180) % 360 - 180 with Python's float modulo semantics, on arrays. """
+    wrapped = np.fmod(angle + 180, 360)
+    np.add(wrapped, 360, out=wrapped, where=wrapped < 0)
+    return wrapped - 180
+
+
+def _degrees_towards(mask, dy, dx):
+    """ degrees(atan2(dy, dx)) evaluated only where `mask` is set (0 elsewhere). """
+    out = np.zeros(mask.shape)
+    idx = np.flatnonzero(mask)
+    out[idx] = np.degrees(np.arctan2(dy[idx], dx[idx]))
+    return out
+
+
+def _friction(value, friction):
+    """ Ship.update's friction towards zero, keeping its +0.0 (not -0.0) once stopped. """
+    return np.where(value > 0, np.maximum(value - friction, 0), np.where(value < 0, np.minimum(value + friction, 0), value))
+
+
+def _columns(getter, items):
+    """ One contiguous float array per attribute of `getter`, over `items`. """
+    return np.array(list(map(getter, items)), dtype=np.float64).T.copy()
+
+
+class EnemyAI:
+    """
+    EnemyShip.update for every enemy of a Game at once: targeting, edge
+    avoidance, pursuit/parallel/patrol steering and movement run as array
+    operations over the enemies, and only enemies that a neighbor grid finds
+    close to each other go through EnemyShip.avoid one by one, in list
+    order, so a tick plays out exactly as the per-ship loop would.
+
+    Level of detail: with `lod_interval` above 1, patrolling enemies at least
+    `lod_distance` from every player (and away from the borders) re-plan
+    only one tick in `lod_interval` (staggered by uid). In between they keep
+    their patrol speed and rotation inertia without steering or drawing a
+    random heading. The schedule only depends on the tick, so snapshots,
+    forks and replays stay deterministic.
+    """
+
+    def __init__(self, game, lod_interval=ENEMY_AI_LOD_INTERVAL, lod_distance=ENEMY_AI_LOD_DISTANCE):
+        self.game = game
+        self.lod_interval = lod_interval
+        self.lod_distance = lod_distance
+
+
+    def update(self):
+        """ Plan, avoid and move every enemy for the current tick, targeting its nearest player. """
+        game = self.game
+        enemies = game.enemy_ships
+        n = len(enemies)
+        if not n:
+            return
+        if n <= SCALAR_MAX_ENEMIES and self.lod_interval == 1:
+            self._update_each()
+            return
+        x, y, angle, speed, rv = _columns(_STATE, enemies)
+        (agro_radius, preferred_distance, patrol_radius, avoidance_radius, anchor_x, anchor_y,
+         max_speed, acceleration, rotation_acceleration, rotation_max_speed,
+         friction, rotation_friction) = _columns(_PARAMS, enemies)
+
+        def steer(mask, target_angle, deadzone=5):
+            # EnemyShip._steer_towards then Ship.turn_right / turn_left
+            diff = _wrap180(target_angle - angle)
+            turning = mask & (np.abs(diff) > deadzone) & (speed > 0.1)
+            np.copyto(rv, np.minimum(rv + rotation_acceleration, rotation_max_speed), where=turning & (diff > 0))
+            np.copyto(rv, np.maximum(rv - rotation_acceleration, -rotation_max_speed), where=turning & (diff <= 0))
+
+        # nearest player, the first one on ties
+        px, py, pa = _columns(attrgetter("x", "y", "angle"), game.player_ships)
+        to_players = np.hypot(px[None, :] - x[:, None], py[None, :] - y[:, None])
+        closest = to_players.argmin(axis=1)
+        dist_to_player = to_players[np.arange(n), closest]
+        dx, dy = px[closest] - x, py[closest] - y
+
+        near_edge = ((x < EDGE_MARGIN) | (x > SCREEN_WIDTH - EDGE_MARGIN) |
+                     (y < EDGE_MARGIN) | (y > SCREEN_HEIGHT - EDGE_MARGIN))
+        in_pursuit = dist_to_player < agro_radius
+        planned = np.ones(n, dtype=bool)
+        if self.lod_interval > 1:
+            uids = np.fromiter((enemy.uid for enemy in enemies), dtype=np.int64, count=n)
+            far = ~near_edge & ~in_pursuit & (dist_to_player >= self.lod_distance)
+            planned = ~far | ((game.tick + uids) % self.lod_interval == 0)
+
+        # borders: head back to the center of the screen
+        if near_edge.any():
+            angle_to_center = _degrees_towards(near_edge, SCREEN_HEIGHT / 2 - y, SCREEN_WIDTH / 2 - x)
+            steer(near_edge & (np.abs(_wrap180(angle_to_center - angle)) > 10), angle_to_center, deadzone=3)
+            np.copyto(speed, np.minimum(speed + acceleration, max_speed),
+                      where=near_edge & (speed < max_speed * 0.5))
+
+        # pursuit, firing broadside once at the preferred distance
+        firing = ()
+        if in_pursuit.any():
+            angle_to_player = _degrees_towards(in_pursuit, dy, dx)
+            target_angle = np.where(dist_to_player > preferred_distance + 20, angle_to_player + 30,
+                                    np.where(dist_to_player < preferred_distance - 20,
+                                             angle_to_player - 150, pa[closest] + 90))
+            steer(in_pursuit, target_angle)
+            np.copyto(speed, np.minimum(speed + acceleration, max_speed), where=in_pursuit)
+            parallel_mode = in_pursuit & (np.abs(dist_to_player - preferred_distance) <= 20)
+            right = _wrap180(target_angle - angle) > 0
+            firing = [(k, "right" if right[k] else "left") for k in np.flatnonzero(parallel_mode).tolist()]
+
+        # patrol around the anchor, one random heading drawn per planning enemy in list order
+        patrolling = ~in_pursuit & planned
+        if patrolling.any():
+            patrol_angle = np.zeros(n)
+            patrol_angle[patrolling] = [game.rng.uniform(0, 360) for _ in range(np.count_nonzero(patrolling))]
+            steer(patrolling, patrol_angle)
+            away = patrolling & (np.hypot(x - anchor_x, y - anchor_y) > patrol_radius)
+            if away.any():
+                steer(away, _degrees_towards(away, anchor_y - y, anchor_x - x))
+        np.copyto(speed, np.minimum(speed + acceleration, max_speed * 0.5), where=~in_pursuit)
+
+        for k, side in firing:
+            enemies[k].fire(side)
+
+        # Ship.update for the enemies with no other enemy in reach
+        new_speed = _friction(speed, friction)
+        new_rv = _friction(rv, rotation_friction)
+        new_angle = angle + new_rv
+        rad = np.radians(new_angle)
+        new_x = np.clip(x + new_speed * np.cos(rad), 20, SCREEN_WIDTH - 20)
+        new_y = np.clip(y + new_speed * np.sin(rad), 20, SCREEN_HEIGHT - 20)
+
+        # the others avoid each other in list order, seeing the earlier ones already moved
+        # (a tick moves a ship by its speed, plus the way back inside the borders if it is outside them)
+        outside = (np.maximum(np.maximum(20 - x, x - (SCREEN_WIDTH - 20)), 0) +
+                   np.maximum(np.maximum(20 - y, y - (SCREEN_HEIGHT - 20)), 0))
+        crowded = self._crowded(x, y, avoidance_radius.max() + max_speed.max() + outside.max())
+        planned_speed, planned_rv = speed.tolist(), rv.tolist()
+        for k in crowded:
+            enemies[k].speed, enemies[k].rotation_velocity = planned_speed[k], planned_rv[k]
+        for k, neighbors in crowded.items():
+            enemy = enemies[k]
+            enemy.avoid([enemies[j] for j in neighbors])
+            Ship.update(enemy)
+
+        for k, enemy, ex, ey, ea, es, er in zip(range(n), enemies, new_x.tolist(), new_y.tolist(),
+                                                new_angle.tolist(), new_speed.tolist(), new_rv.tolist()):
+            if k not in crowded:
+                enemy.x, enemy.y, enemy.angle, enemy.speed, enemy.rotation_velocity = ex, ey, ea, es, er
+            enemy.time += 1
+
+
+    def _update_each(self):
+        """ The per-ship loop: EnemyShip.update towards the nearest player, the first one on ties. """
+        game = self.game
+        players = [(ship.x, ship.y, ship.angle) for ship in game.player_ships]
+        for enemy in game.enemy_ships:
+            px, py, pa = min(players, key=lambda p: math.hypot(p[0] - enemy.x, p[1] - enemy.y))
+            enemy.update(px, py, pa, game.enemy_ships)
+
+
+    @staticmethod
+    def _crowded(x, y, reach):
+        """
+        {enemy index: indices of the other enemies within `reach` of it, ascending}, for the enemies
+        having any. With `reach` covering the avoidance radius plus a tick of movement, no other
+        enemy can be avoided this tick.
+        """
+        if len(x) < GRID_MIN_ENEMIES:
+            close = (x[None, :] - x[:, None]) ** 2 + (y[None, :] - y[:, None]) ** 2 < reach * reach
+            np.fill_diagonal(close, False)
+            i, j = np.nonzero(close)  # row-major: by enemy, then neighbor
+        else:
+            i, j = EnemyAI._grid_pairs(x, y, reach)
+        crowded = {}
+        for a, b in zip(i.tolist(), j.tolist()):
+            crowded.setdefault(a, []).append(b)
+        return crowded
+
+
+    @staticmethod
+    def _grid_pairs(x, y, reach):
+        """ (i, j) index arrays of the ordered pairs of enemies within `reach`, sorted, with a uniform grid of `reach`-sized cells. """
+        cx = (x // reach).astype(np.int64) + 1
+        cy = (y // reach).astype(np.int64) + 1
+        stride = int(cy.max()) + 2
+        key = cx * stride + cy
+        order = np.argsort(key, kind="stable")
+        sorted_keys = key[order]
+        index = np.arange(len(x))
+        pairs_i, pairs_j = [], []
+        for offset in (-stride - 1, -stride, -stride + 1, -1, 0, 1, stride - 1, stride, stride + 1):
+            cell = key + offset
+            lo = np.searchsorted(sorted_keys, cell, "left")
+            counts = np.searchsorted(sorted_keys, cell, "right") - lo
+            total = counts.sum()
+            if not total:
+                continue
+            starts = np.cumsum(counts) - counts
+            pairs_i.append(np.repeat(index, counts))
+            pairs_j.append(order[np.repeat(lo - starts, counts) + np.arange(total)])
+        i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+        close = (i != j) & ((x[j] - x[i]) ** 2 + (y[j] - y[i]) ** 2 < reach * reach)
+        i, j = i[close], j[close]
+        by_enemy = np.lexsort((j, i))
+        return i[by_enemy], j[by_enemy]
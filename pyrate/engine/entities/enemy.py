@@ -3,11 +3,12 @@ from pyrate.engine.entities.ship import Ship
 from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
 import math, random
-import time
 
 class EnemyShip(Ship):
-    def __init__(self, x, y, agro_radius=250, preferred_distance=100, patrol_radius=400, avoidance_radius=50):
-        super().__init__(x, y)
+    def __init__(self, x, y, agro_radius=250, preferred_distance=100, patrol_radius=400, avoidance_radius=50,
+                 clock=None, rng=None, projectile_pool=None, uid=-1):
+        super().__init__(x, y, clock=clock, projectile_pool=projectile_pool, uid=uid)
+        self.rng = rng or random  # random.Random of the owning Game
         self.name = "Enemy ship"
         self.anchor_x = x
         self.anchor_y = y
@@ -18,7 +19,17 @@ class EnemyShip(Ship):
         self.time = 0
 
     def update(self, player_x, player_y, player_angle, all_enemies):
+        """
+        Tick this enemy on its own. Game ticks all its enemies at once with
+        EnemyAI (pyrate/engine/enemy_ai.py), which gives the same result.
+        """
+        self.plan(player_x, player_y, player_angle)
+        self.avoid(all_enemies)
+        super().update()
+        self.time += 1
 
+    def plan(self, player_x, player_y, player_angle):
+        """ Steer, throttle and fire towards the player (or patrol), before avoidance and movement. """
         dx = player_x - self.x
         dy = player_y - self.y
         dist_to_player = math.hypot(dx, dy)
@@ -71,12 +82,14 @@ class EnemyShip(Ship):
                 self.fire(side)
         else:
             # mode patrouille
-            self._steer_towards(random.uniform(0, 360))
+            self._steer_towards(self.rng.uniform(0, 360))
             if dist_to_anchor > self.patrol_radius:
                 angle_to_anchor = math.degrees(math.atan2(self.anchor_y - self.y, self.anchor_x - self.x))
                 self._steer_towards(angle_to_anchor)
             self.speed = min(self.speed + self.acceleration, self.max_speed * 0.5)
 
+    def avoid(self, all_enemies):
+        """ Steer away from (and slow down for) every other enemy closer than avoidance_radius, in list order. """
         # éviter collisions entre ennemis
         for other in all_enemies:
             if other is self:
@@ -89,9 +102,6 @@ class EnemyShip(Ship):
                 self._steer_towards(away_angle)
                 self.decelerate()
 
-        super().update()
-        self.time += 1
-
     def _steer_towards(self, target_angle, deadzone=5):
         """ Adjust rotation velocity to steer toward a target angle with inertia """
         diff = (target_angle - self.angle + 180) % 360 - 180
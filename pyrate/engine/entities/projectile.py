@@ -1,38 +1,129 @@
 # pyrate/engine/projectile.py
 import math
 
-from pyrate.engine.entities.entity import Entity
-
-class Cannonball(Entity):
-    def __init__(self, x, y, angle, speed=8, max_distance=300):
-        super().__init__(x, y, name="Cannonball")
-        self.start_x = self.x
-        self.start_y = self.y
-        self.angle = angle
-        self.speed = speed
-        self.radius = 5
-        self.max_distance = max_distance
-        self.damage = 30
+import numpy as np
 
-    def update(self):
-        rad = math.radians(self.angle)
-        self.x += math.cos(rad) * self.speed
-        self.y += math.sin(rad) * self.speed
+# Cannonball defaults, shared by ProjectilePool and VecGame
+CANNONBALL_SPEED = 8
+CANNONBALL_RANGE = 300
+CANNONBALL_RADIUS = 5
+CANNONBALL_DAMAGE = 30
+
+
+class ProjectilePool:
+    """
+    Cannonballs in flight, stored as parallel arrays indexed by slot.
+    spawn() reuses free slots and doubles the arrays when all are taken,
+    so a running game stops allocating once it reaches its peak volley.
+    """
+
+    FIELDS = ("x", "y", "start_x", "start_y", "angle", "vx", "vy", "max_distance", "damage")
+
+    def __init__(self, capacity=64, radius=CANNONBALL_RADIUS):
+        self.radius = radius
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.owner = np.zeros(0, dtype=np.int32)   # uid of the ship that fired, -1 if none
+        self.serial = np.zeros(0, dtype=np.int64)  # firing order, keeps iteration order stable
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(0))
+        self._free = []
+        self._next_serial = 0
+        self._grow(capacity)
+
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+
+    def _grow(self, capacity):
+        for name in self.FIELDS + ("alive", "owner", "serial"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        # pop() hands out the lowest free slot first
+        self._free = list(range(capacity - 1, self.capacity - 1, -1)) + self._free
+        self.capacity = capacity
+
+
+    def spawn(self, x, y, angle, owner=-1, speed=CANNONBALL_SPEED, max_distance=CANNONBALL_RANGE,
+              damage=CANNONBALL_DAMAGE):
+        """ Launch a cannonball from (x, y) heading `angle` degrees and return its slot. """
+        if not self._free:
+            self._grow(max(2 * self.capacity, 1))
+        slot = self._free.pop()
+        rad = math.radians(angle)
+        self.x[slot] = self.start_x[slot] = x
+        self.y[slot] = self.start_y[slot] = y
+        self.angle[slot] = angle
+        self.vx[slot] = math.cos(rad) * speed
+        self.vy[slot] = math.sin(rad) * speed
+        self.max_distance[slot] = max_distance
+        self.damage[slot] = damage
+        self.owner[slot] = owner
+        self.serial[slot] = self._next_serial
+        self._next_serial += 1
+        self.alive[slot] = True
+        return slot
+
+
+    def live_slots(self):
+        """ Slots of the cannonballs in flight, in firing order. """
+        slots = np.flatnonzero(self.alive)
+        return slots[np.argsort(self.serial[slots], kind="stable")]
 
-    def has_exceeded_range(self):
+
+    def update(self):
+        """ Move every cannonball one tick and return the slots, in firing order, now out of range. """
+        alive = self.alive
+        np.add(self.x, self.vx, out=self.x, where=alive)
+        np.add(self.y, self.vy, out=self.y, where=alive)
         dx = self.x - self.start_x
         dy = self.y - self.start_y
-        return math.hypot(dx, dy) > self.max_distance
-    
-
-    def get_hitbox(self):
-        return [
-            (self.x - self.radius, self.y - self.radius),
-            (self.x + self.radius, self.y - self.radius),
-            (self.x + self.radius, self.y + self.radius),
-            (self.x - self.radius, self.y + self.radius),
-        ]
-    
-
-    def apply_damage(self, target):
-        pass
+        exceeded = np.flatnonzero(alive & (dx * dx + dy * dy > self.max_distance * self.max_distance))
+        return exceeded[np.argsort(self.serial[exceeded], kind="stable")]
+
+
+    def kill(self, slots):
+        for slot in slots:
+            if self.alive[slot]:
+                self.alive[slot] = False
+                self._free.append(int(slot))
+
+
+    def clear(self):
+        self.kill(np.flatnonzero(self.alive))
+
+
+    def copy(self):
+        """ Independent pool holding the same cannonballs in the same slots. """
+        pool = ProjectilePool.__new__(ProjectilePool)
+        pool.radius = self.radius
+        pool.capacity = self.capacity
+        for name in self.FIELDS + ("alive", "owner", "serial"):
+            setattr(pool, name, getattr(self, name).copy())
+        pool._free = list(self._free)
+        pool._next_serial = self._next_serial
+        return pool
+
+
+    def load(self, fields, owner, serial, next_serial):
+        """ Replace the cannonballs in flight with the given ones (one column per FIELDS row), in slots 0..n-1. """
+        count = len(owner)
+        if count > self.capacity:
+            self._grow(count)
+        self.alive[:] = False
+        for name, values in zip(self.FIELDS, fields):
+            getattr(self, name)[:count] = values
+        self.owner[:count] = owner
+        self.serial[:count] = serial
+        self.alive[:count] = True
+        self._free = list(range(self.capacity - 1, count - 1, -1))
+        self._next_serial = next_serial
+
+
+    def positions(self):
+        """ (x, y) of every cannonball in flight, in firing order. """
+        slots = self.live_slots()
+        return list(zip(self.x[slots].tolist(), self.y[slots].tolist()))
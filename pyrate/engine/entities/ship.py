@@ -3,14 +3,18 @@ import math
 import time
 
 from pyrate.engine.entities.entity import Entity
-from pyrate.engine.entities.projectile import Cannonball
+from pyrate.engine.entities.projectile import ProjectilePool, CANNONBALL_DAMAGE
 from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
 
 class Ship(Entity):
 
-    def __init__(self, x, y, angle=0, team="A"):
+    def __init__(self, x, y, angle=0, team="A", clock=None, projectile_pool=None, uid=-1):
         super().__init__(x, y, name="Ship")
+        self.uid = uid  # index of the ship in Game.ships_by_uid, -1 outside a Game
+        # Time source in seconds for cooldowns; Game passes its simulation clock
+        self.clock = clock or time.time
+
         # Displacement
         self.angle = angle  # degrees
         self.speed = 0
@@ -24,15 +28,16 @@ class Ship(Entity):
         self.rotation_max_speed = 2
         self.rotation_friction = 0.1
 
-        # Projectile
-        self.projectiles = []
-        self.last_fire_time = {"left": 0, "right": 0}
+        # Projectile, shared with the other ships of the Game
+        self.projectile_pool = projectile_pool if projectile_pool is not None else ProjectilePool(4)
         self.cooldown = 4.0
+        self.last_fire_time = {"left": -self.cooldown, "right": -self.cooldown}  # ready to fire
 
         # Gameplay
         self.team = team
         self.health = 100
         self.is_living = True
+        self.damage_dealt = 0  # health removed from other ships (cannonballs and rams)
         self.height = 100
         self.width = 40
     
@@ -114,7 +119,7 @@ class Ship(Entity):
 
 
     def fire(self, side="left"):
-        now = time.time()
+        now = self.clock()
         if now - self.last_fire_time[side] < self.cooldown:
             return  # still in cooldown
 
@@ -127,12 +132,12 @@ class Ship(Entity):
         x = self.x + math.cos(offset_rad) * 20
         y = self.y + math.sin(offset_rad) * 20
         
-        cannonball = Cannonball(x, y, cannon_angle)
+        damage = CANNONBALL_DAMAGE
         if self.temp_damage_boost:
-            cannonball.damage *= 2
+            damage *= 2
             self.temp_damage_boost = False
 
-        self.projectiles.append(cannonball)
+        self.projectile_pool.spawn(x, y, cannon_angle, owner=self.uid, damage=damage)
 
     def apply_damage(self, amount):
         self.health = max(self.health - amount, 0)
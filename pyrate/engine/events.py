@@ -0,0 +1,162 @@
+# pyrate/engine/events.py
+import json
+from collections import deque
+
+# Event kinds and the fields they carry, in order
+HIT, MISS, COLLISION, DESTROY, STATE = "hit", "miss", "collision", "destroy", "state"
+EVENT_FIELDS = {
+    HIT: ("target", "owner", "damage", "health"),
+    MISS: ("x", "y"),
+    COLLISION: ("ship1", "ship2", "damage", "health1", "health2"),
+    DESTROY: ("ship",),
+    STATE: ("state",),
+}
+EVENT_MESSAGES = {
+    HIT: "ship {target} took {damage} damage from ship {owner}, health remaining {health}",
+    MISS: "cannonball splashed at ({x:.0f}, {y:.0f})",
+    COLLISION: "collision between ships {ship1} and {ship2}: {damage} damage each, "
+               "health {health1} and {health2}",
+    DESTROY: "ship {ship} destroyed",
+    STATE: "game state is now {state}",
+}
+
+# Levels; collisions repeat every tick while ships overlap, so they are debug
+DEBUG, INFO = 10, 20
+LEVELS = {"debug": DEBUG, "info": INFO}
+EVENT_LEVELS = {HIT: INFO, MISS: DEBUG, COLLISION: DEBUG, DESTROY: INFO, STATE: INFO}
+
+
+def event_to_dict(event):
+    """ {"seq", "tick", "kind", **fields} for an event tuple (seq, tick, kind, fields). """
+    seq, tick, kind, fields = event
+    return {"seq": seq, "tick": tick, "kind": kind, **dict(zip(EVENT_FIELDS[kind], fields))}
+
+
+def format_event(event):
+    """ Human-readable line for an event tuple. """
+    seq, tick, kind, fields = event
+    return f"[{tick}] " + EVENT_MESSAGES[kind].format(**dict(zip(EVENT_FIELDS[kind], fields)))
+
+
+class EventLog:
+    """
+    Ring buffer of game events stored as plain tuples (seq, tick, kind, fields).
+    emit() only appends; sinks receive the new events in one batch per flush(),
+    and formatting happens in the sinks, outside the simulation's hot loops.
+    """
+
+    def __init__(self, capacity=4096, level=INFO):
+        self.events = deque(maxlen=capacity)
+        self.level = level
+        self.tick = 0  # stamped on new events, kept up to date by Game.update
+        self.seq = 0   # sequence number of the last event
+        self.sinks = []
+        self._flushed_seq = 0
+
+
+    def emit(self, kind, *fields):
+        if EVENT_LEVELS[kind] < self.level:
+            return
+        self.seq += 1
+        self.events.append((self.seq, self.tick, kind, fields))
+
+
+    def since(self, seq=0, kinds=None):
+        """ Buffered events newer than `seq`, optionally only of the given kinds. """
+        events = self.events
+        size = len(events)
+        # new events sit at the right end of the deque, where indexing is cheap
+        recent = [events[i] for i in range(size - min(max(self.seq - seq, 0), size), size)]
+        if kinds is not None:
+            recent = [e for e in recent if e[2] in kinds]
+        return recent
+
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+
+    def flush(self):
+        """ Hand the events emitted since the last flush to every sink. """
+        if self.seq == self._flushed_seq:
+            return
+        if self.sinks:
+            batch = self.since(self._flushed_seq)
+            for sink in self.sinks:
+                sink.write(batch)
+        self._flushed_seq = self.seq
+
+
+    def close(self):
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+
+class CallbackSink:
+    """ In-process subscriber: calls `callback(events)` with each batch of event tuples. """
+
+    def __init__(self, callback, level=DEBUG):
+        self.callback = callback
+        self.level = level
+
+
+    def write(self, events):
+        events = [e for e in events if EVENT_LEVELS[e[2]] >= self.level]
+        if events:
+            self.callback(events)
+
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """ Appends events to a JSON-lines file, writing `batch_size` lines at a time. """
+
+    def __init__(self, path, level=DEBUG, batch_size=256):
+        self.path = path
+        self.level = level
+        self.batch_size = batch_size
+        self._buffer = []
+        self._file = open(path, "a", encoding="utf-8")
+
+
+    def write(self, events):
+        self._buffer.extend(e for e in events if EVENT_LEVELS[e[2]] >= self.level)
+        if len(self._buffer) >= self.batch_size:
+            self._write_buffer()
+
+
+    def _write_buffer(self):
+        self._file.write("".join(json.dumps(event_to_dict(e)) + "\n" for e in self._buffer))
+        self._file.flush()
+        self._buffer.clear()
+
+
+    def close(self):
+        if self._buffer:
+            self._write_buffer()
+        self._file.close()
+
+
+class ConsoleSink:
+    """ Prints formatted events to stdout, for following a match from a terminal. """
+
+    def __init__(self, level=INFO):
+        self.level = level
+
+
+    def write(self, events):
+        lines = [format_event(e) for e in events if EVENT_LEVELS[e[2]] >= self.level]
+        if lines:
+            print("\n".join(lines))
+
+
+    def close(self):
+        pass
@@ -1,12 +1,43 @@
 # pyrate/engine/game.py
+import copy
 import random
 import math
+import heapq
+import numpy as np
+from collections import deque
 from math import hypot
+from pyrate.engine.broadphase import AABB_MARGIN, SpatialHash, aabb, aabb_overlap
+from pyrate.engine.enemy_ai import EnemyAI
 from pyrate.engine.entities.ship import Ship
 from pyrate.engine.entities.enemy import EnemyShip
-from pyrate.engine.entities.projectile import Cannonball
-from pyrate.engine.input import handle_input
-from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from pyrate.engine.entities.projectile import ProjectilePool
+from pyrate.engine.events import EventLog, LEVELS, HIT, MISS, COLLISION, DESTROY, STATE
+from pyrate.engine.input import ACTIONS, read_keyboard_actions
+from pyrate.engine.profiler import Profiler
+from pyrate.engine.sensors import SensorEngine
+from pyrate.engine.snapshot import take_snapshot, restore_snapshot
+from pyrate.engine.view import take_view
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, PROFILING, EVENT_LOG_LEVEL
+
+# Impacts are drained by the renderer; cap them so headless runs do not grow forever
+MAX_PENDING_IMPACTS = 256
+
+# Cell size of the collision broadphase grid, about one ship length
+COLLISION_CELL_SIZE = 128
+
+# Random positions tried per enemy before giving up on a crowded map
+MAX_SPAWN_ATTEMPTS = 10000
+
+# Player spawn points defined as (x, y, angle, team)
+# NOTE: order of spawn points is important for the player team creation
+PLAYER_SPAWNS = [
+    (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4, 0, "A"),
+    (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT // 4, 180, "B"),
+    (SCREEN_WIDTH // 4, SCREEN_HEIGHT * 3 // 4, 0, "A"),
+    (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT * 3 // 4, 180, "B"),
+    (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2, 0, "A"),
+    (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT // 2, 180, "B"),
+]
 
 
 def sat_mtv(poly1, poly2):
@@ -50,6 +81,20 @@ def sat_mtv(poly1, poly2):
     return (mtv_axis[0] * min_overlap, mtv_axis[1] * min_overlap)
 
 
+def polygons_overlap(poly1, poly2):
+    """ SAT overlap test on the edge normals of both polygons; touching counts as overlapping. """
+    for points in (poly1, poly2):
+        for k in range(len(points)):
+            x1, y1 = points[k]
+            x2, y2 = points[(k+1)%len(points)]
+            ax, ay = -(y2-y1), x2-x1
+            proj1 = [ax*px+ay*py for px,py in poly1]
+            proj2 = [ax*px+ay*py for px,py in poly2]
+            if max(proj1) < min(proj2) or max(proj2) < min(proj1):
+                return False
+    return True
+
+
 def distance(a, b):
     """ Returns the distance between two entities a and b """
     return math.hypot(a.x - b.x, a.y - b.y)
@@ -68,97 +113,198 @@ def angle(a, b):
     return math.degrees(math.atan2(dy, dx))
 
 
-def add_uniform_noise(value, noise_range):
+def add_uniform_noise(value, noise_range, rng=random):
         """ Adds noise to a value within a specified range. """
-        return value + random.uniform(-noise_range, noise_range)
+        return value + rng.uniform(-noise_range, noise_range)
+
+
+def _copy_rng(rng):
+    """ random.Random in the same state, without seeding one first. """
+    clone = random.Random.__new__(random.Random)
+    clone.setstate(rng.getstate())
+    return clone
 
 
 class Game:
-    def __init__(self, n_players=4, n_enemies=3, min_distance=300):
-        """ Sets up entities spawn and state. """
+    def __init__(self, n_players=4, n_enemies=3, min_distance=300, seed=None):
+        """
+        Sets up entities spawn and state.
+        Two games with the same non-None `seed` and the same actions play out identically.
+        """
         self.control_mode = "api"
         self.state = "playing"  # 'playing', 'A victory', 'B victory', 'gameover'
+        self.tick = 0  # number of simulation steps run so far
+
+        self.seed = seed
+        self.min_distance = min_distance
+        self.rng = random.Random(seed)  # spawns and enemy AI
+        # sensor noise has its own stream so that reading sensors never changes the match
+        self.sensor_rng = random.Random(self.rng.getrandbits(64))
 
+        self.projectiles = ProjectilePool()  # cannonballs in flight, fired into by every ship
         self.player_ships = self._spawn_players(n_players) # List of player ships
         self.enemy_ships = self._spawn_enemies(n_enemies, min_distance) # List of enemy ships
+        # every ship ever spawned, indexed by ship.uid (destroyed enemies stay here)
+        self.ships_by_uid = self.player_ships + self.enemy_ships
+
+        self.impacts = deque(maxlen=MAX_PENDING_IMPACTS)  # (tick, x, y, 'hit' or 'miss') of the last ticks
+        self.pending_actions = deque()  # (player_id, action, side) applied at the next tick
+        self.action_sources = []  # callables(game) queueing actions at the start of every tick
+        self.profiler = Profiler(enabled=PROFILING)  # per-phase timings of update()
+        self.events = EventLog(level=LEVELS[EVENT_LOG_LEVEL])  # hits, destructions, state changes...
+        self.sensors = SensorEngine(self)  # per-tick sensor readings of every ship
+        self.debug_sensors = None  # readings drawn in debug mode, with their own noise, see view()
+        self.enemy_ai = EnemyAI(self)  # moves every enemy at once, see pyrate/engine/enemy_ai.py
+        self.recorder = None  # ReplayRecorder capturing every tick's actions, see pyrate/engine/replay.py
+
+
+    def clock(self):
+        """ Simulation time in seconds, advanced by update() rather than by wall time. """
+        return self.tick / FPS
+
 
-        self.projectiles = []
-        self.impacts = []
+    def snapshot(self):
+        """ Immutable GameSnapshot of everything update() reads, see pyrate/engine/snapshot.py """
+        return take_snapshot(self)
+
+
+    def view(self, sensors=False):
+        """
+        Immutable GameView for drawing and observations, see pyrate/engine/view.py
+        `sensors` adds the positions of sensor readings for debug drawing; their noise does
+        not come from sensor_rng, so drawing them leaves the agents' readings unchanged.
+        """
+        if sensors and self.debug_sensors is None:
+            self.debug_sensors = SensorEngine(self, rng=random.Random(self.seed))
+        return take_view(self, self.debug_sensors if sensors else None)
+
+
+    def restore(self, snapshot):
+        """ Rewind (or advance) this Game to a snapshot taken from it or from a fork of it. """
+        restore_snapshot(self, snapshot)
+
+
+    def fork(self):
+        """
+        Independent Game in the same state, for rollouts: it plays out like this one given
+        the same actions, without recorder, event sinks or profiling.
+        """
+        game = Game.__new__(Game)
+        game.control_mode, game.state, game.tick = self.control_mode, self.state, self.tick
+        game.seed, game.min_distance = self.seed, self.min_distance
+        game.rng = _copy_rng(self.rng)
+        game.sensor_rng = _copy_rng(self.sensor_rng)
+        game.projectiles = self.projectiles.copy()
+        game.ships_by_uid = [copy.copy(ship) for ship in self.ships_by_uid]
+        for ship in game.ships_by_uid:
+            ship.clock = game.clock
+            ship.projectile_pool = game.projectiles
+            ship.last_fire_time = dict(ship.last_fire_time)
+            if isinstance(ship, EnemyShip):
+                ship.rng = game.rng
+        game.player_ships = game.ships_by_uid[:len(self.player_ships)]
+        game.enemy_ships = [game.ships_by_uid[enemy.uid] for enemy in self.enemy_ships]
+        game.impacts = deque(self.impacts, maxlen=MAX_PENDING_IMPACTS)
+        game.pending_actions = deque(self.pending_actions)
+        game.action_sources = []
+        game.profiler = Profiler()
+        game.events = EventLog(level=self.events.level)
+        game.events.tick = self.tick
+        game.sensors = SensorEngine(game)
+        game.debug_sensors = None
+        game.enemy_ai = EnemyAI(game, self.enemy_ai.lod_interval, self.enemy_ai.lod_distance)
+        game.recorder = None
+        return game
 
 
     def update(self):
         # skip logic if game ended
         if self.state != "playing":
+            self.pending_actions.clear()
             return
-
-        # 1) input & physics for each player
+        profiler = self.profiler
+        profiler.begin_tick()
+
+        # 0) queued agent actions (and held keys), applied at a fixed point of the tick
+        if self.control_mode == "keyboard":
+            keyboard_actions = read_keyboard_actions()
+            for player_id in range(len(self.player_ships)):
+                for action, side in keyboard_actions:
+                    self.queue_action(player_id, action, side)
+        for source in self.action_sources:
+            source(self)
+        if self.recorder is not None:
+            self.recorder.capture(self)
+        self.tick += 1
+        self.events.tick = self.tick
+        self._apply_pending_actions()
+        profiler.lap("input")
+
+        # 1) physics for each player
         for ship in self.player_ships:
-            if self.control_mode == "keyboard":
-                handle_input(ship)
             ship.update()
-
-        # prepare a list of (x,y,angle) for targeting
-        player_positions = [(ship.x, ship.y, ship.angle) for ship in self.player_ships]
+        profiler.lap("player_physics")
 
         # 2) update enemies, targeting nearest player
-        for enemy in self.enemy_ships:
-            # find closest player
-            closest = min(
-                player_positions,
-                key=lambda p: math.hypot(p[0] - enemy.x, p[1] - enemy.y)
-            )
-            px, py, pa = closest
-            enemy.update(px, py, pa, self.enemy_ships)
-
-        # 3) update projectiles
-        remaining = []
-
-        # pull in any projectiles from all players
-        for ship in self.player_ships:
-            self.projectiles.extend(ship.projectiles)
-            ship.projectiles.clear()
-
-        # …and also from enemies
-        for enemy in self.enemy_ships:
-            self.projectiles.extend(enemy.projectiles)
-            enemy.projectiles.clear()
-
-        # step every projectile
-        for proj in self.projectiles:
-            proj.update()
-            if proj.has_exceeded_range():
-                self.impacts.append((proj, 'miss'))
-            else:
-                remaining.append(proj)
-        self.projectiles = remaining
+        self.enemy_ai.update()
+        profiler.lap("enemy_ai")
+
+        # 3) move every cannonball; the ones out of range splash
+        out_of_range = self.projectiles.update()
+        for slot in out_of_range:
+            x, y = self.projectiles.x[slot].item(), self.projectiles.y[slot].item()
+            self.impacts.append((self.tick, x, y, 'miss'))
+            self.events.emit(MISS, x, y)
+        self.projectiles.kill(out_of_range)
+        profiler.lap("projectiles")
 
         # collisions & end‐game
         self._handle_projectile_hits()
+        profiler.lap("hits")
         self._handle_ship_collisions()
+        profiler.lap("ship_collisions")
         self._check_end_conditions()
+        profiler.lap("end_conditions")
+        self.events.flush()
+        profiler.end_tick()
+
+
+
+    def queue_action(self, player_id, action, side="left"):
+        """ Schedule an action for a player ship; it is applied at the start of the next update(). """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'")
+        if not 0 <= player_id < len(self.player_ships):
+            raise IndexError(f"No player with id {player_id}")
+        self.pending_actions.append((player_id, action, side))
+
+
+    def _apply_pending_actions(self):
+        while self.pending_actions:
+            player_id, action, side = self.pending_actions.popleft()
+            ship = self.player_ships[player_id]
+            if action == "accelerate":
+                ship.accelerate()
+            elif action == "decelerate":
+                ship.decelerate()
+            elif action == "turn_left":
+                ship.turn_left()
+            elif action == "turn_right":
+                ship.turn_right()
+            elif action == "fire":
+                ship.fire(side)
 
 
-    
     def _spawn_players(self, n_players):
         """ Spawn player ships at predefined locations. """
-        if n_players > 6:
-            raise ValueError("Number of players must be less than 6.")
-        
-        # Spawn points defined as (x, y, angle)
-        # NOTE: order of spawn points is important for the player team creation
-        spawn_info = [
-            (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4, 0, "A"),
-            (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT // 4, 180, "B"),
-            (SCREEN_WIDTH // 4, SCREEN_HEIGHT * 3 // 4, 0, "A"),
-            (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT * 3 // 4, 180, "B"),
-            (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2, 0, "A"),
-            (SCREEN_WIDTH * 3 // 4, SCREEN_HEIGHT // 2, 180, "B"),
-        ]
+        if not 1 <= n_players <= len(PLAYER_SPAWNS):
+            raise ValueError(f"Number of players must be between 1 and {len(PLAYER_SPAWNS)}")
 
         player_ships = []
         for i_player in range(n_players):
-            x, y, angle, team = spawn_info[i_player]
-            new_player = Ship(x, y, angle, team)
+            x, y, angle, team = PLAYER_SPAWNS[i_player]
+            new_player = Ship(x, y, angle, team, clock=self.clock,
+                              projectile_pool=self.projectiles, uid=i_player)
             player_ships.append(new_player)
 
         return player_ships
@@ -166,15 +312,17 @@ class Game:
 
     def _spawn_enemies(self, n_enemies, min_distance):
         """ Spawn enemy ships at random locations at least `min_distance` from every player. """
+        if n_enemies < 0 or min_distance < 0:
+            raise ValueError("Number of enemies and min_distance cannot be negative")
         enemies = []
 
         # Gather all player positions
         player_positions = [(p.x, p.y) for p in self.player_ships]
 
         for _ in range(n_enemies):
-            while True:
-                x = random.randint(0, SCREEN_WIDTH)
-                y = random.randint(0, SCREEN_HEIGHT)
+            for _ in range(MAX_SPAWN_ATTEMPTS):
+                x = self.rng.randint(0, SCREEN_WIDTH)
+                y = self.rng.randint(0, SCREEN_HEIGHT)
 
                 # 1) Must be far enough from every player
                 too_close_to_player = any(
@@ -194,8 +342,11 @@ class Game:
 
                 # passed both checks
                 break
+            else:
+                raise ValueError(f"Cannot place {n_enemies} enemies {min_distance} apart from every ship")
 
-            new_enemy = EnemyShip(x, y)
+            new_enemy = EnemyShip(x, y, clock=self.clock, rng=self.rng,
+                                  projectile_pool=self.projectiles, uid=len(self.player_ships) + len(enemies))
             enemies.append(new_enemy)
 
         return enemies
@@ -215,85 +366,123 @@ class Game:
         # A victory
         if not enemies_alive and a_alive and not b_alive:
             self.state = "A victory"
-            print("A Victory: Team A wins, all enemies destroyed and Team B eliminated.")
 
         # B victory
         elif not enemies_alive and b_alive and not a_alive:
             self.state = "B victory"
-            print("B Victory: Team B wins, all enemies destroyed and Team A eliminated.")
 
         # Game over
         elif enemies_alive and not a_alive and not b_alive:
             self.state = "gameover"
-            print("Game Over: All player ships destroyed, enemies still active.")
 
         # Otherwise stay in playing
         else:
             self.state = "playing"
 
+        if self.state != "playing":
+            self.events.emit(STATE, self.state)
+
 
     def _handle_projectile_hits(self):
-        collisions = []
+        pool = self.projectiles
         targets = self.player_ships + self.enemy_ships
-        for proj in self.projectiles:
-            for target in targets:
-                if self.collide(proj, target):
-                    target.apply_damage(proj.damage)
-                    print(f"{target.name} took {proj.damage} damage, health remaining {target.health}")
-                    collisions.append(proj)
-                    self.impacts.append((proj, 'hit'))
-        # remove hit projectiles
-        self.projectiles = [p for p in self.projectiles if p not in collisions]
+        live = pool.live_slots()
+        if not live.size or not targets:
+            return
+
+        # broadphase: bounding-box test of every cannonball against each ship at once
+        bx, by, r = pool.x[live], pool.y[live], pool.radius
+        candidates = []
+        for k, target in enumerate(targets):
+            hitbox = target.get_hitbox()
+            min_x, min_y, max_x, max_y = aabb(hitbox)
+            near = ((bx + r + AABB_MARGIN >= min_x) & (max_x + AABB_MARGIN >= bx - r) &
+                    (by + r + AABB_MARGIN >= min_y) & (max_y + AABB_MARGIN >= by - r))
+            candidates.extend((n, k, hitbox) for n in np.flatnonzero(near).tolist())
+
+        # narrow phase, in firing order then target order
+        hits = []
+        for n, k, hitbox in sorted(candidates, key=lambda c: c[:2]):
+            slot = live[n]
+            x, y = bx[n].item(), by[n].item()
+            ball = [(x - r, y - r), (x + r, y - r), (x + r, y + r), (x - r, y + r)]
+            if not polygons_overlap(ball, hitbox):
+                continue
+            target = targets[k]
+            damage = pool.damage[slot].item()
+            health_before = target.health
+            target.apply_damage(damage)
+            owner = pool.owner[slot].item()
+            if owner >= 0:
+                self.ships_by_uid[owner].damage_dealt += health_before - target.health
+            self.events.emit(HIT, target.uid, owner, damage, target.health)
+            if health_before > 0 and not target.is_living:
+                self.events.emit(DESTROY, target.uid)
+            hits.append(slot)
+            self.impacts.append((self.tick, x, y, 'hit'))
+        pool.kill(hits)
 
 
     def _handle_ship_collisions(self):
         ships = self.player_ships + self.enemy_ships
-        for i in range(len(ships)):
-            for j in range(i+1, len(ships)):
-                s1, s2 = ships[i], ships[j]
-                if not self.collide(s1, s2):
-                    continue
+        hitboxes = [s.get_hitbox() for s in ships]
+        boxes = [aabb(h) for h in hitboxes]
+        grid = SpatialHash(COLLISION_CELL_SIZE)
+        for k, box in enumerate(boxes):
+            grid.insert(k, box)
+
+        # candidate pairs are visited in (i, j) order, like a full i < j scan
+        pending = list(grid.pairs())
+        heapq.heapify(pending)
+        queued = set(pending)
+        while pending:
+            i, j = heapq.heappop(pending)
+            s1, s2 = ships[i], ships[j]
+            if not (aabb_overlap(boxes[i], boxes[j]) and polygons_overlap(hitboxes[i], hitboxes[j])):
+                continue
 
-                # separation
-                dx, dy = s1.x - s2.x, s1.y - s2.y
-                nx, ny = normalize(dx, dy)
-                overlap = (s1.width/2 + s2.width/2) - distance(s1, s2)
-                if overlap > 0:
-                    s1.x += nx * overlap * 1.25
-                    s1.y += ny * overlap * 1.25
-                    s2.x -= nx * overlap * 1.25
-                    s2.y -= ny * overlap * 1.25
-
-                # damage (only between player↔enemy or player↔player if desired)
-                if not (isinstance(s1, EnemyShip) and isinstance(s2, EnemyShip)):
-                    dmg = self.compute_damage(s1, s2) / 3
-                    s1.apply_damage(dmg)
-                    s2.apply_damage(dmg)
-                    print(f"Collision between {s1.name} and {s2.name}: {dmg} damage each, "
-                          f"{s1.name} health {s1.health}, {s2.name} health {s2.health}")
+            # separation
+            dx, dy = s1.x - s2.x, s1.y - s2.y
+            nx, ny = normalize(dx, dy)
+            overlap = (s1.width/2 + s2.width/2) - distance(s1, s2)
+            if overlap > 0:
+                s1.x += nx * overlap * 1.25
+                s1.y += ny * overlap * 1.25
+                s2.x -= nx * overlap * 1.25
+                s2.y -= ny * overlap * 1.25
+
+                # pushed ships may now touch ships of pairs not visited yet
+                for k in (i, j):
+                    grid.remove(k, boxes[k])
+                    hitboxes[k] = ships[k].get_hitbox()
+                    boxes[k] = aabb(hitboxes[k])
+                    grid.insert(k, boxes[k])
+                    for m in grid.query(boxes[k]):
+                        pair = (k, m) if k < m else (m, k)
+                        if m != k and pair > (i, j) and pair not in queued:
+                            queued.add(pair)
+                            heapq.heappush(pending, pair)
+
+            # damage (only between player↔enemy or player↔player if desired)
+            if not (isinstance(s1, EnemyShip) and isinstance(s2, EnemyShip)):
+                dmg = self.compute_damage(s1, s2) / 3
+                h1, h2 = s1.health, s2.health
+                s1.apply_damage(dmg)
+                s2.apply_damage(dmg)
+                s1.damage_dealt += h2 - s2.health
+                s2.damage_dealt += h1 - s1.health
+                self.events.emit(COLLISION, s1.uid, s2.uid, dmg, s1.health, s2.health)
+                if h1 > 0 and not s1.is_living:
+                    self.events.emit(DESTROY, s1.uid)
+                if h2 > 0 and not s2.is_living:
+                    self.events.emit(DESTROY, s2.uid)
 
         # clean up destroyed enemies
-        before = len(self.enemy_ships)
         self.enemy_ships = [e for e in self.enemy_ships if e.is_living]
-        removed = before - len(self.enemy_ships)
-        if removed:
-            print(f"Removed {removed} destroyed enemy ship(s)")
 
 
     def collide(self, e1, e2):
-        poly1 = e1.get_hitbox()
-        poly2 = e2.get_hitbox()
-        for points in (poly1, poly2):
-            for k in range(len(points)):
-                x1, y1 = points[k]
-                x2, y2 = points[(k+1)%len(points)]
-                edge = (x2-x1, y2-y1)
-                axis = (-edge[1], edge[0])
-                proj1 = [axis[0]*px+axis[1]*py for px,py in poly1]
-                proj2 = [axis[0]*px+axis[1]*py for px,py in poly2]
-                if max(proj1) < min(proj2) or max(proj2) < min(proj1):
-                    return False
-        return True
+        return polygons_overlap(e1.get_hitbox(), e2.get_hitbox())
 
 
     def compute_damage(self, e1, e2):
@@ -319,57 +508,13 @@ class Game:
 
 
     def get_projectile_positions(self):
-        return [(int(p.x), int(p.y)) for p in self.projectiles]
+        return [(int(x), int(y)) for x, y in self.projectiles.positions()]
 
     
     def get_ship_sensor(self, ship):
         """
-        Returns a sensor reading for the given ship.
-        Includes position, angle, speed, health, living status, and team info.
+        Returns a sensor reading for the given ship: entity label, noisy distance and angle,
+        living status and health band of every other ship. Computed for all ships at once,
+        at most once per tick, see pyrate/engine/sensors.py
         """
-        sensor_data = []
-        for s in self.player_ships + self.enemy_ships:
-            if s is ship:
-                # Optionally skip sensing yourself
-                continue
-
-            # Compute raw distance and angle
-            dist = distance(ship, s)
-            angle_to_ship = angle(ship, s)
-
-            # Determine if 's' is on the same team as 'ship'
-            same_team = False
-            if (ship in self.player_ships and s in self.player_ships) or \
-               (ship in self.enemy_ships and s in self.enemy_ships):
-                same_team = True
-
-            # Set initial entity label
-            if same_team:
-                entity_label = "friendly"
-            else:
-                entity_label = s.name if hasattr(s, "name") else "Unknown"
-
-            # Determine health label
-            health_label = "low" if (hasattr(s, "health") and s.health <= 40) else "high"
-
-            # Add noise based on distance
-            if dist < 200:
-                dist = add_uniform_noise(dist, 10)
-                angle_to_ship = add_uniform_noise(angle_to_ship, 7)
-                # For very close range, keep entity label (including "friendly")
-            elif dist < 400:
-                dist = add_uniform_noise(dist, 25)
-                angle_to_ship = add_uniform_noise(angle_to_ship, 10)
-                # In mid-range, mask entity identity only if it's not friendly
-                if not same_team:
-                    entity_label = "Unknown"
-
-            sensor_data.append({
-                "entity": entity_label,
-                "distance": dist,
-                "angle": angle_to_ship,
-                "is_living": s.is_living,
-                "health": health_label
-            })
-
-        return sensor_data
\ No newline at end of file
+        return self.sensors.reading(ship)
\ No newline at end of file
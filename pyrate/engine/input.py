@@ -11,25 +11,25 @@ def set_player_control(control_type):
     else:
         print(f"[Input] Warning: Unknown controle type '{control_type}'")
 
-def handle_input(ship):
-    """
-    Allows to control a ship using the keyboard (Z, Q, S, D) when INPUT_MODE is "keyboard".
-    """
-    if INPUT_MODE == "keyboard":
-        keys = pygame.key.get_pressed()
+# Actions a player ship accepts through Game.queue_action
+ACTIONS = ("accelerate", "decelerate", "turn_left", "turn_right", "fire")
 
-        # Displacement
-        if keys[pygame.K_z]:
-            ship.accelerate()
-        if keys[pygame.K_s]:
-            ship.decelerate()
-        if keys[pygame.K_q]:
-            ship.turn_left()
-        if keys[pygame.K_d]:
-            ship.turn_right()
+# Keys and the (action, side) they trigger, in the order they are applied
+KEY_BINDINGS = (
+    # Displacement
+    (pygame.K_z, ("accelerate", "left")),
+    (pygame.K_s, ("decelerate", "left")),
+    (pygame.K_q, ("turn_left", "left")),
+    (pygame.K_d, ("turn_right", "left")),
+    # Shooting
+    (pygame.K_LEFT, ("fire", "left")),
+    (pygame.K_RIGHT, ("fire", "right")),
+)
 
-        # Shooting
-        if keys[pygame.K_LEFT]:
-            ship.fire("left")
-        if keys[pygame.K_RIGHT]:
-            ship.fire("right")
\ No newline at end of file
+
+def read_keyboard_actions():
+    """ (action, side) pairs for the keys currently held (Z, Q, S, D and arrows) when INPUT_MODE is "keyboard". """
+    if INPUT_MODE != "keyboard":
+        return []
+    keys = pygame.key.get_pressed()
+    return [command for key, command in KEY_BINDINGS if keys[key]]
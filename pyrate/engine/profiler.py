@@ -0,0 +1,103 @@
+# pyrate/engine/profiler.py
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def _percentile(sorted_samples, q):
+    """ Nearest-rank percentile of an already sorted list. """
+    k = max(0, min(len(sorted_samples) - 1, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[k]
+
+
+class Profiler:
+    """
+    Opt-in timings of named phases, kept over a rolling window of samples.
+    While disabled every call returns immediately, so instrumented code
+    only pays for a method call and an attribute check. enable() and
+    disable() may be called from another thread: a tick is only timed if
+    profiling was enabled when it began.
+    """
+
+    def __init__(self, enabled=False, window=600):
+        self.enabled = enabled
+        self.window = window  # samples kept per phase, 10 s of ticks at 60 Hz
+        self.samples = {}
+        self._tick_start = 0.0
+        self._lap_start = 0.0
+        self._timing = False  # the current tick began while enabled
+
+
+    def enable(self):
+        if not self.enabled:
+            self.reset()
+        self.enabled = True
+
+
+    def disable(self):
+        self.enabled = False
+
+
+    def reset(self):
+        self.samples = {}
+
+
+    def record(self, phase, seconds):
+        if not self.enabled:
+            return
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+
+    def begin_tick(self):
+        """ Start timing a tick; each lap() then records the time since the previous mark. """
+        self._timing = self.enabled
+        if self._timing:
+            self._tick_start = self._lap_start = time.perf_counter()
+
+
+    def lap(self, phase):
+        if not self._timing:
+            return
+        now = time.perf_counter()
+        self.record(phase, now - self._lap_start)
+        self._lap_start = now
+
+
+    def end_tick(self):
+        if self._timing:
+            self.record("tick", time.perf_counter() - self._tick_start)
+            self._timing = False
+
+
+    @contextmanager
+    def time(self, phase):
+        """ Record the duration of a `with` block, e.g. rendering or encoding. """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+
+    def summary(self):
+        """ {phase: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}} over the current window. """
+        result = {}
+        for phase, samples in list(self.samples.items()):
+            values = sorted(samples)
+            if not values:
+                continue
+            result[phase] = {
+                "count": len(values),
+                "mean_ms": 1000 * sum(values) / len(values),
+                "p50_ms": 1000 * _percentile(values, 50),
+                "p95_ms": 1000 * _percentile(values, 95),
+                "p99_ms": 1000 * _percentile(values, 99),
+                "max_ms": 1000 * values[-1],
+            }
+        return result
@@ -0,0 +1,245 @@
+# pyrate/engine/replay.py
+"""
+Binary match replays.
+
+A replay is a header followed by zlib-compressed chunks. Each chunk opens
+with a keyframe (the full simulation state at its first tick) followed by
+the actions applied on each of the next ticks. The simulation is
+deterministic (see Game seed and clock), so any tick is reached by
+restoring the closest keyframe before it and re-applying the actions.
+
+    python -m pyrate.engine.replay info match.pyrr
+    python -m pyrate.engine.replay export match.pyrr frames/ --start 600 --end 1200 --step 2
+"""
+import argparse
+import json
+import os
+import struct
+import zlib
+
+from pyrate.engine.game import Game, ACTIONS
+from pyrate.engine.snapshot import SIDES, pack_snapshot, unpack_snapshot
+
+MAGIC = b"PYRR"
+VERSION = 2  # 2: keyframes in snapshot format 2, see pyrate/engine/snapshot.py
+KEYFRAME_INTERVAL = 600  # ticks per chunk, 10 s at 60 Hz
+
+_HEADER = struct.Struct("<4sHI")         # magic, version, metadata length
+_CHUNK = struct.Struct("<IIII")          # first tick, ticks, raw length, compressed length
+_COMMAND = struct.Struct("<BBB")         # player, action, side
+
+
+# -- Recording -----------------------------------------------------------------
+
+class ReplayRecorder:
+    """
+    Records a Game from its current tick on: attach() it before the first
+    update() to keep the spawn state, and close() it when the match is over.
+    """
+
+    def __init__(self, path, game, keyframe_interval=KEYFRAME_INTERVAL, compression=6):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.compression = compression
+        self._file = open(path, "wb")
+        meta = json.dumps({
+            "n_players": len(game.player_ships),
+            "n_enemies": len(game.ships_by_uid) - len(game.player_ships),
+            "min_distance": game.min_distance,
+            "seed": game.seed,
+            "keyframe_interval": keyframe_interval,
+        }).encode()
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(meta)) + meta)
+        self._first_tick = None
+        self._records = []
+        self.game = game
+
+
+    @classmethod
+    def attach(cls, path, game, **kwargs):
+        recorder = cls(path, game, **kwargs)
+        game.recorder = recorder
+        return recorder
+
+
+    def capture(self, game):
+        """ Called by Game.update() with the actions about to be applied on the next tick. """
+        if self._first_tick is None or len(self._records) > self.keyframe_interval:
+            self._write_chunk()
+            self._first_tick = game.tick
+            keyframe = pack_snapshot(game.snapshot())
+            self._records = [struct.pack("<I", len(keyframe)) + keyframe]
+        commands = [_COMMAND.pack(player_id, ACTIONS.index(action), SIDES.index(side))
+                    for player_id, action, side in game.pending_actions]
+        self._records.append(struct.pack("<H", len(commands)) + b"".join(commands))
+
+
+    def _write_chunk(self):
+        n_ticks = len(self._records) - 1  # the first record is the keyframe
+        if n_ticks <= 0:
+            return
+        raw = b"".join(self._records)
+        data = zlib.compress(raw, self.compression)
+        self._file.write(_CHUNK.pack(self._first_tick, n_ticks, len(raw), len(data)) + data)
+        self._file.flush()
+        self._records = []
+
+
+    def close(self):
+        self._write_chunk()
+        self._file.close()
+        if self.game.recorder is self:
+            self.game.recorder = None
+
+
+# -- Playback ------------------------------------------------------------------
+
+class ReplayPlayer:
+    """
+    Random access to a recorded match. seek() restores the keyframe at or
+    before a tick and re-simulates from there; ticks() fast-forwards headless.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, meta_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a PyRate replay")
+            if version != VERSION:
+                raise ValueError(f"Unsupported replay version {version}")
+            self.meta = json.loads(f.read(meta_length))
+            # chunk index: (first tick, ticks, raw length, compressed length, file offset)
+            self.chunks = []
+            while True:
+                header = f.read(_CHUNK.size)
+                if len(header) < _CHUNK.size:
+                    break
+                first_tick, n_ticks, raw_length, length = _CHUNK.unpack(header)
+                self.chunks.append((first_tick, n_ticks, raw_length, length, f.tell()))
+                f.seek(length, os.SEEK_CUR)
+        if not self.chunks:
+            raise ValueError(f"{path} holds no recorded ticks")
+        self.first_tick = self.chunks[0][0]
+        self.last_tick = self.chunks[-1][0] + self.chunks[-1][1]
+        self.game = None
+        self._cached = None
+
+
+    def _read_chunk(self, index):
+        """ (keyframe bytes, [actions of each tick]) of a chunk; the last one read is cached. """
+        if self._cached is not None and self._cached[0] == index:
+            return self._cached[1]
+        first_tick, n_ticks, raw_length, length, offset = self.chunks[index]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            raw = zlib.decompress(f.read(length))
+        (keyframe_length,) = struct.unpack_from("<I", raw, 0)
+        keyframe = raw[4:4 + keyframe_length]
+        position = 4 + keyframe_length
+        ticks = []
+        for _ in range(n_ticks):
+            (count,) = struct.unpack_from("<H", raw, position)
+            position += 2
+            ticks.append([(player_id, ACTIONS[action], SIDES[side])
+                          for player_id, action, side in _COMMAND.iter_unpack(raw[position:position + count * _COMMAND.size])])
+            position += count * _COMMAND.size
+        self._cached = (index, (keyframe, ticks))
+        return keyframe, ticks
+
+
+    def _new_game(self):
+        meta = self.meta
+        game = Game(meta["n_players"], meta["n_enemies"], meta["min_distance"], seed=meta["seed"])
+        game.control_mode = "api"
+        return game
+
+
+    def seek(self, tick):
+        """ Return the replay's Game positioned at `tick` (clamped to the recorded range). """
+        tick = max(self.first_tick, min(tick, self.last_tick))
+        index = max(k for k, chunk in enumerate(self.chunks) if chunk[0] <= tick)
+        game = self.game
+        # keep simulating forward when the target is ahead in the current chunk
+        if game is None or not (self.chunks[index][0] <= game.tick <= tick):
+            keyframe, _ = self._read_chunk(index)
+            game = self.game = game or self._new_game()
+            game.restore(unpack_snapshot(keyframe))
+            game.pending_actions.clear()  # they are also the first tick's command record
+            game.control_mode = "api"
+        for _ in self._advance(tick):
+            pass
+        return game
+
+
+    def _advance(self, target):
+        """ Re-apply the recorded actions until `target`, yielding the Game after every tick. """
+        game = self.game
+        while game.tick < target:
+            index = max(k for k, chunk in enumerate(self.chunks) if chunk[0] <= game.tick)
+            first_tick = self.chunks[index][0]
+            _, ticks = self._read_chunk(index)
+            for actions in ticks[game.tick - first_tick:target - first_tick]:
+                for player_id, action, side in actions:
+                    game.queue_action(player_id, action, side)
+                game.update()
+                yield game
+
+
+    def ticks(self, start=None, end=None, step=1):
+        """ Yield the Game at every `step`-th tick from `start` to `end`, simulating headless. """
+        start = self.first_tick if start is None else start
+        end = self.last_tick if end is None else min(end, self.last_tick)
+        game = self.seek(start)
+        yield game
+        for game in self._advance(end):
+            if (game.tick - start) % step == 0:
+                yield game
+
+
+    def render(self, tick, effects=None):
+        """ Surface of the match at `tick`, drawn like the live video stream. """
+        from pyrate.ui.renderer import render_frame_to_surface
+        return render_frame_to_surface(self.seek(tick), effects)
+
+
+    def export_frames(self, directory, start=None, end=None, step=1, extension="png"):
+        """ Save one image per `step` ticks to `directory`; returns the number of frames written. """
+        import pygame
+        from pyrate.ui.renderer import FrameRenderer
+        os.makedirs(directory, exist_ok=True)
+        renderer = FrameRenderer()
+        count = 0
+        for game in self.ticks(start, end, step):
+            surface = renderer.render(game.view(sensors=renderer.debug))
+            pygame.image.save(surface, os.path.join(directory, f"frame_{game.tick:07d}.{extension}"))
+            count += 1
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export a PyRate replay.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="print metadata and the final result")
+    info.add_argument("replay")
+    export = commands.add_parser("export", help="render frames to image files")
+    export.add_argument("replay")
+    export.add_argument("directory")
+    export.add_argument("--start", type=int, default=None)
+    export.add_argument("--end", type=int, default=None)
+    export.add_argument("--step", type=int, default=1)
+    args = parser.parse_args()
+
+    player = ReplayPlayer(args.replay)
+    if args.command == "info":
+        game = player.seek(player.last_tick)
+        print(json.dumps({**player.meta, "first_tick": player.first_tick, "last_tick": player.last_tick,
+                          "chunks": len(player.chunks), "state": game.state,
+                          "health": [ship.health for ship in game.ships_by_uid]}, indent=2))
+    else:
+        count = player.export_frames(args.directory, args.start, args.end, args.step)
+        print(f"Wrote {count} frames to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
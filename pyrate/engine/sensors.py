@@ -0,0 +1,123 @@
+# pyrate/engine/sensors.py
+import numpy as np
+
+# Distance bands: readings closer than the limit get uniform noise of these ranges
+NEAR_RANGE, MID_RANGE = 200, 400
+NEAR_NOISE = (10, 7)   # (distance, angle in degrees)
+MID_NOISE = (25, 10)
+LOW_HEALTH = 40
+
+_BAND_NOISE = np.array([NEAR_NOISE, MID_NOISE, (0, 0)], dtype=np.float64)  # indexed by band
+
+
+def _uniform(rng, shape):
+    """ Uniform floats in [-1, 1) drawn from a random.Random in one call. """
+    bits = np.frombuffer(rng.randbytes(8 * int(np.prod(shape))), dtype=np.uint64)
+    return ((bits >> np.uint64(11)) * (2.0 / 2 ** 53) - 1.0).reshape(shape)
+
+
+class SensorEngine:
+    """
+    Sensor readings of every ship afloat, computed together with NumPy (one
+    distance and bearing matrix) the first time one is asked for in a tick,
+    then served from that result until the next tick. Noise is drawn once
+    per tick, so every poll within a tick sees the same reading. Players
+    see each other as friendly, and so do enemies.
+
+    Noise comes from the Game's sensor_rng, unless the engine has its own
+    `rng`: the one drawing debug sensors (Game.view(sensors=True)) does, so
+    that drawing them never changes the readings agents get.
+    """
+
+    def __init__(self, game, rng=None):
+        self.game = game
+        self.rng = rng  # noise generator, the Game's sensor_rng when None
+        self._tick = None
+        self._index = {}  # uid -> row and column of the ship in the matrices
+        self._rows = {}   # row -> reading already turned into dicts
+
+
+    def invalidate(self):
+        """ Drop the cached readings, for state changes that do not advance the tick. """
+        self._tick = None
+
+
+    def _compute(self):
+        game = self.game
+        ships = game.player_ships + game.enemy_ships  # observers and targets, in reading order
+        n_players = len(game.player_ships)
+        is_player = np.arange(len(ships)) < n_players
+
+        xs = np.array([s.x for s in ships], dtype=np.float64)
+        ys = np.array([s.y for s in ships], dtype=np.float64)
+        dx = xs[None, :] - xs[:, None]  # observer x target
+        dy = ys[None, :] - ys[:, None]
+        dist = np.hypot(dx, dy)
+        bearing = np.degrees(np.arctan2(dy, dx))
+
+        band = (dist >= NEAR_RANGE).astype(np.intp) + (dist >= MID_RANGE)  # 0 near, 1 mid, 2 far
+        noisy = np.flatnonzero(band < 2)
+        rng = game.sensor_rng if self.rng is None else self.rng
+        noise = _BAND_NOISE[band.flat[noisy]] * _uniform(rng, (len(noisy), 2))
+        dist.flat[noisy] += noise[:, 0]
+        bearing.flat[noisy] += noise[:, 1]
+
+        friendly = is_player[:, None] == is_player[None, :]
+        # mid-range contacts are unidentified unless friendly
+        masked = (band == 1) & ~friendly
+
+        self._index = {ship.uid: k for k, ship in enumerate(ships)}
+        self._names = [s.name for s in ships]
+        self._living = [s.is_living for s in ships]
+        self._health = ["low" if s.health <= LOW_HEALTH else "high" for s in ships]
+        self._dist = dist
+        self._bearing = bearing
+        self._friendly = friendly
+        self._masked = masked
+        self._rows = {}
+        self._tick = game.tick
+
+
+    def matrices(self):
+        """
+        Readings of the current tick as arrays, observer x target over the player
+        ships then the enemies afloat: (distance, angle, friendly, unidentified, living,
+        low health). Shared with reading(), do not modify them.
+        """
+        if self._tick != self.game.tick:
+            self._compute()
+        low_health = [health == "low" for health in self._health]
+        return self._dist, self._bearing, self._friendly, self._masked, self._living, low_health
+
+
+    def _row(self, k):
+        names, living, health = self._names, self._living, self._health
+        friendly = self._friendly[k].tolist()
+        masked = self._masked[k].tolist()
+        dist = self._dist[k].tolist()
+        bearing = self._bearing[k].tolist()
+        row = []
+        for j in range(len(names)):
+            if j == k:
+                continue
+            row.append({
+                "entity": "friendly" if friendly[j] else ("Unknown" if masked[j] else names[j]),
+                "distance": dist[j],
+                "angle": bearing[j],
+                "is_living": living[j],
+                "health": health[j],
+            })
+        return row
+
+
+    def reading(self, ship):
+        """ Readings of every other ship as seen from `ship`; the dicts are shared, do not modify them. """
+        if self._tick != self.game.tick:
+            self._compute()
+        k = self._index.get(ship.uid)
+        if k is None or self.game.ships_by_uid[ship.uid] is not ship:
+            raise ValueError("Sensor readings exist for player ships and enemies still afloat only")
+        row = self._rows.get(k)
+        if row is None:
+            row = self._rows[k] = self._row(k)
+        return list(row)
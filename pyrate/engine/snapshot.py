@@ -0,0 +1,169 @@
+# pyrate/engine/snapshot.py
+"""
+Flat snapshots of a Game's mutable state.
+
+A GameSnapshot is immutable, so it can be kept and shared between rollouts
+without copying. Everything Game.update() reads is in it,
+including both random generators and the fire cooldown timestamps, so a
+restored Game plays out exactly like the original given the same actions.
+pack_snapshot() turns one into bytes, for replays or other processes;
+the bytes start with FORMAT_VERSION and only that version is read back.
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from pyrate.engine.entities.projectile import ProjectilePool
+from pyrate.engine.input import ACTIONS
+
+STATES = ("playing", "A victory", "B victory", "gameover")
+CONTROL_MODES = ("api", "keyboard")
+SIDES = ("left", "right")
+
+FORMAT_VERSION = 2  # of pack_snapshot() bytes; 2 counts ships and numbers them in 16 bits
+
+GameSnapshot = namedtuple("GameSnapshot", [
+    "tick", "state", "control_mode",
+    "rng", "sensor_rng",          # random.Random.getstate() tuples
+    "ships",                      # per uid: SHIP_FIELDS values
+    "enemies",                    # per enemy uid: ENEMY_FIELDS values
+    "alive_enemies",              # uids of Game.enemy_ships, in order
+    "projectiles",                # read-only (PROJECTILE_ROWS, n) array, in firing order
+    "next_serial",
+    "pending_actions",            # (player_id, action, side) queued for the next tick
+])
+
+SHIP_FIELDS = ("x", "y", "angle", "speed", "rotation_velocity", "health",
+               "last_fire_left", "last_fire_right", "damage_dealt", "is_living", "temp_damage_boost")
+ENEMY_FIELDS = ("anchor_x", "anchor_y", "time")
+PROJECTILE_ROWS = ProjectilePool.FIELDS + ("owner", "serial")  # owner and serial stored as floats
+
+_GAME = struct.Struct("<BIBB")           # format version, tick, state, control mode
+_SHIP = struct.Struct("<9d??")           # SHIP_FIELDS
+_ENEMY = struct.Struct("<2di")           # ENEMY_FIELDS
+_RNG = struct.Struct("<B625I?d")         # version, Mersenne Twister state, cached gauss
+_ACTION = struct.Struct("<BBB")          # player, action, side
+
+
+def take_snapshot(game):
+    pool = game.projectiles
+    slots = pool.live_slots()
+    rows = [getattr(pool, name)[slots] for name in ProjectilePool.FIELDS]
+    projectiles = np.stack(rows + [pool.owner[slots], pool.serial[slots]]).astype(np.float64, copy=False)
+    projectiles.flags.writeable = False
+
+    n_players = len(game.player_ships)
+    return GameSnapshot(
+        game.tick, game.state, game.control_mode,
+        game.rng.getstate(), game.sensor_rng.getstate(),
+        tuple((s.x, s.y, s.angle, s.speed, s.rotation_velocity, s.health,
+               s.last_fire_time["left"], s.last_fire_time["right"],
+               s.damage_dealt, s.is_living, s.temp_damage_boost) for s in game.ships_by_uid),
+        tuple((e.anchor_x, e.anchor_y, e.time) for e in game.ships_by_uid[n_players:]),
+        tuple(e.uid for e in game.enemy_ships),
+        projectiles, pool._next_serial,
+        tuple(game.pending_actions),
+    )
+
+
+def restore_snapshot(game, snapshot):
+    """ Overwrite a Game with the same players and enemies as the snapshot's. """
+    if len(snapshot.ships) != len(game.ships_by_uid):
+        raise ValueError(f"Snapshot has {len(snapshot.ships)} ships, the game {len(game.ships_by_uid)}")
+    game.tick, game.state, game.control_mode = snapshot.tick, snapshot.state, snapshot.control_mode
+    game.events.tick = snapshot.tick
+    game.rng.setstate(snapshot.rng)
+    game.sensor_rng.setstate(snapshot.sensor_rng)
+
+    for ship, values in zip(game.ships_by_uid, snapshot.ships):
+        (ship.x, ship.y, ship.angle, ship.speed, ship.rotation_velocity, ship.health, left, right,
+         ship.damage_dealt, ship.is_living, ship.temp_damage_boost) = values
+        ship.last_fire_time = {"left": left, "right": right}
+    n_players = len(game.player_ships)
+    for enemy, values in zip(game.ships_by_uid[n_players:], snapshot.enemies):
+        enemy.anchor_x, enemy.anchor_y, enemy.time = values
+    game.enemy_ships = [game.ships_by_uid[uid] for uid in snapshot.alive_enemies]
+
+    columns = snapshot.projectiles
+    n_fields = len(ProjectilePool.FIELDS)
+    game.projectiles.load(columns[:n_fields], columns[n_fields], columns[n_fields + 1], snapshot.next_serial)
+    game.pending_actions.clear()
+    game.pending_actions.extend(snapshot.pending_actions)
+    game.impacts.clear()
+    game.sensors.invalidate()
+    if game.debug_sensors is not None:
+        game.debug_sensors.invalidate()
+
+
+# -- Bytes ---------------------------------------------------------------------
+
+def _pack_rng(state):
+    version, internal, gauss_next = state
+    return _RNG.pack(version, *internal, gauss_next is not None, gauss_next or 0.0)
+
+
+def _unpack_rng(data, offset):
+    values = _RNG.unpack_from(data, offset)
+    return (values[0], values[1:626], values[627] if values[626] else None), offset + _RNG.size
+
+
+def pack_snapshot(snapshot):
+    """ Compact bytes of a snapshot, read back by unpack_snapshot(). """
+    projectiles = snapshot.projectiles
+    n_fields = len(ProjectilePool.FIELDS)
+    count = projectiles.shape[1]
+    parts = [
+        _GAME.pack(FORMAT_VERSION, snapshot.tick, STATES.index(snapshot.state),
+                   CONTROL_MODES.index(snapshot.control_mode)),
+        _pack_rng(snapshot.rng),
+        _pack_rng(snapshot.sensor_rng),
+        struct.pack("<HH", len(snapshot.ships), len(snapshot.enemies)),
+    ]
+    parts.extend(_SHIP.pack(*values) for values in snapshot.ships)
+    parts.extend(_ENEMY.pack(*values) for values in snapshot.enemies)
+    parts.append(struct.pack(f"<H{len(snapshot.alive_enemies)}H", len(snapshot.alive_enemies), *snapshot.alive_enemies))
+    parts.append(struct.pack("<Iq", count, snapshot.next_serial))
+    parts.append(np.ascontiguousarray(projectiles[:n_fields]).tobytes())
+    parts.append(projectiles[n_fields].astype(np.int32).tobytes())
+    parts.append(projectiles[n_fields + 1].astype(np.int64).tobytes())
+    parts.append(struct.pack("<H", len(snapshot.pending_actions)))
+    parts.extend(_ACTION.pack(player_id, ACTIONS.index(action), SIDES.index(side))
+                 for player_id, action, side in snapshot.pending_actions)
+    return b"".join(parts)
+
+
+def unpack_snapshot(data):
+    version, tick, state, control_mode = _GAME.unpack_from(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Snapshot format version {version}, expected {FORMAT_VERSION}")
+    rng, offset = _unpack_rng(data, _GAME.size)
+    sensor_rng, offset = _unpack_rng(data, offset)
+    n_ships, n_enemies = struct.unpack_from("<HH", data, offset)
+    offset += 4
+    ships = tuple(_SHIP.unpack_from(data, offset + k * _SHIP.size) for k in range(n_ships))
+    offset += n_ships * _SHIP.size
+    enemies = tuple(_ENEMY.unpack_from(data, offset + k * _ENEMY.size) for k in range(n_enemies))
+    offset += n_enemies * _ENEMY.size
+    (n_alive,) = struct.unpack_from("<H", data, offset)
+    alive_enemies = struct.unpack_from(f"<{n_alive}H", data, offset + 2)
+    offset += 2 + 2 * n_alive
+
+    count, next_serial = struct.unpack_from("<Iq", data, offset)
+    offset += struct.calcsize("<Iq")
+    n_fields = len(ProjectilePool.FIELDS)
+    fields = np.frombuffer(data, dtype=np.float64, count=n_fields * count, offset=offset).reshape(n_fields, count)
+    offset += fields.nbytes
+    owners = np.frombuffer(data, dtype=np.int32, count=count, offset=offset)
+    offset += owners.nbytes
+    serials = np.frombuffer(data, dtype=np.int64, count=count, offset=offset)
+    offset += serials.nbytes
+    projectiles = np.vstack([fields, owners, serials]).astype(np.float64)
+    projectiles.flags.writeable = False
+
+    (n_pending,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    pending_actions = tuple((player_id, ACTIONS[action], SIDES[side])
+                            for player_id, action, side in _ACTION.iter_unpack(data[offset:offset + n_pending * _ACTION.size]))
+    return GameSnapshot(tick, STATES[state], CONTROL_MODES[control_mode], rng, sensor_rng,
+                        ships, enemies, alive_enemies, projectiles, next_serial, pending_actions)
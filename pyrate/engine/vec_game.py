@@ -0,0 +1,603 @@
+# pyrate/engine/vec_game.py
+import math
+
+import numpy as np
+
+from pyrate.engine.enemy_ai import _degrees_towards, _wrap180
+from pyrate.engine.entities.ship import Ship
+from pyrate.engine.entities.enemy import EnemyShip
+from pyrate.engine.entities.projectile import (CANNONBALL_SPEED, CANNONBALL_RANGE, CANNONBALL_RADIUS,
+                                              CANNONBALL_DAMAGE)
+from pyrate.engine.game import PLAYER_SPAWNS, _copy_rng
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+
+# Per-player action codes accepted by VecGame.step()
+VEC_ACTIONS = ("noop", "accelerate", "decelerate", "turn_left", "turn_right", "fire_left", "fire_right")
+
+# Values of VecGame.state, mirroring Game.state
+PLAYING, A_VICTORY, B_VICTORY, GAMEOVER = 0, 1, 2, 3
+STATE_NAMES = ("playing", "A victory", "B victory", "gameover")
+
+LEFT, RIGHT = 0, 1
+
+# Ship parameters are read from default instances, cannonball ones from projectile.py, so both engines stay in sync
+_ship = Ship(0, 0)
+_enemy = EnemyShip(0, 0)
+
+# Bounding-circle radii, used to skip SAT tests that cannot succeed
+_SHIP_RADIUS = math.hypot(_ship.height, _ship.width) / 2
+_BALL_RADIUS = CANNONBALL_RADIUS * math.sqrt(2)
+_EPS = 1e-6
+_SHIP_REACH_SQ = (2 * _SHIP_RADIUS) ** 2 + 1e-3
+
+
+def sat_collide(poly1, poly2):
+    """
+    Batched version of Game.collide for (K, 4, 2) arrays of polygons.
+    Returns a (K,) bool mask, True where the polygons overlap.
+    """
+    separated = np.zeros(len(poly1), dtype=bool)
+    for points in (poly1, poly2):
+        edges = np.roll(points, -1, axis=1) - points
+        ax = -edges[:, :, 1, None]
+        ay = edges[:, :, 0, None]
+        proj1 = ax * poly1[:, None, :, 0] + ay * poly1[:, None, :, 1]
+        proj2 = ax * poly2[:, None, :, 0] + ay * poly2[:, None, :, 1]
+        separated |= ((proj1.max(axis=2) < proj2.min(axis=2)) |
+                      (proj2.max(axis=2) < proj1.min(axis=2))).any(axis=1)
+    return ~separated
+
+
+def _nonzero_columns(mask):
+    """ (row, column) indices of the set entries of a column-major (n_envs, n) mask, column by column. """
+    columns, rows = np.divmod(np.flatnonzero(mask.T), mask.shape[0])
+    return rows, columns
+
+
+def _degrees_towards_columns(mask, dy, dx):
+    """ _degrees_towards for column-major (n_envs, n) arrays. """
+    return _degrees_towards(mask.T.ravel(), dy.T.ravel(), dx.T.ravel()).reshape(mask.T.shape).T
+
+
+class VecGame:
+    """
+    Headless engine stepping `n_envs` independent matches at once.
+    Ship, enemy and projectile state lives in NumPy arrays with one row per
+    match; Game.update() is replayed step by step as batched array operations.
+    Ships are stored as columns, players first then enemies, in column-major
+    order so that each ship's column is a contiguous vector over matches.
+
+    VecGame(seed=...) draws spawns and patrol headings from one NumPy
+    generator for the whole batch, so its matches are not those of
+    Game(seed=...). The parity contract is from_games(): a batch built from
+    Game objects plays out exactly like them given the same actions.
+    """
+
+    def __init__(self, n_envs, n_players=4, n_enemies=3, min_distance=300, seed=None, max_projectiles=None):
+        if n_players > len(PLAYER_SPAWNS):
+            raise ValueError("Number of players must be at most 6.")
+        self.n_envs = n_envs
+        self.n_players = n_players
+        self.n_enemies = n_enemies
+        self.n_ships = n_players + n_enemies
+        # ship pairs in (i, j) order, and where the pairs of each ship i start
+        self._pair_i, self._pair_j = np.triu_indices(self.n_ships, 1)
+        self._pair_starts = np.searchsorted(self._pair_i, np.arange(self.n_ships - 1)).tolist()
+        self.min_distance = min_distance
+        self.max_projectiles = max_projectiles or 4 * self.n_ships
+        self.rng = np.random.default_rng(seed)
+        self.match_rngs = None  # per-match random.Random for the patrol draws, see from_games()
+
+        B, S, M = n_envs, self.n_ships, self.max_projectiles
+        self.team_a = np.array([PLAYER_SPAWNS[i][3] == "A" for i in range(n_players)], dtype=bool)
+
+        # Ships
+        self.x = np.zeros((B, S), order="F")
+        self.y = np.zeros((B, S), order="F")
+        self.angle = np.zeros((B, S), order="F")
+        self.speed = np.zeros((B, S), order="F")
+        self.rotation_velocity = np.zeros((B, S), order="F")
+        self.health = np.zeros((B, S), order="F")
+        self.is_living = np.zeros((B, S), dtype=bool, order="F")
+        self.present = np.zeros((B, S), dtype=bool, order="F")  # destroyed enemies are removed from play
+        self.last_fire = np.zeros((B, S, 2), order="F")  # simulation time of the last shot, per side
+        self.anchor_x = np.zeros((B, n_enemies), order="F")
+        self.anchor_y = np.zeros((B, n_enemies), order="F")
+
+        # Projectile pool
+        self.proj_x = np.zeros((B, M))
+        self.proj_y = np.zeros((B, M))
+        self.proj_start_x = np.zeros((B, M))
+        self.proj_start_y = np.zeros((B, M))
+        self.proj_vx = np.zeros((B, M))
+        self.proj_vy = np.zeros((B, M))
+        self.proj_damage = np.zeros((B, M))
+        self.proj_alive = np.zeros((B, M), dtype=bool)
+
+        self.state = np.zeros(B, dtype=np.int8)
+        self.tick = np.zeros(B, dtype=np.int64)
+        self.reset()
+
+
+    @classmethod
+    def from_games(cls, games, max_projectiles=None):
+        """
+        Build a batch whose matches start from the current state of the given Game objects.
+        Each match draws its patrol headings from a copy of its Game's generator, in the
+        same order as Game.update(), so it stays in step with the Game given the same
+        actions (the VEC_ACTIONS code of each Game.queue_action() action and side).
+        A match re-spawned by reset() draws from `rng` again and no longer follows its Game.
+        """
+        first = games[0]
+        n_players = len(first.player_ships)
+        n_enemies = max(len(g.enemy_ships) for g in games)
+        vec = cls(len(games), n_players, n_enemies, first.min_distance, max_projectiles=max_projectiles)
+        vec.present[:] = False
+        vec.is_living[:] = False
+        vec.proj_alive[:] = False
+        for b, game in enumerate(games):
+            if len(game.player_ships) != n_players:
+                raise ValueError("All games must have the same number of players.")
+            for s, ship in enumerate(game.player_ships + game.enemy_ships):
+                vec.x[b, s], vec.y[b, s], vec.angle[b, s] = ship.x, ship.y, ship.angle
+                vec.speed[b, s] = ship.speed
+                vec.rotation_velocity[b, s] = ship.rotation_velocity
+                vec.health[b, s] = ship.health
+                vec.is_living[b, s] = ship.is_living
+                vec.present[b, s] = True
+                vec.last_fire[b, s] = ship.last_fire_time["left"], ship.last_fire_time["right"]
+            for e, enemy in enumerate(game.enemy_ships):
+                vec.anchor_x[b, e], vec.anchor_y[b, e] = enemy.anchor_x, enemy.anchor_y
+            pool = game.projectiles
+            slots = pool.live_slots()[:vec.max_projectiles]
+            m = len(slots)
+            vec.proj_x[b, :m], vec.proj_y[b, :m] = pool.x[slots], pool.y[slots]
+            vec.proj_start_x[b, :m], vec.proj_start_y[b, :m] = pool.start_x[slots], pool.start_y[slots]
+            vec.proj_vx[b, :m], vec.proj_vy[b, :m] = pool.vx[slots], pool.vy[slots]
+            vec.proj_damage[b, :m] = pool.damage[slots]
+            vec.proj_alive[b, :m] = True
+            vec.state[b] = STATE_NAMES.index(game.state)
+            vec.tick[b] = game.tick
+        vec.match_rngs = [_copy_rng(game.rng) for game in games]
+        return vec
+
+
+    def reset(self, mask=None):
+        """ Re-spawn every match, or only the ones selected by the (n_envs,) bool `mask`. """
+        idx = np.arange(self.n_envs) if mask is None else np.flatnonzero(mask)
+        if not idx.size:
+            return
+        P = self.n_players
+
+        for s in range(P):
+            x, y, angle, _ = PLAYER_SPAWNS[s]
+            self.x[idx, s], self.y[idx, s], self.angle[idx, s] = x, y, angle
+        self._spawn_enemies(idx)
+
+        self.speed[idx] = 0
+        self.rotation_velocity[idx] = 0
+        self.health[idx] = _ship.health
+        self.is_living[idx] = True
+        self.present[idx] = True
+        self.last_fire[idx] = -_ship.cooldown
+        self.anchor_x[idx] = self.x[idx, P:]
+        self.anchor_y[idx] = self.y[idx, P:]
+        self.proj_alive[idx] = False
+        self.state[idx] = PLAYING
+        self.tick[idx] = 0
+        if self.match_rngs is not None:
+            for b in idx.tolist():
+                self.match_rngs[b] = None
+
+
+    def _spawn_enemies(self, idx):
+        """ Rejection-sample enemy positions at least `min_distance` from players and earlier enemies. """
+        P = self.n_players
+        for e in range(self.n_enemies):
+            pending = idx
+            while pending.size:
+                x = self.rng.integers(0, SCREEN_WIDTH + 1, pending.size)
+                y = self.rng.integers(0, SCREEN_HEIGHT + 1, pending.size)
+                others = P + e
+                too_close = (np.hypot(x[:, None] - self.x[pending, :others],
+                                      y[:, None] - self.y[pending, :others]) < self.min_distance).any(axis=1)
+                ok = ~too_close
+                done = pending[ok]
+                self.x[done, P + e], self.y[done, P + e], self.angle[done, P + e] = x[ok], y[ok], 0
+                pending = pending[too_close]
+
+
+    def step(self, actions=None):
+        """
+        Advance every running match by one tick. `actions` is an optional
+        (n_envs, n_players) integer array of VEC_ACTIONS codes.
+        Finished matches are left untouched until reset().
+        """
+        active = self.state == PLAYING
+        if not active.any():
+            return
+        self.tick += active
+        P = self.n_players
+
+        # 0) agent actions
+        players = slice(0, P)
+        if actions is not None:
+            codes = np.where(active[:, None], np.asarray(actions), 0)
+            self._accelerate(codes == 1, players)
+            self._decelerate(codes == 2, players)
+            self._turn((codes == 4).astype(np.int8) - (codes == 3), players)
+            b, s = np.nonzero((codes == 5) | (codes == 6))
+            self._fire(b, s, np.where(codes[b, s] == 6, RIGHT, LEFT))
+
+        # 1) player physics
+        self._physics(active, players)
+
+        # 2) enemies, targeting the nearest player
+        moving = active[:, None] & self.present[:, P:]
+        if moving.any():
+            self._update_enemies(moving)
+
+        # 3) projectiles
+        live = np.flatnonzero(self.proj_alive & active[:, None])
+        px, py = self.proj_x.reshape(-1), self.proj_y.reshape(-1)
+        px[live] += self.proj_vx.reshape(-1)[live]
+        py[live] += self.proj_vy.reshape(-1)[live]
+        travel_x = px[live] - self.proj_start_x.reshape(-1)[live]
+        travel_y = py[live] - self.proj_start_y.reshape(-1)[live]
+        exceeded = travel_x * travel_x + travel_y * travel_y > CANNONBALL_RANGE ** 2
+        self.proj_alive.reshape(-1)[live[exceeded]] = False
+
+        # collisions & end-game
+        self._handle_projectile_hits(active)
+        self._handle_ship_collisions(active)
+        self._check_end_conditions(active)
+
+
+    # -- Ship primitives (see Ship), applied to ships `s` (a column or a slice of them) where `mask` is set --
+
+    def _accelerate(self, mask, s, max_speed=_ship.max_speed):
+        speed = self.speed[:, s]
+        np.copyto(speed, np.minimum(speed + _ship.acceleration, max_speed), where=mask)
+
+
+    def _decelerate(self, mask, s):
+        speed = self.speed[:, s]
+        np.copyto(speed, np.maximum(speed - _ship.acceleration, 0), where=mask)
+
+
+    def _turn(self, direction, s):
+        """ Ship.turn_right where direction > 0, Ship.turn_left where direction < 0. """
+        can_turn = self.speed[:, s] > 0.1
+        rv = self.rotation_velocity[:, s]
+        np.copyto(rv, np.minimum(rv + _ship.rotation_acceleration, _ship.rotation_max_speed),
+                  where=can_turn & (direction > 0))
+        np.copyto(rv, np.maximum(rv - _ship.rotation_acceleration, -_ship.rotation_max_speed),
+                  where=can_turn & (direction < 0))
+
+
+    def _steer(self, mask, s, target_angle, deadzone=5):
+        """ EnemyShip._steer_towards """
+        diff = _wrap180(target_angle - self.angle[:, s])
+        self._turn(np.where(mask & (np.abs(diff) > deadzone), diff, 0), s)
+
+
+    def _physics(self, mask, cols):
+        """ Ship.update for ships `cols` where the (n_envs,) or (n_envs, n_cols) `mask` is set. """
+        speed = self.speed[:, cols]
+        rv = self.rotation_velocity[:, cols]
+        # friction towards zero: max(v - f, 0) for v > 0, min(v + f, 0) for v < 0
+        new_speed = np.copysign(np.maximum(np.abs(speed) - _ship.friction, 0), speed)
+        new_rv = np.copysign(np.maximum(np.abs(rv) - _ship.rotation_friction, 0), rv)
+        angle = self.angle[:, cols] + new_rv
+        rad = np.radians(angle)
+        # np.minimum/np.maximum rather than np.clip, which is several times slower on small arrays
+        x = np.minimum(np.maximum(self.x[:, cols] + new_speed * np.cos(rad), 20), SCREEN_WIDTH - 20)
+        y = np.minimum(np.maximum(self.y[:, cols] + new_speed * np.sin(rad), 20), SCREEN_HEIGHT - 20)
+        if mask.all():
+            speed[...], rv[...], self.angle[:, cols], self.x[:, cols], self.y[:, cols] = \
+                new_speed, new_rv, angle, x, y
+            return
+        mask = np.broadcast_to(mask.reshape(len(mask), -1), speed.shape)
+        np.copyto(speed, new_speed, where=mask)
+        np.copyto(rv, new_rv, where=mask)
+        np.copyto(self.angle[:, cols], angle, where=mask)
+        np.copyto(self.x[:, cols], x, where=mask)
+        np.copyto(self.y[:, cols], y, where=mask)
+
+
+    def _fire(self, idx, s, side):
+        """
+        Ship.fire for ships `s` of matches `idx` (in ascending order) on `side`, with the cooldown
+        measured on the simulation clock (Game.clock).
+        """
+        idx, s, side = np.broadcast_arrays(idx, s, side)
+        now = self.tick[idx] / FPS
+        ready = ~(now - self.last_fire[idx, s, side] < _ship.cooldown)
+        idx, s, side, now = idx[ready], s[ready], side[ready], now[ready]
+        if not idx.size:
+            return
+        self.last_fire[idx, s, side] = now
+
+        cannon_angle = (self.angle[idx, s] + np.where(side == RIGHT, 90, -90)) % 360
+        rad = np.radians(cannon_angle)
+        cos_a, sin_a = np.cos(rad), np.sin(rad)
+
+        # the k-th shot of a match takes its k-th free slot; a full pool drops the shot
+        rank = np.arange(idx.size) - np.searchsorted(idx, idx)
+        taken = np.cumsum(~self.proj_alive[idx], axis=1) > rank[:, None]
+        has_slot = taken[:, -1]
+        slot = taken.argmax(axis=1)[has_slot]
+        idx, s, cos_a, sin_a = idx[has_slot], s[has_slot], cos_a[has_slot], sin_a[has_slot]
+        x = self.x[idx, s] + cos_a * 20
+        y = self.y[idx, s] + sin_a * 20
+        self.proj_x[idx, slot], self.proj_y[idx, slot] = x, y
+        self.proj_start_x[idx, slot], self.proj_start_y[idx, slot] = x, y
+        self.proj_vx[idx, slot] = cos_a * CANNONBALL_SPEED
+        self.proj_vy[idx, slot] = sin_a * CANNONBALL_SPEED
+        self.proj_damage[idx, slot] = CANNONBALL_DAMAGE
+        self.proj_alive[idx, slot] = True
+
+
+    def _apply_damage(self, idx, s, amount):
+        health = np.maximum(self.health[idx, s] - amount, 0)
+        self.health[idx, s] = health
+        self.is_living[idx, s] &= health != 0
+
+
+    def _ship_hitboxes(self, idx, s):
+        """ Ship.get_hitbox for ship `s` of matches `idx`, as a (K, 4, 2) array. """
+        hw, hh = _ship.height / 2, _ship.width / 2
+        corners = np.array([(-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh)])
+        rad = np.radians(self.angle[idx, s])[:, None]
+        cos_a, sin_a = np.cos(rad), np.sin(rad)
+        rx = corners[:, 0] * cos_a - corners[:, 1] * sin_a
+        ry = corners[:, 0] * sin_a + corners[:, 1] * cos_a
+        return np.stack((self.x[idx, s][:, None] + rx, self.y[idx, s][:, None] + ry), axis=2)
+
+
+    # -- Simulation phases (see Game) ------------------------------------------
+
+    def _update_enemies(self, mask):
+        """ EnemyShip.update for every enemy selected by the (n_envs, n_enemies) `mask`, like EnemyAI.update. """
+        P = self.n_players
+        enemies = slice(P, self.n_ships)
+        ex, ey = self.x[:, enemies], self.y[:, enemies]
+        angle, speed = self.angle[:, enemies], self.speed[:, enemies]
+
+        # closest player, the first one on ties (distances that are only compared are kept squared);
+        # pairwise arrays are laid out ship by ship, (n_enemies, n_players, n_envs), like the columns
+        x, y = self.x.T, self.y.T
+        to_px = x[None, :P] - x[P:, None]
+        to_py = y[None, :P] - y[P:, None]
+        dist_sq = to_px * to_px + to_py * to_py
+        # argmin over a middle axis copies the array; P is small, so compare player by player
+        closest = np.zeros((self.n_enemies, 1, self.n_envs), dtype=np.intp)
+        nearest = dist_sq[:, 0].copy()
+        for p in range(1, P):
+            closer = dist_sq[:, p] < nearest
+            closest[:, 0][closer] = p
+            np.minimum(nearest, dist_sq[:, p], out=nearest)
+        dx = np.take_along_axis(to_px, closest, axis=1)[:, 0].T
+        dy = np.take_along_axis(to_py, closest, axis=1)[:, 0].T
+        pa = np.take_along_axis(self.angle.T[None, :P], closest, axis=1)[:, 0].T
+        dist_to_player = np.sqrt(dx * dx + dy * dy)
+
+        # borders
+        near_edge = mask & ((ex < 60) | (ex > SCREEN_WIDTH - 60) |
+                            (ey < 60) | (ey > SCREEN_HEIGHT - 60))
+        if near_edge.any():
+            angle_to_center = _degrees_towards_columns(near_edge, SCREEN_HEIGHT / 2 - ey, SCREEN_WIDTH / 2 - ex)
+            diff = _wrap180(angle_to_center - angle)
+            self._turn(np.where(near_edge & (np.abs(diff) > 10), diff, 0), enemies)  # past _steer's deadzone of 3
+            self._accelerate(near_edge & (speed < _enemy.max_speed * 0.5), enemies)
+
+        in_pursuit = mask & (dist_to_player < _enemy.agro_radius)
+        if in_pursuit.any():
+            parallel_mode = in_pursuit & (np.abs(dist_to_player - _enemy.preferred_distance) <= 20)
+            angle_to_player = _degrees_towards_columns(in_pursuit, dy, dx)
+            target_angle = np.where(dist_to_player > _enemy.preferred_distance + 20, angle_to_player + 30,
+                                    np.where(dist_to_player < _enemy.preferred_distance - 20,
+                                             angle_to_player - 150, pa + 90))
+            self._steer(in_pursuit, enemies, target_angle)
+            self._accelerate(in_pursuit, enemies)
+
+            if parallel_mode.any():
+                b, e = _nonzero_columns(parallel_mode)
+                by_match = np.argsort(b, kind="stable")
+                b, e = b[by_match], e[by_match]
+                right = _wrap180(target_angle[b, e] - angle[b, e]) > 0
+                self._fire(b, P + e, np.where(right, RIGHT, LEFT))
+
+        patrolling = mask & ~in_pursuit
+        if patrolling.any():
+            # one draw per patrolling enemy, in list order within a match
+            b, e = _nonzero_columns(patrolling)
+            patrol_angle = np.zeros(patrolling.shape, order="F")
+            patrol_angle[b, e] = self._patrol_draws(b)
+            self._steer(patrolling, enemies, patrol_angle)
+            to_anchor_x = self.anchor_x - ex
+            to_anchor_y = self.anchor_y - ey
+            far = patrolling & (to_anchor_x * to_anchor_x + to_anchor_y * to_anchor_y
+                                > _enemy.patrol_radius ** 2)
+            if far.any():
+                self._steer(far, enemies, _degrees_towards_columns(far, to_anchor_y, to_anchor_x))
+            self._accelerate(patrolling, enemies, max_speed=_enemy.max_speed * 0.5)
+
+        # enemies with no other one in reach (the avoidance radius plus a tick of movement, including
+        # the way back inside the borders) move at once; the others avoid each other in list order,
+        # seeing the earlier ones already moved
+        outside = (np.maximum(np.maximum(20 - ex, ex - (SCREEN_WIDTH - 20)), 0) +
+                   np.maximum(np.maximum(20 - ey, ey - (SCREEN_HEIGHT - 20)), 0))
+        reach = (_enemy.avoidance_radius + np.max(np.abs(speed), where=mask, initial=0) +
+                 np.max(outside, where=mask, initial=0))
+        gap_x = x[P:, None] - x[None, P:]
+        gap_y = y[P:, None] - y[None, P:]
+        close = (gap_x * gap_x + gap_y * gap_y < reach * reach) & mask.T[:, None] & mask.T[None]
+        diagonal = np.arange(self.n_enemies)
+        close[diagonal, diagonal] = False
+        crowded = close.any(axis=1).T
+
+        self._physics(mask & ~crowded, enemies)
+        for e in np.flatnonzero(crowded.any(axis=0)).tolist():
+            self._avoid(crowded[:, e], e)
+            self._physics(crowded[:, e], slice(P + e, P + e + 1))
+
+
+    def _avoid(self, mask, e):
+        """ EnemyShip.avoid for enemy `e` of the matches selected by `mask`, in list order. """
+        s = self.n_players + e
+        ex, ey = self.x[:, s], self.y[:, s]
+        for o in range(self.n_enemies):
+            if o == e:
+                continue
+            so = self.n_players + o
+            dx_e = self.x[:, so] - ex
+            dy_e = self.y[:, so] - ey
+            dist_sq = dx_e * dx_e + dy_e * dy_e
+            close = mask & self.present[:, so] & (dist_sq > 0) & (dist_sq < _enemy.avoidance_radius ** 2)
+            if close.any():
+                self._steer(close, s, _degrees_towards(close, -dy_e, -dx_e))
+                self._decelerate(close, s)
+
+
+    def _patrol_draws(self, idx):
+        """ A random heading for each match of `idx`, from its Game's generator when it follows one. """
+        if self.match_rngs is None:
+            return self.rng.uniform(0, 360, idx.size)
+        rngs = self.match_rngs
+        return [self.rng.uniform(0, 360) if rngs[b] is None else rngs[b].uniform(0, 360) for b in idx.tolist()]
+
+
+    def _handle_projectile_hits(self, active):
+        # work on the flat list of live projectiles rather than the whole pool
+        live = np.flatnonzero(self.proj_alive & active[:, None])
+        if not live.size:
+            return
+        b_live = live // self.max_projectiles
+        bx, by = self.proj_x.reshape(-1)[live], self.proj_y.reshape(-1)[live]
+        hit = np.zeros(live.size, dtype=bool)
+
+        # cheap pre-filters: ball center within the ship's bounding circle, then inside the
+        # ship rectangle grown by the ball's half-diagonal
+        reach_x = _ship.height / 2 + _BALL_RADIUS + _EPS
+        reach_y = _ship.width / 2 + _BALL_RADIUS + _EPS
+        reach = np.hypot(reach_x, reach_y)
+        r = CANNONBALL_RADIUS
+        offsets = np.array([(-r, -r), (r, -r), (r, r), (-r, r)])
+        for s in range(self.n_ships):
+            # gathering from the ship's column is faster than self.x[b_live, s]
+            dx = bx - self.x[:, s][b_live]
+            dy = by - self.y[:, s][b_live]
+            k = np.flatnonzero((np.abs(dx) <= reach) & (np.abs(dy) <= reach) & self.present[:, s][b_live])
+            if not k.size:
+                continue
+            rad = np.radians(self.angle[b_live[k], s])
+            c, sn = np.cos(rad), np.sin(rad)
+            dx, dy = dx[k], dy[k]
+            k = k[(np.abs(dx * c + dy * sn) <= reach_x) & (np.abs(dy * c - dx * sn) <= reach_y)]
+            if not k.size:
+                continue
+            balls = np.stack((bx[k], by[k]), axis=1)[:, None, :] + offsets
+            k = k[sat_collide(balls, self._ship_hitboxes(b_live[k], s))]
+            if not k.size:
+                continue
+            b = b_live[k]
+            damage = np.zeros(self.n_envs)
+            np.add.at(damage, b, self.proj_damage.reshape(-1)[live[k]])
+            targets = np.unique(b)
+            self._apply_damage(targets, s, damage[targets])
+            hit[k] = True
+        self.proj_alive.reshape(-1)[live[hit]] = False
+
+
+    def _handle_ship_collisions(self, active):
+        """
+        Game._handle_ship_collisions resolves the colliding pairs of a match in (i, j) order, and a
+        push can make or break the pairs after it. Each round resolves the first colliding pair of
+        every match that has one left, then looks again at the pairs after it.
+        """
+        P, S = self.n_players, self.n_ships
+        i, j = self._pair_i, self._pair_j
+
+        # pairs within reach, (n_pairs, n_envs) in (i, j) order like the ship columns, ship i by ship i
+        x, y = self.x.T, self.y.T
+        present = (self.present & active[:, None]).T
+        near = np.empty((i.size, self.n_envs), dtype=bool)
+        for a, start in enumerate(self._pair_starts):
+            dx = x[a + 1:] - x[a]
+            dy = y[a + 1:] - y[a]
+            near[start:start + S - 1 - a] = (dx * dx + dy * dy <= _SHIP_REACH_SQ) & present[a + 1:] & present[a]
+
+        idx = np.arange(self.n_envs)
+        k, m = np.divmod(np.flatnonzero(near), self.n_envs)  # by pair, then match
+        while k.size:
+            hit = sat_collide(self._ship_hitboxes(idx[m], i[k]), self._ship_hitboxes(idx[m], j[k]))
+            k, m = k[hit], m[hit]
+            m, first = np.unique(m, return_index=True)  # the first colliding pair of each match
+            k = k[first]
+            idx = idx[m]
+            self._collide(idx, i[k], j[k])
+
+            # the pairs after it, with the ships where they are now
+            x, y, present = self.x.T[:, idx], self.y.T[:, idx], present[:, m]
+            dx = x[i] - x[j]
+            dy = y[i] - y[j]
+            k, m = np.nonzero((dx * dx + dy * dy <= _SHIP_REACH_SQ) & present[i] & present[j] &
+                              (np.arange(i.size)[:, None] > k))
+
+        # clean up destroyed enemies
+        self.present[:, P:] &= ~active[:, None] | self.is_living[:, P:]
+
+
+    def _collide(self, idx, i, j):
+        """ Separate and damage the colliding ships `i` and `j` of matches `idx`, one pair per match. """
+        # separation
+        half_width = _ship.width / 2
+        dx = self.x[idx, i] - self.x[idx, j]
+        dy = self.y[idx, i] - self.y[idx, j]
+        dist = np.hypot(dx, dy)
+        safe = np.where(dist != 0, dist, 1)
+        nx = np.where(dist != 0, dx / safe, 0)
+        ny = np.where(dist != 0, dy / safe, 0)
+        overlap = (half_width + half_width) - dist
+        push = overlap > 0
+        sub, si, sj = idx[push], i[push], j[push]
+        nx, ny, overlap = nx[push], ny[push], overlap[push]
+        self.x[sub, si] += nx * overlap * 1.25
+        self.y[sub, si] += ny * overlap * 1.25
+        self.x[sub, sj] -= nx * overlap * 1.25
+        self.y[sub, sj] -= ny * overlap * 1.25
+
+        # damage, except between two enemies
+        players = i < self.n_players
+        idx, i, j = idx[players], i[players], j[players]
+        dmg = self._compute_damage(idx, i, j) / 3
+        self._apply_damage(idx, i, dmg)
+        self._apply_damage(idx, j, dmg)
+
+
+    def _compute_damage(self, idx, i, j):
+        """ Game.compute_damage (all ships share dmg_coeff). """
+        a1, a2 = self.angle[idx, i], self.angle[idx, j]
+        rad1, rad2 = np.radians(a1), np.radians(a2)
+        v1x, v1y = self.speed[idx, i] * np.cos(rad1), self.speed[idx, i] * np.sin(rad1)
+        v2x, v2y = self.speed[idx, j] * np.cos(rad2), self.speed[idx, j] * np.sin(rad2)
+        rel_speed = np.hypot(v1x - v2x, v1y - v2y)
+        angle_diff = np.abs((a1 - a2 + 180) % 360 - 180)
+        impact = np.abs(np.cos(np.radians(angle_diff)))
+        coeff = (_ship.dmg_coeff + _ship.dmg_coeff) / 2
+        return rel_speed * coeff * impact
+
+
+    def _check_end_conditions(self, active):
+        P = self.n_players
+        players = self.is_living[:, :P]
+        a_alive = (players & self.team_a).any(axis=1)
+        b_alive = (players & ~self.team_a).any(axis=1)
+        enemies_alive = (self.is_living[:, P:] & self.present[:, P:]).any(axis=1)
+
+        state = np.full(self.n_envs, PLAYING, dtype=np.int8)
+        state[~enemies_alive & a_alive & ~b_alive] = A_VICTORY
+        state[~enemies_alive & b_alive & ~a_alive] = B_VICTORY
+        state[enemies_alive & ~a_alive & ~b_alive] = GAMEOVER
+        self.state[active] = state[active]
@@ -0,0 +1,58 @@
+# pyrate/engine/view.py
+"""
+Read-only views of a Game, for readers outside the simulation thread.
+
+A GameView holds what the renderer and player observations need at one
+tick, as plain immutable values: once taken it can be drawn, serialized or
+shared between threads without the Game's lock (see TickScheduler.view).
+Unlike a GameSnapshot it cannot be restored.
+"""
+import math
+from collections import namedtuple
+
+ShipView = namedtuple("ShipView", [
+    "uid", "team", "name", "x", "y", "angle", "speed", "rotation_velocity", "health", "is_living",
+    "last_fire_time",             # (left, right) simulation times
+    "height", "hitbox",           # hitbox: corner points
+    "agro_radius",                # None for player ships
+])
+
+GameView = namedtuple("GameView", [
+    "tick", "state", "control_mode",
+    "players",                    # ShipView per player id
+    "enemies",                    # ShipView per enemy still afloat
+    "projectiles",                # (x, y) integer positions of the cannonballs in flight
+    "projectile_radius",
+    "impacts",                    # (tick, x, y, 'hit' or 'miss') of the last ticks, oldest first
+    "sensor_points",              # per player, (x, y) of each sensor reading; empty unless asked for
+])
+
+
+def _ship_view(ship):
+    return ShipView(ship.uid, ship.team, ship.name, ship.x, ship.y, ship.angle, ship.speed,
+                    ship.rotation_velocity, ship.health, ship.is_living,
+                    (ship.last_fire_time["left"], ship.last_fire_time["right"]),
+                    ship.height, tuple(ship.get_hitbox()), getattr(ship, "agro_radius", None))
+
+
+def _sensor_points(sensors, ship):
+    points = []
+    for entry in sensors.reading(ship):
+        # entry["angle"] is in degrees; entry["distance"] is in world-units
+        rad = math.radians(entry["angle"])
+        dist = entry["distance"]
+        points.append((int(ship.x + math.cos(rad) * dist), int(ship.y + math.sin(rad) * dist)))
+    return tuple(points)
+
+
+def take_view(game, sensors=None):
+    """ GameView of the current tick; `sensors`, a SensorEngine of the game, adds its readings' positions. """
+    return GameView(
+        game.tick, game.state, game.control_mode,
+        tuple(_ship_view(ship) for ship in game.player_ships),
+        tuple(_ship_view(enemy) for enemy in game.enemy_ships),
+        tuple(game.get_projectile_positions()),
+        game.projectiles.radius,
+        tuple(game.impacts),
+        tuple(_sensor_points(sensors, ship) for ship in game.player_ships) if sensors is not None else (),
+    )
@@ -0,0 +1,35 @@
+# pyrate/server/commands.py
+import threading
+
+
+class CommandInbox:
+    """
+    Commands of a match's HTTP and WebSocket clients. The event loop queues
+    them without the match lock, and the tick thread moves them into
+    Game.queue_action() at the start of the next update (a Game action
+    source), in the order they arrived. Its own lock is only held to append
+    to or swap the list, never during a tick.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self._lock = threading.Lock()
+        self._commands = []
+        self._next_tick = game.tick + 1  # tick the commands queued now are applied on
+        game.action_sources.append(self._drain)
+
+
+    def put(self, commands):
+        """ Queue [(player_id, action, side)], already validated; returns the tick they are applied on. """
+        with self._lock:
+            if self.game.state == "playing":  # an ended Game drops its actions
+                self._commands.extend(commands)
+            return self._next_tick
+
+
+    def _drain(self, game):
+        with self._lock:
+            commands, self._commands = self._commands, []
+            self._next_tick = game.tick + 2  # the tick in progress is game.tick + 1
+        for player_id, action, side in commands:
+            game.queue_action(player_id, action, side)
@@ -0,0 +1,103 @@
+# pyrate/server/lockstep.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StepRejected(Exception):
+    pass
+
+
+class LockstepBarrier:
+    """
+    Tick a Game only once every agent has submitted its actions for the tick
+    (POST /game/update), instead of at a fixed rate. When some agents are
+    late, the tick runs `timeout` seconds after the first submission without
+    their actions. Submitted actions are applied in player id order, so a
+    match plays out the same whatever order the agents' requests arrive in,
+    and as fast as the slowest agent. Used from the event loop only; the
+    ticks themselves run one after the other on the barrier's own worker
+    thread, so a tick does not hold up the other requests meanwhile.
+    """
+
+    def __init__(self, scheduler, agents, timeout):
+        self.scheduler = scheduler
+        self.agents = frozenset(agents)  # player ids waited for
+        self.timeout = timeout
+        self.timeouts = 0  # ticks run without every agent's actions
+        self._submitted = {}  # player_id -> [(action, side)] for the next tick
+        self._round = None  # future resolved when the next tick has run
+        self._timer = None
+        self._loop = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyrate-lockstep")
+        self._closed = False
+
+
+    async def submit(self, player_id, actions):
+        """ Queue a player's actions for the next tick and wait until it has run. """
+        if self._closed:
+            raise StepRejected("The match is closed")
+        if player_id not in self.agents:
+            raise StepRejected(f"Player {player_id} is not a lockstep agent of this match")
+        if player_id in self._submitted:
+            raise StepRejected(f"Player {player_id} already submitted actions for this tick")
+        loop = self._loop = asyncio.get_running_loop()
+        if self._round is None:
+            self.scheduler.bind_loop(loop)
+            self._round = loop.create_future()
+            self._timer = loop.call_later(self.timeout, self._step, True)
+        self._submitted[player_id] = actions
+        current = self._round
+        if self.agents <= self._submitted.keys():
+            self._step()
+        await asyncio.shield(current)
+        if self._closed:
+            raise StepRejected("The match is closed")
+
+
+    def _step(self, timed_out=False):
+        submitted, current, timer = self._submitted, self._round, self._timer
+        self._submitted, self._round, self._timer = {}, None, None
+        if timer is not None:
+            timer.cancel()
+        if self._closed:
+            current.set_result(None)  # submit() then rejects the waiters
+            return
+        if timed_out:
+            self.timeouts += 1
+        tick = self._loop.run_in_executor(self._executor, self._tick, submitted)
+        tick.add_done_callback(lambda done: self._finish(current, done))
+
+
+    def _tick(self, submitted):
+        with self.scheduler.lock:
+            for player_id in sorted(submitted):
+                for action, side in submitted[player_id]:
+                    self.scheduler.game.queue_action(player_id, action, side)
+        self.scheduler.step()
+
+
+    @staticmethod
+    def _finish(current, done):
+        if current.done():  # closed meanwhile
+            return
+        if done.exception() is not None:
+            current.set_exception(done.exception())
+        else:
+            current.set_result(None)
+
+
+    def close(self):
+        """ Stop ticking; agents waiting for a tick get StepRejected. Can be called from any thread. """
+        self._closed = True
+        self._executor.shutdown(wait=False)
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._cancel_round)
+
+
+    def _cancel_round(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._round is not None and not self._round.done():
+            self._round.set_result(None)
+        self._submitted, self._round, self._timer = {}, None, None
@@ -0,0 +1,46 @@
+# pyrate/server/observations.py
+
+
+def tick_etag(tick):
+    """ ETag of an observation: the tick it was taken at. """
+    return f'"{tick}"'
+
+
+def etag_matches(if_none_match, etag):
+    """ True when an If-None-Match header value lists `etag` (weak or strong) or is '*'. """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ObservationCache:
+    """
+    JSON bodies of player observations, serialized once per tick and shared
+    by every poll of that tick. Observations only change when the game
+    ticks (the control mode is not part of them), so the tick is both the
+    key and the ETag. Used from the event loop only.
+    """
+
+    def __init__(self):
+        self._tick = None
+        self._bodies = {}  # (kind, player_id) -> bytes
+
+
+    def get(self, tick, kind, player_id):
+        """ Body of `kind` for a player at `tick`, or None when it was not built yet. """
+        if self._tick != tick:
+            return None
+        return self._bodies.get((kind, player_id))
+
+
+    def put(self, tick, kind, player_id, body):
+        """ Keep a body built for `tick`; a newer tick drops those of the previous one. """
+        if self._tick is None or tick > self._tick:
+            self._bodies.clear()
+            self._tick = tick
+        if tick == self._tick:
+            self._bodies[(kind, player_id)] = body
@@ -0,0 +1,139 @@
+# pyrate/server/rooms.py
+import os
+import threading
+import time
+import uuid
+
+from pyrate.engine.game import Game
+from pyrate.server.commands import CommandInbox
+from pyrate.server.lockstep import LockstepBarrier
+from pyrate.server.observations import ObservationCache
+from pyrate.server.scheduler import TickScheduler
+from pyrate.server.shm import SharedMemoryChannel
+from pyrate.server.stream import FrameProducer
+
+
+class RoomLimitReached(Exception):
+    pass
+
+
+class Room:
+    """
+    One match hosted by the server: its Game, the lock and tick notifications
+    around it (scheduler), the commands of its clients, its video stream and
+    its observation cache.
+    A lockstep match is ticked by its agents (`lockstep` barrier) instead of
+    the server's clock. With `shared_memory`, agents on the same machine can
+    also observe and command it through a shared-memory segment.
+    """
+
+    def __init__(self, room_id, game, tick_rate, stream_fps, stream_buffer_size, lockstep=None, shared_memory=False):
+        self.id = room_id
+        self.game = game
+        self.scheduler = TickScheduler(game, tick_rate)
+        self.commands = CommandInbox(game)
+        self.lockstep = None
+        if lockstep is not None:
+            agents, timeout = lockstep
+            self.lockstep = LockstepBarrier(self.scheduler, agents, timeout)
+        self.producer = FrameProducer(self.scheduler, stream_fps, stream_buffer_size)
+        self.observations = ObservationCache()
+        self.shared_memory = None
+        if shared_memory:
+            self.shared_memory = SharedMemoryChannel(f"pyrate-{os.getpid()}-{room_id}", self.scheduler)
+        self.created = time.time()
+
+
+    def close(self):
+        if self.lockstep is not None:
+            self.lockstep.close()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+        self.producer.stop()
+        with self.scheduler.lock:
+            if self.game.recorder is not None:
+                self.game.recorder.close()
+            self.game.events.close()
+
+
+class RoomRegistry:
+    """
+    The matches of a server process, ticked together by one SharedScheduler.
+    Rooms created before start() begin ticking when it is called.
+    """
+
+    def __init__(self, shared_scheduler, max_rooms, stream_fps, stream_buffer_size, max_enemies=None):
+        self.shared_scheduler = shared_scheduler
+        self.max_rooms = max_rooms
+        self.max_enemies = max_enemies  # per match, None for no limit
+        self.stream_fps = stream_fps
+        self.stream_buffer_size = stream_buffer_size
+        self.rooms = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+
+    def create(self, room_id=None, n_players=4, n_enemies=3, min_distance=300, seed=None,
+               lockstep=False, agents=None, step_timeout=1.0, shared_memory=False):
+        """
+        Start hosting a new match; raises RoomLimitReached, or ValueError for an impossible setup.
+        A `lockstep` match ticks once every player of `agents` (all by default) has
+        submitted its actions, or `step_timeout` seconds after the first one did.
+        A `shared_memory` match is also published to a segment for local agents (see shm.py).
+        """
+        if self.max_enemies is not None and n_enemies > self.max_enemies:
+            raise ValueError(f"A match has at most {self.max_enemies} enemies on this server")
+        if lockstep:
+            agents = range(n_players) if agents is None else agents
+            unknown = [player_id for player_id in agents if not 0 <= player_id < n_players]
+            if unknown:
+                raise ValueError(f"No player with id {unknown[0]}")
+            if step_timeout <= 0:
+                raise ValueError("step_timeout must be positive")
+        with self._lock:
+            if len(self.rooms) >= self.max_rooms:
+                raise RoomLimitReached(f"This server hosts at most {self.max_rooms} matches")
+            room_id = room_id or uuid.uuid4().hex[:8]
+            if room_id in self.rooms:
+                raise ValueError(f"Match '{room_id}' already exists")
+            game = Game(n_players, n_enemies, min_distance, seed=seed)
+            room = Room(room_id, game, self.shared_scheduler.tick_rate, self.stream_fps, self.stream_buffer_size,
+                        lockstep=(agents, step_timeout) if lockstep else None, shared_memory=shared_memory)
+            self.rooms[room_id] = room
+        if room.lockstep is None:
+            self.shared_scheduler.add(room.scheduler)
+        if self._started:
+            room.producer.start()
+        return room
+
+
+    def get(self, room_id):
+        """ The room, or None. """
+        return self.rooms.get(room_id)
+
+
+    def list(self):
+        return list(self.rooms.values())
+
+
+    def delete(self, room_id):
+        """ Stop and forget a match; raises KeyError when it does not exist. """
+        with self._lock:
+            room = self.rooms.pop(room_id)
+        if room.lockstep is None:
+            self.shared_scheduler.remove(room.scheduler)
+        room.close()
+
+
+    def start(self):
+        self._started = True
+        for room in self.list():
+            room.producer.start()
+        self.shared_scheduler.start()
+
+
+    def stop(self):
+        self.shared_scheduler.stop()
+        for room in self.list():
+            room.close()
+        self._started = False
@@ -0,0 +1,212 @@
+# pyrate/server/scheduler.py
+import asyncio
+import math
+import sys
+import threading
+import time
+import traceback
+
+
+def _report(scheduler, error):
+    """ Record and print the exception that stopped a game from ticking. """
+    scheduler.error = f"{type(error).__name__}: {error}"
+    print(f"[Scheduler] Game stopped at tick {scheduler.game.tick} after an error:", file=sys.stderr)
+    traceback.print_exception(error, file=sys.stderr)
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class TickScheduler:
+    """
+    Advance a Game at a fixed rate from a background thread, whether or not
+    anyone is watching the video stream or polling the API.
+
+    After every tick an immutable GameView of it is published as `view`:
+    readers that only need that (video frames, ship status) use it without
+    the lock, which is then only held by ticks and by the short reads and
+    writes of the Game itself (commands, sensors, events).
+    """
+
+    def __init__(self, game, tick_rate, max_lag_ticks=5):
+        self.game = game
+        self.tick_rate = tick_rate
+        self.max_lag_ticks = max_lag_ticks  # resync instead of bursting when further behind
+        # Every read or write of `game` outside the tick thread must hold this lock
+        self.lock = threading.Lock()
+        self.view_sensors = False  # add sensor positions to the published views (debug drawing)
+        self.view = game.view()
+        self._listeners = []
+        self._loop = None  # event loop to wake up on every tick, see next_tick()
+        self._tick_event = asyncio.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # Set by SharedScheduler when this game is ticked along with others
+        self.skip_ticks = 0  # periods still to sit out after an over-budget tick
+        self.overruns = 0    # ticks that took longer than the shared tick budget
+        self.error = None    # "Type: message" of the exception that stopped the ticks, if any
+
+
+    def add_listener(self, callback):
+        """ Register `callback(view)`, called from the tick thread with the GameView of every tick. """
+        self._listeners.append(callback)
+
+
+    async def next_tick(self):
+        """ Wait, from the event loop the scheduler was started in, until the next tick has run. """
+        await self._tick_event.wait()
+
+
+    def _notify_waiters(self):
+        event, self._tick_event = self._tick_event, asyncio.Event()
+        event.set()
+
+
+    def bind_loop(self, loop):
+        """ Event loop whose next_tick() waiters are woken after every tick (None for none). """
+        self._loop = loop
+
+
+    def publish(self):
+        """ Replace `view` with one of the Game as it is now; call it holding the lock. """
+        self.view = self.game.view(self.view_sensors)
+
+
+    def step(self):
+        """ Run one tick, then publish its view and notify listeners and next_tick() waiters. """
+        with self.lock:
+            self.game.update()
+            self.publish()
+        view = self.view
+        for callback in self._listeners:
+            callback(view)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._notify_waiters)
+
+
+    def start(self):
+        """ Tick this game alone from its own thread; see SharedScheduler for several games. """
+        if self._thread is not None:
+            return
+        self.bind_loop(_running_loop())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyrate-tick", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+    def _run(self):
+        period = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self.step()
+            except Exception as e:
+                _report(self, e)
+                return
+
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            elif delay < -period * self.max_lag_ticks:
+                # Too far behind (e.g. process was suspended): drop the backlog
+                next_tick = time.perf_counter()
+
+
+class SharedScheduler:
+    """
+    Tick many TickSchedulers (one per hosted match) in turn from a single
+    thread at a common rate. A game whose tick takes longer than `tick_budget`
+    seconds sits out the following periods in proportion, so a slow match
+    runs below real time instead of delaying every other one. A game whose
+    tick raises stops being ticked (its `error` says why); the others go on.
+    """
+
+    def __init__(self, tick_rate, tick_budget, max_lag_ticks=5):
+        self.tick_rate = tick_rate
+        self.tick_budget = tick_budget
+        self.max_lag_ticks = max_lag_ticks
+        self.schedulers = []
+        self._schedulers_lock = threading.Lock()
+        self._loop = None
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def add(self, scheduler):
+        scheduler.bind_loop(self._loop)
+        with self._schedulers_lock:
+            self.schedulers.append(scheduler)
+
+
+    def remove(self, scheduler):
+        """ Stop ticking `scheduler`; returns after any tick of it in progress. """
+        with self._schedulers_lock:
+            if scheduler in self.schedulers:  # not after an error
+                self.schedulers.remove(scheduler)
+        with scheduler.lock:
+            pass
+
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._loop = _running_loop()
+        with self._schedulers_lock:
+            for scheduler in self.schedulers:
+                scheduler.bind_loop(self._loop)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyrate-ticks", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+    def _run(self):
+        period = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            with self._schedulers_lock:
+                schedulers = list(self.schedulers)
+            for scheduler in schedulers:
+                if scheduler.skip_ticks:
+                    scheduler.skip_ticks -= 1
+                    continue
+                start = time.perf_counter()
+                try:
+                    scheduler.step()
+                except Exception as e:
+                    with self._schedulers_lock:
+                        if scheduler in self.schedulers:
+                            self.schedulers.remove(scheduler)
+                    _report(scheduler, e)
+                    continue
+                elapsed = time.perf_counter() - start
+                if elapsed > self.tick_budget:
+                    scheduler.overruns += 1
+                    scheduler.skip_ticks = min(math.ceil(elapsed / self.tick_budget) - 1, self.tick_rate)
+
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            elif delay < -period * self.max_lag_ticks:
+                next_tick = time.perf_counter()
@@ -0,0 +1,299 @@
+# pyrate/server/shm.py
+"""
+Shared-memory transport for agents running on the same machine as the
+server: observations and commands go through a memory segment instead of
+HTTP or WebSocket messages, so an agent sees a tick microseconds after it
+was published and its commands cost a few stores.
+
+The segment (multiprocessing.shared_memory, named in MatchInfo) holds, at
+fixed offsets and as NumPy structured arrays:
+
+    header      HEADER at offset 0: magic, version, sizes, `latest` tick (-1 before the first)
+    ring        `ring_size` slots (slot_dtype), the observation of tick t in slot t % ring_size
+    mailboxes   one MAILBOX per player (mailbox_dtype): `head` written by the agent,
+                `tail` by the server, `entries` (action index in ACTIONS, side index in SIDES)
+
+A slot is guarded by a seqlock: its `seq` is odd while the server writes
+it and grows by 2 on every write, so a reader that sees the same even
+`seq` before and after reading a slot read one consistent tick. `latest`
+is updated once the slot is complete. The sensor readings of a player are
+`readings[player_id, :n_readings[player_id]]`, in the order of
+Game.get_ship_sensor(), `entity` being 0 friendly, 1 unidentified, 2 enemy.
+
+The server side (SharedMemoryChannel) writes from the tick thread; agents
+use SharedMemoryAgent, whose observations are views of the segment, not
+copies.
+"""
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from pyrate.engine.snapshot import ACTIONS, SIDES, STATES
+
+MAGIC = b"PYSM"
+VERSION = 1
+RING_SIZE = 8  # ticks kept, a reader has that many ticks to read a slot before it is reused
+MAILBOX_SIZE = 64  # commands a player can have in flight
+
+FRIENDLY, UNKNOWN, ENEMY = 0, 1, 2  # reading entities
+
+HEADER = np.dtype([
+    ("magic", "S4"), ("version", "<u4"),
+    ("n_players", "<u4"), ("n_ships", "<u4"), ("ring_size", "<u4"), ("mailbox_size", "<u4"),
+    ("latest", "<i8"),
+], align=True)
+
+STATUS = np.dtype([
+    ("angle", "<f8"), ("rotation_velocity", "<f8"), ("speed", "<f8"), ("health", "<f8"),
+    ("last_fire_left", "<f8"), ("last_fire_right", "<f8"), ("is_living", "u1"),
+], align=True)
+
+READING = np.dtype([
+    ("entity", "u1"), ("is_living", "u1"), ("health_low", "u1"), ("distance", "<f8"), ("angle", "<f8"),
+], align=True)
+
+COMMAND = np.dtype([("action", "u1"), ("side", "u1")])
+
+_ALIGN = 64  # sections start on their own cache line
+
+# What SharedMemoryAgent.latest() returns: arrays are views of the segment, check them with valid()
+SharedObservation = namedtuple("SharedObservation", [
+    "tick", "state", "slot", "seq",
+    "published_ns",               # time.monotonic_ns() of the server when the slot was written
+    "status",                     # STATUS per player
+    "n_readings",                 # per player
+    "readings",                   # READING per player x other ship
+])
+
+
+def slot_dtype(n_players, n_ships):
+    return np.dtype([
+        ("seq", "<u8"), ("tick", "<u8"), ("published_ns", "<u8"), ("state", "u1"),
+        ("status", STATUS, (n_players,)),
+        ("n_readings", "<u2", (n_players,)),
+        ("readings", READING, (n_players, max(n_ships - 1, 0))),
+    ], align=True)
+
+
+def mailbox_dtype(mailbox_size):
+    return np.dtype([("head", "<u8"), ("tail", "<u8"), ("entries", COMMAND, (mailbox_size,))], align=True)
+
+
+def _aligned(size):
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _offsets(n_players, n_ships, ring_size, mailbox_size):
+    """ (ring offset, mailboxes offset, segment size) in bytes. """
+    ring_offset = _aligned(HEADER.itemsize)
+    mailbox_offset = ring_offset + _aligned(slot_dtype(n_players, n_ships).itemsize * ring_size)
+    return ring_offset, mailbox_offset, mailbox_offset + mailbox_dtype(mailbox_size).itemsize * n_players
+
+
+class _Layout:
+    """ The sections of a segment as arrays over its buffer. """
+
+    def __init__(self, buf, n_players, n_ships, ring_size, mailbox_size):
+        self.ring_size, self.mailbox_size = ring_size, mailbox_size
+        slot, mailbox = slot_dtype(n_players, n_ships), mailbox_dtype(mailbox_size)
+        ring_offset, mailbox_offset, _ = _offsets(n_players, n_ships, ring_size, mailbox_size)
+        self.header = np.ndarray((), HEADER, buf)
+        self.ring = np.ndarray((ring_size,), slot, buf, ring_offset)
+        self.mailboxes = np.ndarray((n_players,), mailbox, buf, mailbox_offset)
+        self.seq = self.ring["seq"]
+        self.ticks = self.ring["tick"]
+        self.published_ns = self.ring["published_ns"]
+        self.states = self.ring["state"]
+        self.status = self.ring["status"]
+        self.n_readings = self.ring["n_readings"]
+        self.readings = self.ring["readings"]
+        self.heads = self.mailboxes["head"]
+        self.tails = self.mailboxes["tail"]
+        self.entries = self.mailboxes["entries"]
+
+
+class SharedMemoryChannel:
+    """
+    Server side of a match's segment: publishes every tick's player
+    observations (a TickScheduler listener) and drains the players'
+    mailboxes into Game.queue_action() at the start of every update (a
+    Game action source). Commands are applied in player id order.
+    """
+
+    def __init__(self, name, scheduler, ring_size=RING_SIZE, mailbox_size=MAILBOX_SIZE):
+        self.scheduler = scheduler
+        self.dropped = 0  # mailbox entries that were not a known (action, side)
+        game = scheduler.game
+        n_players = len(game.player_ships)
+        n_ships = len(game.ships_by_uid)
+        _, _, size = _offsets(n_players, n_ships, ring_size, mailbox_size)
+        self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self._shm.name
+        self._layout = _Layout(self._shm.buf, n_players, n_ships, ring_size, mailbox_size)
+        self._layout.header[()] = (MAGIC, VERSION, n_players, n_ships, ring_size, mailbox_size, -1)
+        self._closed = False
+        with scheduler.lock:
+            self._write(scheduler.view)
+            game.action_sources.append(self._drain)
+        scheduler.add_listener(self._on_tick)
+
+
+    def close(self):
+        """ Stop publishing and commanding, and remove the segment; agents attached keep their mapping. """
+        with self.scheduler.lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.scheduler.game.action_sources.remove(self._drain)
+        self._layout = None  # the arrays export the buffer, which cannot be closed while they live
+        self._shm.close()
+        self._shm.unlink()
+
+
+    def _on_tick(self, view):
+        with self.scheduler.lock:
+            if not self._closed and self.scheduler.game.tick == view.tick:
+                self._write(view)
+
+
+    def _write(self, view):
+        """ Write the slot of `view`'s tick; call it holding the lock, at that tick. """
+        layout = self._layout
+        k = view.tick % layout.ring_size
+        layout.seq[k] += 1
+        layout.ticks[k] = view.tick
+        layout.states[k] = STATES.index(view.state)
+
+        status = layout.status[k]
+        players = view.players
+        status["angle"] = [ship.angle for ship in players]
+        status["rotation_velocity"] = [ship.rotation_velocity for ship in players]
+        status["speed"] = [ship.speed for ship in players]
+        status["health"] = [ship.health for ship in players]
+        status["last_fire_left"] = [ship.last_fire_time[0] for ship in players]
+        status["last_fire_right"] = [ship.last_fire_time[1] for ship in players]
+        status["is_living"] = [ship.is_living for ship in players]
+
+        dist, bearing, friendly, masked, living, low_health = self.scheduler.game.sensors.matrices()
+        n_players, n_ships = len(players), dist.shape[1]
+        others = ~np.eye(n_players, n_ships, dtype=bool)  # a ship does not read itself
+
+        def rows(matrix):
+            return matrix[:n_players][others].reshape(n_players, n_ships - 1)
+
+        readings = layout.readings[k][:, :n_ships - 1]
+        readings["distance"] = rows(dist)
+        readings["angle"] = rows(bearing)
+        readings["entity"] = rows(np.where(friendly, FRIENDLY, np.where(masked, UNKNOWN, ENEMY)))
+        readings["is_living"] = rows(np.broadcast_to(np.array(living), dist.shape))
+        readings["health_low"] = rows(np.broadcast_to(np.array(low_health), dist.shape))
+        layout.n_readings[k] = n_ships - 1
+
+        layout.published_ns[k] = time.monotonic_ns()
+        layout.seq[k] += 1
+        layout.header["latest"] = view.tick
+
+
+    def _drain(self, game):
+        layout = self._layout
+        heads = layout.heads.tolist()  # entries up to the heads read now are complete
+        for player_id, head in enumerate(heads):
+            tail = int(layout.tails[player_id])
+            if tail == head:
+                continue
+            entries = layout.entries[player_id]
+            for position in range(tail, head):
+                action, side = entries[position % layout.mailbox_size].tolist()
+                if action < len(ACTIONS) and side < len(SIDES):
+                    game.queue_action(player_id, ACTIONS[action], SIDES[side])
+                else:
+                    self.dropped += 1
+            layout.tails[player_id] = head
+
+
+class SharedMemoryAgent:
+    """
+    Agent side of a match's segment, attached by name (MatchInfo.shared_memory).
+    Observations are views of the segment: read what you need, then check
+    valid() to know the server did not overwrite the slot meanwhile. Each
+    player's mailbox expects a single agent process sending to it.
+    """
+
+    def __init__(self, name):
+        try:
+            self._shm = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # before Python 3.13 attaching registers the segment, which would be removed when this process exits
+            self._shm = shared_memory.SharedMemory(name)
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        header = np.ndarray((), HEADER, self._shm.buf)
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"'{name}' is not a PyRate segment of version {VERSION}")
+        self.n_players = int(header["n_players"])
+        self.n_ships = int(header["n_ships"])
+        self.ring_size = int(header["ring_size"])
+        self.mailbox_size = int(header["mailbox_size"])
+        self._layout = _Layout(self._shm.buf, self.n_players, self.n_ships, self.ring_size, self.mailbox_size)
+        del header
+
+
+    @property
+    def tick(self):
+        """ Newest tick published, -1 before the first. """
+        return int(self._layout.header["latest"])
+
+
+    def latest(self):
+        """ SharedObservation of the newest tick, or None before the first one. """
+        layout = self._layout
+        while True:
+            tick = int(layout.header["latest"])
+            if tick < 0:
+                return None
+            k = tick % self.ring_size
+            seq = int(layout.seq[k])
+            if seq % 2 or layout.ticks[k] != tick:
+                continue  # the server is writing a newer tick in this slot
+            return SharedObservation(tick, STATES[layout.states[k]], k, seq, int(layout.published_ns[k]),
+                                     layout.status[k], layout.n_readings[k], layout.readings[k])
+
+
+    def valid(self, observation):
+        """ True when the slot of `observation` still holds its tick, so what was read from it is consistent. """
+        return int(self._layout.seq[observation.slot]) == observation.seq
+
+
+    def wait(self, after_tick=-1, timeout=None):
+        """
+        Spin until a tick newer than `after_tick` is published and return its
+        observation; None on timeout. Yields the CPU between checks.
+        """
+        header = self._layout.header
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while header["latest"] <= after_tick:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(0)
+        return self.latest()
+
+
+    def send(self, player_id, action, side="left"):
+        """ Queue an action for the next tick; raises BufferError when the player's mailbox is full. """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'")
+        if side not in SIDES:
+            raise ValueError(f"Unknown side '{side}'")
+        layout = self._layout
+        head = int(layout.heads[player_id])
+        if head - int(layout.tails[player_id]) >= self.mailbox_size:
+            raise BufferError(f"The mailbox of player {player_id} is full")
+        layout.entries[player_id, head % self.mailbox_size] = (ACTIONS.index(action), SIDES.index(side))
+        layout.heads[player_id] = head + 1  # published once the entry is written
+
+
+    def close(self):
+        """ Detach from the segment; observations taken from it must not be used (or kept) anymore. """
+        self._layout = None
+        self._shm.close()
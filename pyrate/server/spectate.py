@@ -0,0 +1,103 @@
+# pyrate/server/spectate.py
+"""
+Binary spectator protocol: the state of a match as a compact per-tick
+message, drawn by the browser (pyrate/web/spectator.html) instead of being
+rendered and JPEG-encoded by the server.
+
+Every message starts with a header, then depends on its kind:
+
+    header      <BIB   kind (KEYFRAME or DELTA), tick, state (index in STATES)
+    keyframe    <HHB   screen width, height, cannonball radius
+                <H     ship count, then per ship <HBhhHBH: uid, flags, x, y, angle, health, agro radius
+    delta       <H     changed ship count, then per ship <HBhhHB: uid, flags, x, y, angle, health
+                <H     sunk enemy count, then their uid (H) each
+    both        <H     cannonball count, then <hh: x, y each
+                <B     impact count, then <hhB: x, y, kind (0 hit, 1 miss) each
+
+Ship positions are in 1/8 pixel, clamped to +-4096 pixels, cannonball and
+impact positions in pixels, clamped the same way. Angles are in 1/100
+degree (0-35999), health is rounded up to an integer (at most 255). Flags: bit 0 afloat, bits 1-2 side (0 team A,
+1 team B, 2 enemy). A delta only lists ships whose values changed since
+the previous message sent to the same spectator; impacts are those since
+that message.
+"""
+import math
+import struct
+
+from pyrate.engine.snapshot import STATES
+
+KEYFRAME, DELTA = 1, 2
+KEYFRAME_INTERVAL = 120  # ticks between keyframes, 2 s at 60 Hz
+
+_HEADER = struct.Struct("<BIB")
+_SCREEN = struct.Struct("<HHB")
+_KEY_SHIP = struct.Struct("<HBhhHBH")
+_DELTA_SHIP = struct.Struct("<HBhhHB")
+_PROJECTILE = struct.Struct("<hh")
+_IMPACT = struct.Struct("<hhB")
+
+_SIDES = {"A": 0, "B": 1}
+_ENEMY = 2
+_IMPACT_KINDS = {"hit": 0, "miss": 1}
+_INT16 = (-32768, 32767)
+
+
+def _int16(value):
+    return min(max(int(value), _INT16[0]), _INT16[1])
+
+
+def _quantize(ship, side):
+    """ (flags, x, y, angle, health) of a ShipView as sent. """
+    return (ship.is_living | side << 1,
+            _int16(round(ship.x * 8)), _int16(round(ship.y * 8)),
+            round(ship.angle % 360 * 100) % 36000,
+            min(math.ceil(max(ship.health, 0)), 255))
+
+
+class SpectatorEncoder:
+    """
+    Encodes the GameViews sent to one spectator: a keyframe first and every
+    `keyframe_interval` ticks, deltas against the previous message otherwise.
+    Views may be skipped (a slow spectator only gets the newest one).
+    """
+
+    def __init__(self, screen_size, keyframe_interval=KEYFRAME_INTERVAL):
+        self.screen_size = screen_size
+        self.keyframe_interval = keyframe_interval
+        self._sent = None  # uid -> quantized values in the last message
+        self._tick = None  # tick of the last message
+        self._keyframe_tick = None
+
+
+    def encode(self, view):
+        ships = {ship.uid: (ship, _SIDES[ship.team]) for ship in view.players}
+        ships.update((enemy.uid, (enemy, _ENEMY)) for enemy in view.enemies)
+        values = {uid: _quantize(ship, side) for uid, (ship, side) in ships.items()}
+
+        rewound = self._tick is None or view.tick < self._tick
+        keyframe = (rewound or view.tick - self._keyframe_tick >= self.keyframe_interval
+                    or not values.keys() <= self._sent.keys())
+        since = view.tick - 1 if rewound else self._tick
+
+        parts = [_HEADER.pack(KEYFRAME if keyframe else DELTA, view.tick, STATES.index(view.state))]
+        if keyframe:
+            parts.append(_SCREEN.pack(*self.screen_size, view.projectile_radius))
+            parts.append(struct.pack("<H", len(values)))
+            parts.extend(_KEY_SHIP.pack(uid, *values[uid], ships[uid][0].agro_radius or 0) for uid in values)
+            self._keyframe_tick = view.tick
+        else:
+            changed = [uid for uid in values if values[uid] != self._sent[uid]]
+            sunk = [uid for uid in self._sent if uid not in values]
+            parts.append(struct.pack("<H", len(changed)))
+            parts.extend(_DELTA_SHIP.pack(uid, *values[uid]) for uid in changed)
+            parts.append(struct.pack(f"<H{len(sunk)}H", len(sunk), *sunk))
+
+        parts.append(struct.pack("<H", len(view.projectiles)))
+        parts.extend(_PROJECTILE.pack(_int16(x), _int16(y)) for x, y in view.projectiles)
+        impacts = [impact for impact in view.impacts if impact[0] > since][-255:]
+        parts.append(struct.pack("<B", len(impacts)))
+        parts.extend(_IMPACT.pack(_int16(x), _int16(y), _IMPACT_KINDS[kind]) for _, x, y, kind in impacts)
+
+        self._sent = values
+        self._tick = view.tick
+        return b"".join(parts)
@@ -0,0 +1,241 @@
+# pyrate/server/stream.py
+import asyncio
+import io
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from contextlib import contextmanager
+
+import pygame
+from PIL import Image
+
+from pyrate.ui.renderer import FrameRenderer
+
+# What a viewer asks for: resolution scale (1.0 is full size), JPEG quality (1-95), frames per second
+StreamSettings = namedtuple("StreamSettings", ["scale", "quality", "fps"])
+
+QUALITY_STEPS = (90, 75, 60, 45, 30, 20)  # qualities a congested viewer steps down through
+RECOVERY_SECONDS = 3.0  # time without a slow send before a lowered quality is raised again
+
+
+def _quality_ladder(quality):
+    """ Requested quality first, then the lower shared steps, so congested viewers share encodings. """
+    return [quality] + [q for q in QUALITY_STEPS if q < quality]
+
+
+class FrameProducer:
+    """
+    Render the game once per video frame and JPEG-encode it once for every
+    (scale, quality) watched, sharing the encoded frames with every
+    /video/stream subscriber through a ring buffer. Frames are produced at
+    the highest fps any viewer asks for, up to `fps`. Subscribers always
+    read the newest frame, so slow clients skip frames instead of queuing
+    them; see view().
+
+    Rendering and encoding run on the producer's own thread, from the
+    GameView published by the scheduler, without taking the tick lock
+    (SDL blits and PIL encoding also let other threads run meanwhile).
+    Viewers wait for frames on the event loop.
+    """
+
+    def __init__(self, scheduler, fps, buffer_size=4):
+        self.scheduler = scheduler
+        self.fps = fps
+        self.frames = deque(maxlen=buffer_size)  # (frame_id, {(scale, quality): jpeg bytes}), newest last
+        self.frame_id = 0
+        self.renderer = FrameRenderer()  # only this producer's thread draws on it
+        self._viewers = Counter()  # StreamSettings currently served -> viewers
+        self._lock = threading.Lock()  # frames and viewers
+        self._loop = None  # event loop of the viewers, woken up on every frame
+        self._frame_event = asyncio.Event()
+        self._view = None  # newest GameView published by the scheduler
+        self._new_tick = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        scheduler.add_listener(self._on_tick)
+
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+
+    @property
+    def subscribers(self):
+        return sum(self._viewers.values())
+
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyrate-frames", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+    @contextmanager
+    def subscription(self, settings):
+        """
+        Count a viewer of `settings` for as long as the context is open; frames are only produced
+        while someone watches, and the scheduler only adds debug sensors to its views meanwhile.
+        """
+        with self._lock:
+            self._viewers[settings] += 1
+            self.scheduler.view_sensors = self.renderer.debug
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._viewers[settings] -= 1
+                if not self._viewers[settings]:
+                    del self._viewers[settings]
+                if not self._viewers:
+                    self.scheduler.view_sensors = False
+
+
+    def _switch(self, old, new):
+        """ Move one viewer from `old` settings to `new` ones. """
+        with self._lock:
+            self._viewers[new] += 1
+            self._viewers[old] -= 1
+            if not self._viewers[old]:
+                del self._viewers[old]
+
+
+    def _notify_waiters(self):
+        event, self._frame_event = self._frame_event, asyncio.Event()
+        event.set()
+
+
+    async def wait_frame(self, last_id, variant, timeout=1.0):
+        """
+        Wait until a frame newer than `last_id` is encoded as `variant`
+        (scale, quality) and return (frame_id, jpeg).
+        Returns None on timeout or shutdown.
+        """
+        self._loop = asyncio.get_running_loop()
+        deadline = self._loop.time() + timeout
+        while self.running:
+            event = self._frame_event  # taken before looking, so no frame is missed
+            with self._lock:
+                if self.frame_id > last_id and variant in self.frames[-1][1]:
+                    frame_id, encoded = self.frames[-1]
+                    return frame_id, encoded[variant]
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return None
+
+
+    async def view(self, settings):
+        """
+        Yield the JPEG frames of one viewer, at most `settings.fps` per second.
+        A viewer whose previous frame took longer than a frame period to send
+        (the socket send buffer is full) gets the newest frame next, skipping
+        the others, encoded one quality step lower. The quality goes back up
+        a step whenever sends keep up for RECOVERY_SECONDS.
+        """
+        loop = asyncio.get_running_loop()
+        ladder = _quality_ladder(settings.quality)
+        level = 0
+        period = 1.0 / min(settings.fps, self.fps)
+        current = settings
+        calm_since = loop.time()
+        frame_id = 0
+        next_send = 0.0
+        with self.subscription(current):
+            try:
+                while self.running:
+                    delay = next_send - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    frame = await self.wait_frame(frame_id, (current.scale, current.quality))
+                    if frame is None:
+                        continue
+                    frame_id, jpeg = frame
+                    sent = loop.time()
+                    yield jpeg
+                    now = loop.time()
+                    next_send = sent + period
+
+                    if now - sent > period:
+                        calm_since = now
+                        if level == len(ladder) - 1:
+                            continue
+                        level += 1
+                    elif level > 0 and now - calm_since >= RECOVERY_SECONDS:
+                        level -= 1
+                        calm_since = now
+                    else:
+                        continue
+                    adapted = current._replace(quality=ladder[level])
+                    self._switch(current, adapted)
+                    current = adapted
+            finally:
+                # the subscription counts the settings it was opened with
+                self._switch(current, settings)
+
+
+    def _on_tick(self, view):
+        self._view = view
+        self._new_tick.set()
+
+
+    def _run(self):
+        next_frame = time.perf_counter()
+        while not self._stop.is_set():
+            if not self._new_tick.wait(0.1):
+                continue
+            self._new_tick.clear()
+            with self._lock:
+                viewers = list(self._viewers)
+            if not viewers:
+                next_frame = time.perf_counter()
+                continue
+
+            encoded = self._encode_frame(self._view, {(v.scale, v.quality) for v in viewers})
+            with self._lock:
+                self.frame_id += 1
+                self.frames.append((self.frame_id, encoded))
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(self._notify_waiters)
+
+            next_frame += 1.0 / min(self.fps, max(v.fps for v in viewers))
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_frame = time.perf_counter()
+
+
+    def _encode_frame(self, view, variants):
+        profiler = self.scheduler.game.profiler
+        with profiler.time("render"):
+            surface = self.renderer.render(view)
+        with profiler.time("encode"):
+            raw_str = pygame.image.tostring(surface, "RGB")
+            full = Image.frombytes("RGB", surface.get_size(), raw_str)
+            images = {1.0: full}
+            encoded = {}
+            for scale, quality in variants:
+                img = images.get(scale)
+                if img is None:
+                    size = (max(1, round(full.width * scale)), max(1, round(full.height * scale)))
+                    img = images[scale] = full.resize(size, Image.BILINEAR)
+                buf = io.BytesIO()
+                img.save(buf, format="JPEG", quality=quality)
+                encoded[(scale, quality)] = buf.getvalue()
+            return encoded
@@ -1,5 +1,33 @@
+import os
+
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
+SEED = None  # Seed of the simulation RNG; None picks a new one every run
+TICK_RATE = FPS  # Simulation ticks per second when running the API server
+STREAM_FPS = 30  # Most frames per second rendered for /video/stream (shared by all viewers)
+STREAM_PRESETS = {  # /video/stream?preset=...: (resolution scale, JPEG quality, frames per second)
+    "low": (0.5, 40, 10),
+    "medium": (0.75, 60, 20),
+    "high": (1.0, 75, 30),
+}
+STREAM_DEFAULT_PRESET = "high"
+STREAM_BUFFER_SIZE = 4  # Encoded frames kept in the stream ring buffer
+MAX_MATCHES = 32  # Matches one API server hosts at once (POST /matches)
+MAX_ENEMIES = 100  # Enemies per match the API server hosts; a 100-enemy tick takes about 9 ms of the 16 ms at 60 Hz
+MATCH_TICK_BUDGET = 0.004  # Seconds a match may spend per tick before it skips ticks to spare the others
+LONG_POLL_TIMEOUT = 10.0  # Seconds an ?after_tick= request waits for a new tick before answering anyway
+SHARED_MEMORY = False  # Also publish the default match to shared memory for agents on this machine (pyrate/server/shm.py)
+LOCKSTEP_TIMEOUT = 1.0  # Seconds a lockstep match waits for late agents before ticking without their actions
+SPRITE_ANGLE_STEP = 2  # Degrees between cached ship rotations
+SPRITE_CACHE_MB = 80  # Memory cap of the rotated sprite cache (all ship sprites at 2° take ~73 MB)
+SPRITE_CACHE_WARMUP = False  # Rotate every ship sprite at startup (up to the cap) instead of on first use
+ENEMY_AI_LOD_INTERVAL = 1  # Ticks between re-plans of patrolling enemies far from every player (1 re-plans every tick)
+ENEMY_AI_LOD_DISTANCE = 600  # Distance to the nearest player beyond which a patrolling enemy is far
 DEBUG_MODE = True
-INPUT_MODE = "keyboard"  # "keyboard" or "api"
\ No newline at end of file
+EVENT_LOG_LEVEL = "info"  # Lowest game event level kept: "debug" adds collisions and misses
+EVENT_LOG_FILE = None  # JSON-lines file receiving game events (API server), e.g. "events.jsonl"
+REPLAY_FILE = None  # Binary replay of the match served by the API, e.g. "match.pyrr"
+PROFILING = False  # Record per-phase tick, render and encode timings (see /metrics)
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")  # Sprites and textures
+INPUT_MODE = "keyboard"  # "keyboard" or "api"
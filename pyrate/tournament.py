@@ -0,0 +1,198 @@
+# pyrate/tournament.py
+"""
+Headless round-robin tournaments.
+
+Every match is an independent Game run in a worker process, so a tournament
+scales with the number of cores. Results are yielded as soon as each match
+finishes.
+
+    python -m pyrate.tournament --agents dummy random idle --rounds 4 --workers 8
+"""
+import argparse
+import functools
+import importlib
+import itertools
+import json
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pyrate.engine.game import Game
+from pyrate.settings import FPS
+
+# Matches still running after this many ticks are stopped and reported as "timeout"
+MAX_TICKS = 5 * 60 * FPS
+
+MatchSpec = namedtuple("MatchSpec", "match_id team_a team_b seed n_players n_enemies min_distance max_ticks")
+MatchResult = namedtuple("MatchResult", "match_id team_a team_b seed winner state ticks damage_dealt")
+
+
+# -- Policies ------------------------------------------------------------------
+# A policy is called once per tick for every living ship it controls, as
+# policy(game, player_id), and returns an (action, side) tuple, like the dummy
+# agent's decision, or None to do nothing. It must be importable by the workers.
+# Built-in policies draw from `rng`, which play_match() seeds for each team of
+# each match, so a result does not depend on the global random state.
+
+def idle_policy(game, player_id, rng=random):
+    return None
+
+
+def random_policy(game, player_id, rng=random):
+    action = rng.choice(("accelerate", "decelerate", "turn_left", "turn_right", "fire", None))
+    return (action, rng.choice(("left", "right"))) if action else None
+
+
+def dummy_policy(game, player_id, rng=random):
+    """ Same decision rule as tests/dummy_agent.py """
+    ship = game.player_ships[player_id]
+    for e in game.get_ship_sensor(ship):
+        if e["entity"] != "friendly" and e["distance"] < 200:
+            return ("fire", rng.choice(["left", "right"]))
+
+    if ship.speed <= 0.1:
+        return ("accelerate", None)
+
+    r = rng.random()
+    if r < 0.5:
+        return ("accelerate", None)
+    elif r < 0.7:
+        return (rng.choice(["turn_left", "turn_right"]), None)
+    elif r < 0.8:
+        return ("decelerate", None)
+    return None
+
+
+POLICIES = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "dummy": dummy_policy,
+}
+
+
+def resolve_policy(name):
+    """ Return a built-in policy, or import one given as 'package.module:function'. """
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown policy '{name}', expected one of {sorted(POLICIES)} or 'module:function'")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _match_policy(name, seed, team):
+    """ A team's policy for one match: built-in ones get their own generator, seeded by the match and team. """
+    policy = resolve_policy(name)
+    if name in POLICIES:
+        return functools.partial(policy, rng=random.Random(f"{seed}:{team}"))
+    return policy
+
+
+# -- Matches -------------------------------------------------------------------
+
+def play_match(spec):
+    """ Run one match to completion in the current process and return its MatchResult. """
+    policies = {"A": _match_policy(spec.team_a, spec.seed, "A"), "B": _match_policy(spec.team_b, spec.seed, "B")}
+
+    game = Game(spec.n_players, spec.n_enemies, spec.min_distance, seed=spec.seed)
+    while game.state == "playing" and game.tick < spec.max_ticks:
+        for player_id, ship in enumerate(game.player_ships):
+            if not ship.is_living:
+                continue
+            decision = policies[ship.team](game, player_id)
+            if decision and decision[0]:
+                action, side = decision
+                game.queue_action(player_id, action, side or "left")
+        game.update()
+
+    enemies = game.ships_by_uid[len(game.player_ships):]  # destroyed ones included
+    damage_dealt = {"A": 0.0, "B": 0.0, "enemies": float(sum(e.damage_dealt for e in enemies))}
+    for ship in game.player_ships:
+        damage_dealt[ship.team] += ship.damage_dealt
+
+    if game.state == "A victory":
+        winner = spec.team_a
+    elif game.state == "B victory":
+        winner = spec.team_b
+    else:
+        winner = None
+    state = game.state if game.state != "playing" else "timeout"
+    return MatchResult(spec.match_id, spec.team_a, spec.team_b, spec.seed,
+                       winner, state, game.tick, damage_dealt)
+
+
+def round_robin(agents, rounds=1, n_players=4, n_enemies=3, min_distance=300, max_ticks=MAX_TICKS, seed=0):
+    """
+    MatchSpecs for every pair of agents, `rounds` times each.
+    Sides alternate between rounds so no agent keeps the same spawns.
+    """
+    specs = []
+    for r in range(rounds):
+        for a, b in itertools.combinations(agents, 2):
+            if r % 2:
+                a, b = b, a
+            specs.append(MatchSpec(len(specs), a, b, seed + len(specs),
+                                   n_players, n_enemies, min_distance, max_ticks))
+    return specs
+
+
+def run_tournament(specs, workers=None):
+    """
+    Play `specs` on a pool of `workers` processes (one per core by default),
+    yielding each MatchResult as soon as its match finishes.
+    """
+    for name in {name for spec in specs for name in (spec.team_a, spec.team_b)}:
+        resolve_policy(name)  # fail fast, before any worker starts
+
+    if workers == 1:
+        for spec in specs:
+            yield play_match(spec)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_match, spec) for spec in specs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def standings(results):
+    """ Aggregate results into {agent: {"played", "wins", "losses", "draws", "damage_dealt"}}. """
+    table = {}
+    for result in results:
+        for agent, team, opponent in ((result.team_a, "A", result.team_b), (result.team_b, "B", result.team_a)):
+            row = table.setdefault(agent, {"played": 0, "wins": 0, "losses": 0, "draws": 0, "damage_dealt": 0.0})
+            row["played"] += 1
+            row["damage_dealt"] += result.damage_dealt[team]
+            if result.winner is None:
+                row["draws"] += 1
+            elif result.winner == agent and opponent != agent:
+                row["wins"] += 1
+            elif opponent != agent:
+                row["losses"] += 1
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless PyRate round-robin tournament.")
+    parser.add_argument("--agents", nargs="+", default=["dummy", "random"],
+                        help="built-in policy names or 'package.module:function'")
+    parser.add_argument("--rounds", type=int, default=2, help="matches per pair of agents")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--enemies", type=int, default=3)
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    specs = round_robin(args.agents, args.rounds, args.players, args.enemies,
+                        max_ticks=args.max_ticks, seed=args.seed)
+    results = []
+    for result in run_tournament(specs, args.workers):
+        results.append(result)
+        print(json.dumps(result._asdict()), flush=True)
+
+    print(json.dumps(standings(results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
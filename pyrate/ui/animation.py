@@ -31,6 +31,7 @@ class AnimatedEffect:
         self.current_frame = self.frames[frame_index]
 
     def draw(self, surface):
+        """ Returns the rect drawn, or None once finished. """
         if not self.finished:
             rect = self.current_frame.get_rect(center=self.pos)
-            surface.blit(self.current_frame, rect)
+            return surface.blit(self.current_frame, rect)
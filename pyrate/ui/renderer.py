@@ -1,9 +1,12 @@
 # pyrate/ui/renderer.py
 import os
+import threading
+from collections import OrderedDict
 import pygame
-import math
-from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DEBUG_MODE
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DEBUG_MODE, SEED
+from pyrate.settings import SPRITE_ANGLE_STEP, SPRITE_CACHE_MB, SPRITE_CACHE_WARMUP, ASSETS_DIR
 from pyrate.engine.game import Game
+from pyrate.engine.events import ConsoleSink
 from pyrate.ui.animation import AnimatedEffect
 
 # Initialize pygame
@@ -11,6 +14,11 @@ pygame.init()
 pygame.display.set_mode((1, 1))
 
 
+def image_path(name):
+    """ Path of an image in the assets, wherever the process was started from. """
+    return os.path.join(ASSETS_DIR, "images", name)
+
+
 def load_frames(path_list):
     try:
         return [pygame.image.load(p).convert_alpha() for p in path_list]
@@ -19,38 +27,105 @@ def load_frames(path_list):
         return []
 
 
+class RotatedSpriteCache:
+    """
+    Rotated copies of sprites, keyed by sprite and angle rounded to `step`
+    degrees, so drawing a ship is a dictionary lookup and a blit. Holds at
+    most `max_bytes` of pixels, dropping the least recently used rotations.
+    Keys hold the sprite itself (Surfaces hash by identity), so a sprite
+    freed and replaced by another at the same address never hits a stale
+    rotation. Shared by every rendering thread.
+    """
+
+    def __init__(self, step=SPRITE_ANGLE_STEP, max_bytes=SPRITE_CACHE_MB * 2**20):
+        self.step = step
+        self.buckets = max(1, round(360 / step))
+        self.max_bytes = max_bytes
+        self.size = 0  # bytes held
+        self._sprites = OrderedDict()  # (sprite, bucket) -> rotated surface, least recent first
+        self._lock = threading.Lock()
+
+
+    def _rotate(self, sprite, bucket):
+        return pygame.transform.rotate(sprite, -bucket * 360 / self.buckets + 90)
+
+
+    def get(self, sprite, angle):
+        """ `sprite` rotated to face `angle` (degrees, as Ship.angle). """
+        key = (sprite, round(angle * self.buckets / 360) % self.buckets)
+        with self._lock:
+            rotated = self._sprites.get(key)
+            if rotated is not None:
+                self._sprites.move_to_end(key)
+                return rotated
+        rotated = self._rotate(sprite, key[1])
+        with self._lock:
+            if key not in self._sprites:
+                self._sprites[key] = rotated
+                self.size += _surface_bytes(rotated)
+                while self.size > self.max_bytes and len(self._sprites) > 1:
+                    _, dropped = self._sprites.popitem(last=False)
+                    self.size -= _surface_bytes(dropped)
+        return rotated
+
+
+    def warm_up(self, sprites):
+        """ Rotate `sprites` to every angle, stopping before the memory cap. """
+        with self._lock:
+            for sprite in sprites:
+                for bucket in range(self.buckets):
+                    key = (sprite, bucket)
+                    if key in self._sprites:
+                        continue
+                    rotated = self._rotate(sprite, bucket)
+                    if self.size + _surface_bytes(rotated) > self.max_bytes:
+                        return
+                    self._sprites[key] = rotated
+                    self.size += _surface_bytes(rotated)
+
+
+def _surface_bytes(surface):
+    return surface.get_height() * surface.get_pitch()
+
+
 class RendererAssets:
     """
     Preload and cache all assets needed for rendering.
     """
     def __init__(self):
         # Textures
-        self.sea_tex = pygame.image.load("assets/images/sea_tile.png").convert()
+        self.sea_tex = pygame.image.load(image_path("sea_tile.png")).convert()
 
         # Sprite frames
         self.splash_frames = load_frames([
-            'assets/images/splash1.png', 'assets/images/splash2.png',
-            'assets/images/splash3.png', 'assets/images/splash4.png'
+            image_path('splash1.png'), image_path('splash2.png'),
+            image_path('splash3.png'), image_path('splash4.png')
         ])
         self.explosion_frames = load_frames([
-            'assets/images/explosion1.png', 'assets/images/explosion2.png',
-            'assets/images/explosion3.png'
+            image_path('explosion1.png'), image_path('explosion2.png'),
+            image_path('explosion3.png')
         ])
         self.playerA_frames = load_frames([
-            'assets/images/playerA_full.png', 'assets/images/playerA_damaged1.png',
-            'assets/images/playerA_damaged2.png'
+            image_path('playerA_full.png'), image_path('playerA_damaged1.png'),
+            image_path('playerA_damaged2.png')
         ])
         self.playerB_frames = load_frames([
-            'assets/images/playerB_full.png', 'assets/images/playerB_damaged1.png',
-            'assets/images/playerB_damaged2.png'
+            image_path('playerB_full.png'), image_path('playerB_damaged1.png'),
+            image_path('playerB_damaged2.png')
         ])
         self.enemy_frames = load_frames([
-            'assets/images/enemy_full.png', 'assets/images/enemy_damaged1.png',
-            'assets/images/enemy_damaged2.png'
+            image_path('enemy_full.png'), image_path('enemy_damaged1.png'),
+            image_path('enemy_damaged2.png')
         ])
-        # Fonts
+        # Fonts, and the end screen texts rendered once (fonts are not thread-safe)
         self.font = pygame.font.Font(None, 74)
         self.small_font = pygame.font.Font(None, 36)
+        self.titles = {
+            "gameover": self.font.render("Enemies victorious!", True, (255, 0, 0)),
+            "A victory": self.font.render("Team A victorious!", True, (0, 255, 0)),
+            "B victory": self.font.render("Team B victorious!", True, (0, 255, 0)),
+        }
+        self.exit_hint = self.small_font.render("Press any key to exit", True, (255, 255, 255))
         # Overlay
         self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         # Pre-tiled sea background
@@ -59,6 +134,10 @@ class RendererAssets:
         for x in range(0, SCREEN_WIDTH, tw):
             for y in range(0, SCREEN_HEIGHT, th):
                 self.sea_bg.blit(self.sea_tex, (x, y))
+        # Rotated ship sprites
+        self.rotations = RotatedSpriteCache()
+        if SPRITE_CACHE_WARMUP:
+            self.rotations.warm_up(self.playerA_frames + self.playerB_frames + self.enemy_frames)
 
 
 # Instantiate assets once
@@ -72,9 +151,11 @@ def run_game():
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("PyRate")
     clock = pygame.time.Clock()
-    game = Game()
+    game = Game(seed=SEED)
     debug = DEBUG_MODE
-    effects = []
+    if debug:
+        game.events.add_sink(ConsoleSink())
+    renderer = FrameRenderer(debug, surface=screen)
 
     running = True
     while running:
@@ -84,124 +165,163 @@ def run_game():
             if event.type == pygame.KEYDOWN and game.state in ("gameover", "victory"):
                 running = False
 
-        _render_frame(screen, clock, game, _assets, debug, effects)
+        game.update()
+        with game.profiler.time("render"):
+            renderer.render(game.view(sensors=debug))
+        pygame.display.flip()
+        clock.tick(FPS)
 
     pygame.quit()
 
 
-def _render_frame(screen, clock, game, assets, debug, active_effects):
+def _render_frame(screen, view, assets, debug, active_effects, impacts, erase=None, overlay=None):
     """
-    Update game and draw one frame onto 'screen'.
+    Draw a GameView onto 'screen', starting animations for `impacts`.
+    With `erase`, the rects returned by the previous call on the same screen, only
+    those are restored from the background instead of the whole screen.
+    Returns the rects drawn over the background, or None after an end screen.
     """
-    game.update()
+    overlay = overlay if overlay is not None else assets.overlay
+    drawn = None
 
     # End game screens
-    if game.state != "playing":
+    if view.state != "playing":
         screen.fill((0, 0, 0))
-        if game.state == "gameover":
-            title = "Enemies victorious!"
-            color = (255, 0, 0)
-        elif game.state == "A victory":
-            title = "Team A victorious!"
-            color = (0, 255, 0)
-        elif game.state == "B victory":
-            title = "Team B victorious!"
-            color = (0, 255, 0)
-        text = assets.font.render(title, True, color)
-        sub = assets.small_font.render("Press any key to exit", True, (255, 255, 255))
+        text = assets.titles[view.state]
+        sub = assets.exit_hint
         screen.blit(text, text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 20)))
         screen.blit(sub, sub.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 40)))
     else:
-        # Draw background
-        screen.blit(assets.sea_bg, (0, 0))
-        if debug:
-            assets.overlay.fill((0, 0, 0, 0))
+        # Draw background, only where the previous frame drew something when known
+        if erase is None:
+            screen.blit(assets.sea_bg, (0, 0))
+        else:
+            for rect in erase:
+                screen.blit(assets.sea_bg, rect, rect)
+        drawn = []
+        overlay_drawn = []  # the overlay is left fully transparent after every frame
 
         # Player
-        for ship in getattr(game, "player_ships", [game.player_ships]):
+        for ship in view.players:
             if ship.team == "A":
-                draw_ship(screen, ship, assets.playerA_frames, debug)
+                drawn += draw_ship(screen, ship, assets.playerA_frames, debug)
             elif ship.team == "B":
-                draw_ship(screen, ship, assets.playerB_frames, debug)
+                drawn += draw_ship(screen, ship, assets.playerB_frames, debug)
             else:
                 raise ValueError("Invalid team value. Expected 'A' or 'B' but got: " + ship.team)
             
         if debug:
-            # For each player ship, fetch its sensor readings and draw a small dot
-            for ship in game.player_ships:
-                sensor_data = game.get_ship_sensor(ship)
-                for entry in sensor_data:
-                    # entry["angle"] is in degrees; entry["distance"] is in world‐units
-                    angle_deg = entry["angle"]
-                    dist = entry["distance"]
-                    
-                    # Convert to radians and compute offset from the ship's position
-                    rad = math.radians(angle_deg)
-                    dx = math.cos(rad) * dist
-                    dy = math.sin(rad) * dist
-                    
-                    # Compute absolute screen coordinates
-                    px = ship.x + dx
-                    py = ship.y + dy
-                    
-                    # Draw a small circle (radius=3) in red for each sensed‐point
-                    pygame.draw.circle(screen, (255, 0, 0), (int(px), int(py)), 3)
+            # A small red dot on each point sensed by a player ship
+            for points in view.sensor_points:
+                for px, py in points:
+                    drawn.append(pygame.draw.circle(screen, (255, 0, 0), (px, py), 3))
 
         # Enemies
-        for enemy in game.enemy_ships:
+        for enemy in view.enemies:
             if debug:
-                pygame.draw.circle(assets.overlay, (0, 255, 0, 40), (int(enemy.x), int(enemy.y)), enemy.agro_radius)
-            draw_ship(screen, enemy, assets.enemy_frames, debug)
+                overlay_drawn.append(pygame.draw.circle(overlay, (0, 255, 0, 40), (int(enemy.x), int(enemy.y)), enemy.agro_radius))
+            drawn += draw_ship(screen, enemy, assets.enemy_frames, debug)
 
         # Projectiles
-        for proj in game.projectiles:
-            pygame.draw.circle(screen, (0, 0, 0), (int(proj.x), int(proj.y)), proj.radius)
+        radius = view.projectile_radius
+        for x, y in view.projectiles:
+            drawn.append(pygame.draw.circle(screen, (0, 0, 0), (x, y), radius))
             if debug:
-                pygame.draw.circle(assets.overlay, (255, 255, 255, 80), (int(proj.x), int(proj.y)), proj.radius, 1)
+                overlay_drawn.append(pygame.draw.circle(overlay, (255, 255, 255, 80), (x, y), radius, 1))
 
         # Animated effects
-        new = game.impacts[:]
-        game.impacts.clear()
-        for imp in new:
-            x, y = imp[0].x, imp[0].y
-            frames = assets.explosion_frames if imp[1] == "hit" else assets.splash_frames
-            active_effects.append(AnimatedEffect(frames, (x, y), duration=200 if imp[1]=="hit" else 300))
+        for _, x, y, kind in impacts:
+            frames = assets.explosion_frames if kind == "hit" else assets.splash_frames
+            active_effects.append(AnimatedEffect(frames, (x, y), duration=200 if kind=="hit" else 300))
 
         for eff in active_effects[:]:
             eff.update()
             if eff.finished:
                 active_effects.remove(eff)
         for eff in active_effects:
-            eff.draw(screen)
+            drawn.append(eff.draw(screen))
 
-        if debug:
-            screen.blit(assets.overlay, (0, 0))
+        # Blend each drawn part of the overlay once, then clear it for the next frame
+        for rect in overlay_drawn:
+            drawn.append(screen.blit(overlay, rect, rect))
+            overlay.fill((0, 0, 0, 0), rect)
+    return drawn
 
-    pygame.display.flip()
-    clock.tick(FPS)
 
+class FrameRenderer:
+    """
+    Persistent render target for GameViews. Each render() only restores the
+    background under what the previous frame drew (ships, health bars,
+    cannonballs, effects, debug marks) and redraws the current frame there,
+    so its cost follows the number of entities rather than the screen area.
+    The result is the same, pixel for pixel, as a full redraw.
+    Views only hold values, so rendering needs no lock on the Game; one
+    FrameRenderer must only be used by one thread at a time.
+    """
 
-def render_frame_to_surface(game):
+    def __init__(self, debug=DEBUG_MODE, surface=None):
+        self.debug = debug
+        self.surface = surface if surface is not None else pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.overlay = pygame.Surface(self.surface.get_size(), pygame.SRCALPHA)
+        self.effects = []  # animated effects persist between frames
+        self._drawn = None  # rects drawn by the last frame, None to redraw everything
+        self._tick = None  # tick of the last view rendered
+
+
+    def invalidate(self):
+        """ Redraw the whole frame next time, e.g. after drawing on `surface` by other means. """
+        self._drawn = None
+
+
+    def render(self, view):
+        """
+        Draw `view` and return `surface`; it is reused, so copy it to keep a frame.
+        Impacts of the ticks since the last view rendered start their animations, so
+        views may be skipped; rendering an earlier tick restarts the animations.
+        """
+        if self._tick is None or view.tick < self._tick:
+            self.effects.clear()
+            since = view.tick - 1
+        else:
+            since = self._tick
+        impacts = [impact for impact in view.impacts if impact[0] > since]
+        self._tick = view.tick
+        self._drawn = _render_frame(self.surface, view, _assets, self.debug, self.effects, impacts,
+                                    erase=self._drawn, overlay=self.overlay)
+        return self.surface
+
+
+def render_frame_to_surface(game, effects=None):
     """
-    Capture a single frame headlessly and return the Surface.
+    Capture a single frame of a Game (a GameView is taken) and return a new Surface.
+    The caller is responsible for advancing the game (see TickScheduler).
+    Only the impacts of the current tick start animations; pass the same
+    `effects` list between calls to keep them running, or use a FrameRenderer
+    to render many frames.
     """
+    view = game.view(sensors=DEBUG_MODE)
     screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    clock = pygame.time.Clock()
-    effects = []
-    _render_frame(screen, clock, game, _assets, DEBUG_MODE, effects)
+    if effects is None:
+        effects = []
+    impacts = [impact for impact in view.impacts if impact[0] == view.tick]
+    _render_frame(screen, view, _assets, DEBUG_MODE, effects, impacts,
+                  overlay=pygame.Surface(screen.get_size(), pygame.SRCALPHA))
     return screen
 
 
 def draw_entity(screen, entity, sprite, debug=False):
-    rotated = pygame.transform.rotate(sprite, -entity.angle + 90)
-    screen.blit(rotated, rotated.get_rect(center=(int(entity.x), int(entity.y))))
+    """ Returns the rect drawn. """
+    rotated = _assets.rotations.get(sprite, entity.angle)
+    rect = screen.blit(rotated, rotated.get_rect(center=(int(entity.x), int(entity.y))))
     if debug:
-        pygame.draw.polygon(screen, (255, 255, 255), entity.get_hitbox(), 1)
+        rect = rect.union(pygame.draw.polygon(screen, (255, 255, 255), entity.hitbox, 1))
+    return rect
 
 
 def draw_ship(screen, ship, frames, debug=False):
+    """ Returns the rects drawn, none for a sunk ship. """
     if not ship.is_living:
-        return
+        return []
     if ship.health > 50:
         sprite = frames[0]
     elif ship.health > 20:
@@ -209,13 +329,13 @@ def draw_ship(screen, ship, frames, debug=False):
     else:
         sprite = frames[2]
         
-    draw_entity(screen, ship, sprite, debug)
-    draw_health_bar(screen, ship)
+    return [draw_entity(screen, ship, sprite, debug), draw_health_bar(screen, ship)]
 
 
 def draw_health_bar(surface, ship):
+    """ Returns the rect drawn, None for a sunk ship. """
     if not ship.is_living:
-        return
+        return None
     
     bar_width = 40
     bar_height = 6
@@ -225,7 +345,4 @@ def draw_health_bar(surface, ship):
 
     pygame.draw.rect(surface, (100, 0, 0), (x, y, bar_width, bar_height))
     pygame.draw.rect(surface, (0, 200, 0), (x, y, int(bar_width * health_ratio), bar_height))
-    pygame.draw.rect(surface, (255, 255, 255), (x, y, bar_width, bar_height), 1)
-
-
-
+    return pygame.draw.rect(surface, (255, 255, 255), (x, y, bar_width, bar_height), 1)
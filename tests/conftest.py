@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+
+# the renderer opens a display at import
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -1,85 +1,145 @@
-import requests
-import random
-import math
-import time
-
-API_URL = "http://127.0.0.1:8000"
-PLAYER_ID = 0  # indice du vaisseau que cet agent contrôle
-
-def set_control_mode(mode):
-    resp = requests.post(f"{API_URL}/game/control", json={"mode": mode})
-    resp.raise_for_status()
-
-def get_player_status():
-    url = f"{API_URL}/players/{PLAYER_ID}/status"
-    resp = requests.get(url)
-    resp.raise_for_status()
-    return resp.json()
-
-def get_sensor_status():
-    resp = requests.get(f"{API_URL}/players/{PLAYER_ID}/sensor")
-    resp.raise_for_status()
-    return resp.json().get("nearby_ships", [])
-
-def send_command(action, side="left"):
-    url = f"{API_URL}/players/{PLAYER_ID}/command"
-    # Pydantic Command model always requires "side", so we include it even if not firing.
-    if action == "fire":
-        payload = {"action": action, "side": side}
-    else:
-        payload = {"action": action, "side": "left"}
-    resp = requests.post(url, json=payload)
-    resp.raise_for_status()
-    return resp.json()
-
-def update_game():
-    # avance d'un tick ; le serveur gère le clock.tick(FPS)
-    resp = requests.post(f"{API_URL}/game/update")
-    resp.raise_for_status()
-
-def dummy_decision():
-    player = get_player_status()
-    enemies = get_sensor_status()
-    speed = player["speed"]
-
-    # Tir si un ennemi non-friendly est très proche (< 200)
-    for e in enemies:
-        if e["entity"] != "friendly" and e["distance"] < 200:
-            return ("fire", random.choice(["left", "right"]))
-
-    # Si on est quasiment arrêté, accélère
-    if speed <= 0.1:
-        return ("accelerate", None)
-
-    # Sinon choix aléatoire :
-    #  - 50% accelerate
-    #  - 20% tourner (turn_left ou turn_right)
-    #  - 10% décélérer
-    #  - 20% aucun ordre
-    r = random.random()
-    if r < 0.5:
-        return ("accelerate", None)
-    elif r < 0.7:
-        return (random.choice(["turn_left", "turn_right"]), None)
-    elif r < 0.8:
-        return ("decelerate", None)
-    else:
-        return (None, None)
-
-def run():
-    # passe en mode API
-    set_control_mode("api")
-
-    # boucle principale
-    while True:
-        action, side = dummy_decision()
-        if action:
-            if action == "fire":
-                send_command(action, side)
-            else:
-                send_command(action)
-        # Petite pause pour éviter un spam trop élevé
-        time.sleep(0.001)
-
-if __name__ == "__main__":
-    run()
+import requests
+import random
+import math
+import sys
+
+API_URL = "http://127.0.0.1:8000"
+PLAYER_ID = 0  # indice du vaisseau que cet agent contrôle
+last_tick = None  # tick de la dernière observation (ETag du serveur)
+
+def set_control_mode(mode):
+    resp = requests.post(f"{API_URL}/game/control", json={"mode": mode})
+    resp.raise_for_status()
+
+def get_player_status():
+    global last_tick
+    url = f"{API_URL}/players/{PLAYER_ID}/status"
+    # attend le tick suivant au lieu de redemander le même état
+    params = {"after_tick": last_tick} if last_tick is not None else {}
+    resp = requests.get(url, params=params)
+    resp.raise_for_status()
+    last_tick = int(resp.headers["ETag"].strip('"'))
+    return resp.json()
+
+def get_sensor_status():
+    resp = requests.get(f"{API_URL}/players/{PLAYER_ID}/sensor")
+    resp.raise_for_status()
+    return resp.json().get("nearby_ships", [])
+
+def send_command(action, side="left"):
+    url = f"{API_URL}/players/{PLAYER_ID}/command"
+    # Pydantic Command model always requires "side", so we include it even if not firing.
+    if action == "fire":
+        payload = {"action": action, "side": side}
+    else:
+        payload = {"action": action, "side": "left"}
+    resp = requests.post(url, json=payload)
+    resp.raise_for_status()
+    return resp.json()
+
+def create_lockstep_match():
+    # partie en lockstep : le serveur n'avance d'un tick que quand cet agent a joué
+    resp = requests.post(f"{API_URL}/matches", json={"lockstep": True, "agents": [PLAYER_ID]})
+    resp.raise_for_status()
+    return resp.json()["id"]
+
+def update_game(match_id, action, side="left"):
+    # envoie l'action du tick, attend que le tick soit joué et renvoie la nouvelle observation
+    commands = [{"action": action, "side": side or "left"}] if action else []
+    resp = requests.post(f"{API_URL}/matches/{match_id}/game/update",
+                         json={"player_id": PLAYER_ID, "commands": commands})
+    resp.raise_for_status()
+    return resp.json()
+
+def dummy_decision(player=None, enemies=None):
+    if player is None:
+        player = get_player_status()
+        enemies = get_sensor_status()
+    speed = player["speed"]
+
+    # Tir si un ennemi non-friendly est très proche (< 200)
+    for e in enemies:
+        if e["entity"] != "friendly" and e["distance"] < 200:
+            return ("fire", random.choice(["left", "right"]))
+
+    # Si on est quasiment arrêté, accélère
+    if speed <= 0.1:
+        return ("accelerate", None)
+
+    # Sinon choix aléatoire :
+    #  - 50% accelerate
+    #  - 20% tourner (turn_left ou turn_right)
+    #  - 10% décélérer
+    #  - 20% aucun ordre
+    r = random.random()
+    if r < 0.5:
+        return ("accelerate", None)
+    elif r < 0.7:
+        return (random.choice(["turn_left", "turn_right"]), None)
+    elif r < 0.8:
+        return ("decelerate", None)
+    else:
+        return (None, None)
+
+def run():
+    # passe en mode API
+    set_control_mode("api")
+
+    # boucle principale
+    while True:
+        action, side = dummy_decision()
+        if action:
+            if action == "fire":
+                send_command(action, side)
+            else:
+                send_command(action)
+        # pas de pause : get_player_status() attend le tick suivant
+
+def run_lockstep(n_ticks=10_000):
+    # une action par tick, la simulation avance au rythme de l'agent
+    match_id = create_lockstep_match()
+    observation = update_game(match_id, None)
+    for _ in range(n_ticks):
+        if observation["state"] != "playing":
+            break
+        action, side = dummy_decision(observation["status"], observation["nearby_ships"])
+        observation = update_game(match_id, action, side)
+    requests.delete(f"{API_URL}/matches/{match_id}")
+
+def run_shared_memory(n_ticks=10_000):
+    # même machine que le serveur : observations et commandes par mémoire partagée
+    from pyrate.server.shm import SharedMemoryAgent, FRIENDLY
+    resp = requests.post(f"{API_URL}/matches", json={"shared_memory": True})
+    resp.raise_for_status()
+    match = resp.json()
+    requests.post(f"{API_URL}/matches/{match['id']}/game/control", json={"mode": "api"}).raise_for_status()
+    agent = SharedMemoryAgent(match["shared_memory"])
+    tick = -1
+    # vues du segment : à libérer avant agent.close()
+    obs = status = readings = None
+    for _ in range(n_ticks):
+        obs = agent.wait(tick)
+        tick = obs.tick
+        if obs.state != "playing":
+            break
+        status = obs.status[PLAYER_ID]
+        readings = obs.readings[PLAYER_ID][:obs.n_readings[PLAYER_ID]]
+        player = {"speed": float(status["speed"])}
+        enemies = [{"entity": "friendly" if r["entity"] == FRIENDLY else "enemy", "distance": float(r["distance"])}
+                   for r in readings]
+        if not agent.valid(obs):
+            continue  # tick réécrit pendant la lecture
+        action, side = dummy_decision(player, enemies)
+        if action:
+            agent.send(PLAYER_ID, action, side or "left")
+    del obs, status, readings
+    agent.close()
+    requests.delete(f"{API_URL}/matches/{match['id']}")
+
+if __name__ == "__main__":
+    if "--lockstep" in sys.argv:
+        run_lockstep()
+    elif "--shm" in sys.argv:
+        run_shared_memory()
+    else:
+        run()
@@ -0,0 +1,156 @@
+# tests/test_api.py
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pyrate.api import app, registry
+from pyrate.engine.events import DESTROY, STATE
+
+client = TestClient(app)  # without lifespan: matches are only ticked by the tests
+
+
+@pytest.fixture
+def match():
+    response = client.post("/matches", json={"n_players": 2, "n_enemies": 3, "seed": 0})
+    assert response.status_code == 201
+    info = response.json()
+    yield info["id"], registry.get(info["id"])
+    client.delete(f"/matches/{info['id']}")
+
+
+@pytest.mark.parametrize("config", [
+    {"n_players": 0, "n_enemies": 2},
+    {"n_players": 7},
+    {"n_enemies": -1},
+    {"min_distance": -5},
+])
+def test_impossible_matches_are_rejected(config):
+    response = client.post("/matches", json=config)
+    assert response.status_code == 400
+    assert len(registry.list()) == 1  # only the default match
+
+
+def test_match_lifecycle(match):
+    match_id, room = match
+    info = client.get(f"/matches/{match_id}").json()
+    assert (info["n_players"], info["n_enemies"], info["seed"], info["error"]) == (2, 3, 0, None)
+    assert match_id in [m["id"] for m in client.get("/matches").json()]
+    assert client.delete("/matches/default").status_code == 400
+    assert client.delete("/matches/nope").status_code == 404
+    assert client.get("/matches/nope/players/0/status").status_code == 404
+
+
+def test_match_error_is_reported(match):
+    match_id, room = match
+    room.scheduler.error = "RuntimeError: boom"
+    assert client.get(f"/matches/{match_id}").json()["error"] == "RuntimeError: boom"
+
+
+def test_enemy_limit():
+    assert client.post("/matches", json={"n_enemies": registry.max_enemies + 1}).status_code == 400
+
+
+def test_observations_carry_the_tick_as_etag(match):
+    match_id, room = match
+    for kind in ("status", "sensor"):
+        url = f"/matches/{match_id}/players/0/{kind}"
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag == '"0"'
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": f'"7", W/{etag}'}).status_code == 304
+    room.scheduler.step()
+    response = client.get(f"/matches/{match_id}/players/0/status", headers={"If-None-Match": etag})
+    assert (response.status_code, response.headers["ETag"]) == (200, '"1"')
+    assert client.get(f"/matches/{match_id}/players/9/status").status_code == 404
+
+
+def next_tick_actions(room):
+    """ Run a tick and return the actions it applied. """
+    applied = []
+    room.game.queue_action = lambda *action: applied.append(action)
+    room.scheduler.step()
+    del room.game.queue_action
+    return applied
+
+
+def test_commands(match):
+    match_id, room = match
+    url = f"/matches/{match_id}/players/1/command"
+    assert client.post(url, json={"action": "Fire", "side": "right"}).json() == {"status": "ok"}
+    assert client.post(url, json={"action": "jump", "side": "left"}).status_code == 400
+    assert client.post(url, json={"action": "fire", "side": "up"}).status_code == 422
+    assert client.post(f"/matches/{match_id}/players/9/command",
+                       json={"action": "fire", "side": "left"}).status_code == 404
+    assert next_tick_actions(room) == [(1, "fire", "right")]
+    assert next_tick_actions(room) == []
+
+
+def test_batch_commands_are_all_or_nothing(match):
+    match_id, room = match
+    url = f"/matches/{match_id}/players/commands"
+    commands = [{"player_id": 0, "action": "accelerate", "side": "left"},
+                {"player_id": 1, "action": "turn_left", "side": "left"}]
+    assert client.post(url, json={"commands": commands + [{"player_id": 5, "action": "fire", "side": "left"}]}).status_code == 404
+    assert client.post(url, json={"commands": commands + [{"player_id": 0, "action": "jump", "side": "left"}]}).status_code == 400
+    assert client.post(url, json={"commands": commands}).json() == {"status": "ok", "queued": 2, "tick": 1}
+    assert next_tick_actions(room) == [(0, "accelerate", "left"), (1, "turn_left", "left")]
+    assert client.post(url, json={"commands": commands[:1]}).json()["tick"] == 2
+
+
+def test_handlers_do_not_wait_for_the_tick_lock(match):
+    match_id, room = match
+    held = threading.Event()
+
+    def long_tick():
+        with room.scheduler.lock:
+            held.set()
+            time.sleep(1.0)
+
+    thread = threading.Thread(target=long_tick)
+    thread.start()
+    held.wait()
+    start = time.perf_counter()
+    assert client.post(f"/matches/{match_id}/players/0/command",
+                       json={"action": "fire", "side": "left"}).status_code == 200
+    assert client.post(f"/matches/{match_id}/players/commands",
+                       json={"commands": [{"player_id": 1, "action": "fire", "side": "left"}]}).status_code == 200
+    assert client.get(f"/matches/{match_id}/players/0/status").status_code == 200
+    assert client.get(f"/matches/{match_id}/metrics").status_code == 200
+    assert time.perf_counter() - start < 0.5
+    thread.join()
+    assert client.get(f"/matches/{match_id}/players/0/sensor").status_code == 200
+    assert client.get(f"/matches/{match_id}/events").status_code == 200
+
+
+def test_events(match):
+    match_id, room = match
+    url = f"/matches/{match_id}/events"
+    assert client.get(url).json() == {"last_seq": 0, "events": []}
+    room.game.events.emit(DESTROY, 4)
+    room.game.events.emit(STATE, "A victory")
+    response = client.get(url, params={"after": 1}).json()
+    assert response == {"last_seq": 2, "events": [{"seq": 2, "tick": 0, "kind": "state", "state": "A victory"}]}
+    assert [e["kind"] for e in client.get(url, params={"kind": ["destroy"]}).json()["events"]] == ["destroy"]
+    assert client.get(url, params={"kind": "explosion"}).status_code == 400
+
+
+def test_lockstep_match():
+    response = client.post("/matches", json={"n_players": 2, "n_enemies": 1, "seed": 0,
+                                             "lockstep": True, "agents": [0]})
+    assert response.status_code == 201
+    match_id = response.json()["id"]
+    try:
+        url = f"/matches/{match_id}/game/update"
+        for tick in (1, 2):
+            response = client.post(url, json={"player_id": 0, "commands": [{"action": "accelerate", "side": "left"}]})
+            assert response.status_code == 200
+            assert response.json()["tick"] == tick
+        assert client.post(url, json={"player_id": 1}).status_code == 409  # not one of the agents
+        assert client.post(url, json={"player_id": 0, "commands": [{"action": "jump", "side": "left"}]}).status_code == 400
+        assert client.post("/game/update", json={"player_id": 0}).status_code == 409  # the default match ticks on its own
+    finally:
+        client.delete(f"/matches/{match_id}")
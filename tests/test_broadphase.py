@@ -0,0 +1,109 @@
+# tests/test_broadphase.py
+import random
+
+import pytest
+
+from pyrate.engine.broadphase import SpatialHash, aabb_overlap
+from pyrate.engine.entities.enemy import EnemyShip
+from pyrate.engine.game import COLLISION_CELL_SIZE, Game, distance, normalize
+
+
+def all_pairs_collisions(game):
+    """ Ship collisions as handled before the broadphase: every i < j pair, in order. """
+    ships = game.player_ships + game.enemy_ships
+    for i in range(len(ships)):
+        for j in range(i + 1, len(ships)):
+            s1, s2 = ships[i], ships[j]
+            if not game.collide(s1, s2):
+                continue
+            dx, dy = s1.x - s2.x, s1.y - s2.y
+            nx, ny = normalize(dx, dy)
+            overlap = (s1.width/2 + s2.width/2) - distance(s1, s2)
+            if overlap > 0:
+                s1.x += nx * overlap * 1.25
+                s1.y += ny * overlap * 1.25
+                s2.x -= nx * overlap * 1.25
+                s2.y -= ny * overlap * 1.25
+            if not (isinstance(s1, EnemyShip) and isinstance(s2, EnemyShip)):
+                dmg = game.compute_damage(s1, s2) / 3
+                h1, h2 = s1.health, s2.health
+                s1.apply_damage(dmg)
+                s2.apply_damage(dmg)
+                s1.damage_dealt += h2 - s2.health
+                s2.damage_dealt += h1 - s1.health
+    game.enemy_ships = [e for e in game.enemy_ships if e.is_living]
+
+
+def crowded_game(seed, n_enemies):
+    """ Ships packed around the corners of broadphase cells, most of them touching. """
+    game = Game(6, n_enemies, min_distance=0, seed=seed)
+    rng = random.Random(seed)
+    size = COLLISION_CELL_SIZE
+    for ship in game.ships_by_uid:
+        ship.x = size * rng.randint(2, 5) + rng.uniform(-40, 40)
+        ship.y = size * rng.randint(2, 4) + rng.uniform(-40, 40)
+        ship.angle = rng.uniform(0, 360)
+        ship.speed = rng.uniform(0, 5)
+    return game
+
+
+def recorded_pairs(game):
+    """ Record the (uid, uid) pairs compute_damage() is called with, in order. """
+    pairs = []
+    compute_damage = game.compute_damage
+    game.compute_damage = lambda s1, s2: pairs.append((s1.uid, s2.uid)) or compute_damage(s1, s2)
+    return pairs
+
+
+def ship_state(game):
+    return [(s.x, s.y, s.health, s.damage_dealt, s.is_living) for s in game.ships_by_uid], \
+           [e.uid for e in game.enemy_ships]
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("n_enemies", [6, 30])
+def test_broadphase_matches_the_all_pairs_scan(seed, n_enemies):
+    game = crowded_game(seed, n_enemies)
+    reference = game.fork()
+    pairs, reference_pairs = recorded_pairs(game), recorded_pairs(reference)
+    game._handle_ship_collisions()
+    all_pairs_collisions(reference)
+    assert reference_pairs, "the setup should make ships collide"
+    assert pairs == reference_pairs
+    assert ship_state(game) == ship_state(reference)
+
+
+def test_a_pushed_ship_collides_in_its_new_cell():
+    # B overlaps A, and being pushed apart moves it across x = 256 into C's cell
+    game = Game(2, 1, min_distance=0, seed=0)
+    for ship, x in zip(game.ships_by_uid, (200, 220, 280)):
+        ship.x, ship.y, ship.angle, ship.speed = x, 300, 90, 2
+    reference = game.fork()
+    pairs, reference_pairs = recorded_pairs(game), recorded_pairs(reference)
+    game._handle_ship_collisions()
+    all_pairs_collisions(reference)
+    assert reference_pairs == [(0, 1), (1, 2)]
+    assert pairs == reference_pairs
+    assert ship_state(game) == ship_state(reference)
+
+
+def test_spatial_hash_finds_boxes_across_cell_borders():
+    grid = SpatialHash(100)
+    boxes = {
+        "a": (90, 90, 110, 110),      # straddles four cells
+        "b": (105, 0, 120, 95),       # shares cell (1, 0) with a
+        "c": (-50, -50, -10, -10),    # negative coordinates
+        "d": (300, 300, 310, 310),
+        "e": (-20, -20, -5, -5),
+    }
+    for name, box in boxes.items():
+        grid.insert(name, box)
+    names = sorted(boxes)
+    brute_force = {(a, b) for k, a in enumerate(names) for b in names[k + 1:]
+                   if aabb_overlap(boxes[a], boxes[b], margin=0)}
+    assert brute_force <= grid.pairs()
+    assert grid.pairs() == {("a", "b"), ("c", "e")}
+    assert grid.query((95, 95, 96, 96)) == {"a"}
+    grid.remove("a", boxes["a"])
+    assert grid.pairs() == {("c", "e")}
+    assert (0, 0) not in grid.cells  # emptied cells are dropped
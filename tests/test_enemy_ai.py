@@ -0,0 +1,59 @@
+# tests/test_enemy_ai.py
+import random
+
+import pytest
+
+from pyrate.engine import enemy_ai
+from pyrate.engine.game import Game
+from pyrate.engine.input import ACTIONS
+from pyrate.engine.snapshot import pack_snapshot, unpack_snapshot
+from pyrate.server.spectate import SpectatorEncoder
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+def play(game, ticks, seed=0):
+    rng = random.Random(seed)
+    for _ in range(ticks):
+        for player_id in range(len(game.player_ships)):
+            game.queue_action(player_id, rng.choice(ACTIONS), rng.choice(("left", "right")))
+        game.update()
+
+
+@pytest.mark.parametrize("n_enemies", [3, 30, 100])  # per-ship sized, distance matrix, grid
+def test_vectorized_matches_the_per_ship_loop(monkeypatch, n_enemies):
+    monkeypatch.setattr(enemy_ai, "SCALAR_MAX_ENEMIES", 0)
+    vectorized = Game(4, n_enemies, min_distance=40, seed=11)
+    scalar = Game(4, n_enemies, min_distance=40, seed=11)
+    scalar.enemy_ai.update = scalar.enemy_ai._update_each
+    for _ in range(6):
+        play(vectorized, 50, seed=vectorized.tick)
+        play(scalar, 50, seed=scalar.tick)
+        assert pack_snapshot(vectorized.snapshot()) == pack_snapshot(scalar.snapshot())
+
+
+def test_level_of_detail_is_deterministic():
+    game = Game(4, 100, min_distance=40, seed=4)
+    game.enemy_ai.lod_interval = 4
+    start = game.snapshot()
+    fork = game.fork()
+    play(game, 120)
+    play(fork, 120)
+    assert pack_snapshot(game.snapshot()) == pack_snapshot(fork.snapshot())
+    game.restore(start)
+    play(game, 120)
+    assert pack_snapshot(game.snapshot()) == pack_snapshot(fork.snapshot())
+
+
+def test_large_match_smoke():
+    game = Game(4, 300, min_distance=5, seed=1)
+    encoder = SpectatorEncoder((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for _ in range(30):
+        play(game, 1, seed=game.tick)
+        encoder.encode(game.view())
+    assert game.tick == 30
+    data = pack_snapshot(game.snapshot())
+    fork = game.fork()
+    fork.restore(unpack_snapshot(data))
+    play(game, 10, seed=1)
+    play(fork, 10, seed=1)
+    assert pack_snapshot(game.snapshot()) == pack_snapshot(fork.snapshot())
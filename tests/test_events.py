@@ -0,0 +1,78 @@
+# tests/test_events.py
+import json
+
+from pyrate.engine.events import (COLLISION, DEBUG, DESTROY, HIT, INFO, MISS, CallbackSink, EventLog,
+                                  JsonLinesSink, event_to_dict)
+
+
+def test_since_returns_the_events_after_a_cursor():
+    log = EventLog(capacity=8)
+    for uid in range(5):
+        log.emit(DESTROY, uid)
+    assert [e[0] for e in log.since(0)] == [1, 2, 3, 4, 5]
+    assert [e[0] for e in log.since(3)] == [4, 5]
+    assert log.since(5) == []
+    assert log.since(10) == []  # a cursor from the future reads nothing
+    log.emit(HIT, 1, 0, 30, 70)
+    assert [e[2] for e in log.since(3, {HIT})] == [HIT]
+
+
+def test_since_across_the_ring_buffer_wraparound():
+    log = EventLog(capacity=4)
+    for uid in range(10):
+        log.tick = uid
+        log.emit(DESTROY, uid)
+    assert [e[0] for e in log.since(7)] == [8, 9, 10]  # still buffered
+    # a reader whose cursor was overwritten gets what is left, and sees the gap in `seq`
+    overrun = log.since(2)
+    assert [e[0] for e in overrun] == [7, 8, 9, 10]
+    assert overrun[0][0] > 2 + 1
+    assert [e[3] for e in overrun] == [(6,), (7,), (8,), (9,)]
+
+
+def test_level_filters_on_emit():
+    log = EventLog(level=INFO)
+    log.emit(MISS, 1.0, 2.0)
+    log.emit(COLLISION, 0, 1, 5.0, 95.0, 95.0)
+    assert log.seq == 0
+    log.level = DEBUG
+    log.emit(MISS, 1.0, 2.0)
+    assert log.seq == 1
+
+
+def test_flush_hands_each_event_to_sinks_once():
+    log = EventLog(level=DEBUG)
+    batches = []
+    log.add_sink(CallbackSink(batches.append))
+    infos = log.add_sink(CallbackSink(batches.append, level=INFO))
+    log.emit(MISS, 1.0, 2.0)
+    log.emit(DESTROY, 3)
+    log.flush()
+    assert [[e[2] for e in batch] for batch in batches] == [[MISS, DESTROY], [DESTROY]]
+    log.flush()  # nothing new
+    assert len(batches) == 2
+    log.remove_sink(infos)
+    log.emit(MISS, 0.0, 0.0)
+    log.flush()
+    assert [e[0] for e in batches[-1]] == [3]
+
+
+def test_json_lines_sink_batches_and_flushes_on_close(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = EventLog(level=DEBUG)
+    log.add_sink(JsonLinesSink(str(path), level=INFO, batch_size=3))
+    for uid in range(2):
+        log.emit(DESTROY, uid)
+        log.emit(MISS, 0.0, 0.0)  # below the sink's level
+    log.flush()
+    assert path.read_text() == ""  # 2 events buffered, below the batch size
+    log.tick = 7
+    log.emit(HIT, 1, 0, 30.0, 70.0)
+    log.flush()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["kind"] for line in lines] == [DESTROY, DESTROY, HIT]
+    log.emit(DESTROY, 5)
+    log.close()  # writes the rest
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[2] == event_to_dict((5, 7, HIT, (1, 0, 30.0, 70.0)))
+    assert lines[3]["ship"] == 5
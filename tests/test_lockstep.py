@@ -0,0 +1,95 @@
+# tests/test_lockstep.py
+import asyncio
+import time
+
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.snapshot import pack_snapshot
+from pyrate.server.lockstep import LockstepBarrier, StepRejected
+from pyrate.server.scheduler import TickScheduler
+
+
+def barrier(agents=(0, 1), timeout=5.0, seed=0):
+    scheduler = TickScheduler(Game(2, 3, seed=seed), tick_rate=60)
+    return LockstepBarrier(scheduler, agents, timeout)
+
+
+def test_tick_runs_once_every_agent_submitted():
+    lockstep = barrier()
+
+    async def play():
+        first = asyncio.create_task(lockstep.submit(0, [("accelerate", "left")]))
+        await asyncio.sleep(0.05)
+        assert not first.done() and lockstep.scheduler.game.tick == 0
+        await asyncio.gather(first, lockstep.submit(1, [("turn_left", "left")]))
+
+    asyncio.run(play())
+    assert lockstep.scheduler.game.tick == 1
+    assert lockstep.scheduler.view.tick == 1
+    assert lockstep.timeouts == 0
+
+
+def test_submission_order_does_not_matter():
+    async def play(lockstep, order):
+        for tick in range(30):
+            actions = {0: [("accelerate", "left")], 1: [("fire", "right" if tick % 2 else "left")]}
+            await asyncio.gather(*(lockstep.submit(p, actions[p]) for p in order))
+
+    a, b = barrier(seed=5), barrier(seed=5)
+    asyncio.run(play(a, (0, 1)))
+    asyncio.run(play(b, (1, 0)))
+    assert pack_snapshot(a.scheduler.game.snapshot()) == pack_snapshot(b.scheduler.game.snapshot())
+
+
+def test_late_agents_are_timed_out():
+    lockstep = barrier(timeout=0.05)
+    asyncio.run(lockstep.submit(0, []))
+    assert lockstep.scheduler.game.tick == 1
+    assert lockstep.timeouts == 1
+
+
+def test_rejections():
+    lockstep = barrier()
+
+    async def play():
+        with pytest.raises(StepRejected):
+            await lockstep.submit(2, [])  # not an agent
+        waiting = asyncio.create_task(lockstep.submit(0, []))
+        await asyncio.sleep(0)
+        with pytest.raises(StepRejected):
+            await lockstep.submit(0, [])  # twice for the same tick
+        lockstep.close()
+        with pytest.raises(StepRejected):
+            await waiting
+
+    asyncio.run(play())
+    assert lockstep.scheduler.game.tick == 0
+
+
+def test_tick_does_not_block_the_event_loop():
+    lockstep = barrier(agents=(0,))
+    update = lockstep.scheduler.game.update
+
+    def slow_update():
+        time.sleep(0.2)
+        update()
+
+    lockstep.scheduler.game.update = slow_update
+
+    async def play():
+        beats = 0
+
+        async def heartbeat():
+            nonlocal beats
+            while True:
+                await asyncio.sleep(0.01)
+                beats += 1
+
+        task = asyncio.create_task(heartbeat())
+        await lockstep.submit(0, [])
+        task.cancel()
+        return beats
+
+    assert asyncio.run(play()) >= 5
+    assert lockstep.scheduler.game.tick == 1
@@ -0,0 +1,66 @@
+# tests/test_profiler.py
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.profiler import Profiler
+
+
+def test_summary_percentiles():
+    profiler = Profiler(enabled=True)
+    for ms in range(1, 101):
+        profiler.record("tick", ms / 1000)
+    summary = profiler.summary()["tick"]
+    assert summary["count"] == 100
+    assert summary["mean_ms"] == pytest.approx(50.5)
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"], summary["max_ms"]) == pytest.approx((50, 95, 99, 100))
+
+
+def test_window_keeps_the_latest_samples():
+    profiler = Profiler(enabled=True, window=10)
+    for ms in range(1, 21):
+        profiler.record("tick", ms / 1000)
+    summary = profiler.summary()["tick"]
+    assert summary["count"] == 10
+    assert summary["max_ms"] == pytest.approx(20)
+    assert summary["mean_ms"] == pytest.approx(15.5)
+
+
+def test_disabled_records_nothing_and_enable_starts_over():
+    profiler = Profiler()
+    profiler.record("tick", 1.0)
+    with profiler.time("render"):
+        pass
+    assert profiler.summary() == {}
+    profiler.enable()
+    profiler.record("tick", 1.0)
+    profiler.disable()
+    profiler.record("tick", 2.0)
+    assert profiler.summary()["tick"]["count"] == 1
+    profiler.enable()
+    assert profiler.summary() == {}
+
+
+def test_a_tick_begun_while_disabled_is_not_timed():
+    profiler = Profiler()
+    profiler.begin_tick()
+    profiler.enable()  # from another thread, in the middle of the tick
+    profiler.lap("input")
+    profiler.end_tick()
+    assert profiler.summary() == {}
+    profiler.begin_tick()
+    profiler.lap("input")
+    profiler.end_tick()
+    assert profiler.summary()["tick"]["count"] == 1
+    assert profiler.summary()["input"]["count"] == 1
+
+
+def test_game_phases():
+    game = Game(2, 3, seed=0)
+    game.profiler.enable()
+    for _ in range(5):
+        game.update()
+    summary = game.profiler.summary()
+    assert {"input", "player_physics", "enemy_ai", "projectiles", "hits", "ship_collisions",
+            "end_conditions", "tick"} <= set(summary)
+    assert all(phase["count"] == 5 for phase in summary.values())
+    assert summary["tick"]["max_ms"] >= summary["enemy_ai"]["max_ms"]
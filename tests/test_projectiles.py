@@ -0,0 +1,69 @@
+# tests/test_projectiles.py
+import pytest
+
+from pyrate.engine.entities.projectile import CANNONBALL_RANGE, CANNONBALL_SPEED, ProjectilePool
+
+
+def test_killed_slots_are_reused_before_growing():
+    pool = ProjectilePool(capacity=4)
+    assert [pool.spawn(0, 0, 0) for _ in range(4)] == [0, 1, 2, 3]
+    pool.kill([2, 0, 2])  # killing twice is harmless
+    assert len(pool) == 2
+    assert {pool.spawn(10, 0, 0), pool.spawn(20, 0, 0)} == {0, 2}
+    assert len(pool) == 4 and pool.capacity == 4
+
+
+def test_full_pool_grows_and_keeps_its_cannonballs():
+    pool = ProjectilePool(capacity=2)
+    for k in range(5):
+        pool.spawn(k, -k, 90, owner=k)
+    assert (pool.capacity, len(pool)) == (8, 5)
+    assert pool.positions() == [(k, -k) for k in range(5)]
+    assert pool.owner[pool.live_slots()].tolist() == list(range(5))
+    assert pool.spawn(0, 0, 0) == 5  # the free slots added by the growth come next
+
+
+def test_live_slots_follow_firing_order_after_reuse():
+    pool = ProjectilePool(capacity=3)
+    for k in range(3):
+        pool.spawn(k, 0, 0)
+    pool.kill([0])
+    pool.spawn(9, 0, 0)  # reuses slot 0, but was fired last
+    assert pool.live_slots().tolist() == [1, 2, 0]
+    assert [x for x, _ in pool.positions()] == [1, 2, 9]
+
+
+def test_out_of_range_cannonballs_are_reported_once_past_their_range():
+    pool = ProjectilePool()
+    long_shot = pool.spawn(0, 0, 0)
+    short_shot = pool.spawn(0, 0, 90, max_distance=20)
+    ticks = {}
+    for tick in range(1, CANNONBALL_RANGE // CANNONBALL_SPEED + 3):
+        exceeded = pool.update()
+        for slot in exceeded:
+            assert int(slot) not in ticks  # killed once reported
+            ticks[int(slot)] = tick
+        pool.kill(exceeded)
+    assert ticks[short_shot] == 3  # 24 px > 20
+    assert ticks[long_shot] == CANNONBALL_RANGE // CANNONBALL_SPEED + 1
+    assert len(pool) == 0
+
+
+def test_update_moves_only_live_cannonballs():
+    pool = ProjectilePool(capacity=2)
+    pool.spawn(0, 0, 90, speed=4)
+    dead = pool.spawn(0, 0, 0)
+    pool.kill([dead])
+    pool.update()
+    assert pool.x[0] == pytest.approx(0) and pool.y[0] == pytest.approx(4)
+    assert pool.x[dead] == 0
+
+
+def test_copy_is_independent():
+    pool = ProjectilePool(capacity=2)
+    pool.spawn(0, 0, 0)
+    copy = pool.copy()
+    copy.update()
+    copy.spawn(5, 5, 0)
+    assert pool.x[0] == 0 and len(pool) == 1
+    assert len(copy) == 2
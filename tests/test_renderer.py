@@ -0,0 +1,87 @@
+# tests/test_renderer.py
+import random
+
+import pygame
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.input import ACTIONS
+from pyrate.settings import FPS
+from pyrate.ui.renderer import FrameRenderer, RotatedSpriteCache, _surface_bytes
+
+
+def sprite(color, size=(10, 10)):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+
+def quarter_turn_cache(entries):
+    """ A cache of square sprites at 90° steps (rotations keep their size) holding `entries` of them. """
+    entry = _surface_bytes(sprite((0, 0, 0)))
+    return RotatedSpriteCache(step=90, max_bytes=entries * entry), entry
+
+
+def test_rotations_are_cached_per_angle_bucket():
+    cache, _ = quarter_turn_cache(8)
+    red = sprite((255, 0, 0), (10, 20))
+    facing_right = cache.get(red, 0)
+    assert facing_right.get_size() == (20, 10)
+    assert cache.get(red, 30) is facing_right  # rounds to the 0° bucket
+    assert cache.get(red, 90).get_size() == (10, 20)
+    assert cache.get(red, 360) is facing_right
+
+
+def test_least_recently_used_rotations_are_evicted_first():
+    cache, entry = quarter_turn_cache(3)
+    red = sprite((255, 0, 0))
+    r0, r90, r180 = cache.get(red, 0), cache.get(red, 90), cache.get(red, 180)
+    assert cache.size == 3 * entry
+    assert cache.get(red, 0) is r0  # now the most recent
+    cache.get(red, 270)  # over the cap: drops 90°, the least recently used
+    assert cache.size == 3 * entry
+    assert cache.get(red, 0) is r0
+    assert cache.get(red, 180) is r180
+    assert cache.get(red, 90) is not r90
+
+
+def test_size_stays_under_the_byte_cap():
+    cache, entry = quarter_turn_cache(5)
+    sprites = [sprite((k, k, k)) for k in range(4)]
+    for angle in range(0, 720, 45):
+        for s in sprites:
+            cache.get(s, angle)
+            assert cache.size <= cache.max_bytes
+    assert cache.size == 5 * entry
+    cache, entry = quarter_turn_cache(6)
+    cache.warm_up(sprites)  # 16 rotations, stops at the cap
+    assert cache.size == 6 * entry
+
+
+def test_a_new_sprite_never_gets_the_rotation_of_a_freed_one():
+    cache, _ = quarter_turn_cache(64)
+    for k in range(32):  # freed surfaces' addresses get reused
+        color = (k * 8, 255 - k * 8, 0)
+        assert cache.get(sprite(color), 0).get_at((5, 5))[:3] == color
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_dirty_rectangles_match_a_full_redraw(monkeypatch, debug):
+    now = [0]
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: now[0])  # the effects' clock
+    game = Game(4, 6, min_distance=40, seed=5)
+    game.control_mode = "api"
+    incremental, full = FrameRenderer(debug), FrameRenderer(debug)
+    rng = random.Random(5)
+    effects_seen = 0
+    for _ in range(150):
+        for player_id in range(len(game.player_ships)):
+            game.queue_action(player_id, rng.choice(ACTIONS), rng.choice(("left", "right")))
+        game.update()
+        now[0] += 1000 // FPS
+        view = game.view(sensors=debug)
+        full.invalidate()
+        expected = pygame.image.tobytes(full.render(view), "RGB")
+        assert pygame.image.tobytes(incremental.render(view), "RGB") == expected, view.tick
+        effects_seen += len(incremental.effects)
+    assert effects_seen, "the match should show hits or splashes"
@@ -0,0 +1,61 @@
+# tests/test_replay.py
+import random
+
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.input import ACTIONS
+from pyrate.engine.replay import ReplayPlayer, ReplayRecorder
+from pyrate.engine.snapshot import pack_snapshot
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """ Path of a 250-tick replay in chunks of 40 ticks, and the live state after every tick. """
+    path = tmp_path / "match.pyrr"
+    game = Game(4, 3, min_distance=40, seed=3)
+    game.control_mode = "api"
+    recorder = ReplayRecorder.attach(str(path), game, keyframe_interval=40)
+    rng = random.Random(0)
+    states = {game.tick: pack_snapshot(game.snapshot())}
+    for _ in range(250):
+        for player_id in range(len(game.player_ships)):
+            if rng.random() < 0.5:
+                game.queue_action(player_id, rng.choice(ACTIONS), rng.choice(("left", "right")))
+        game.update()
+        states[game.tick] = pack_snapshot(game.snapshot())
+    recorder.close()
+    return str(path), states
+
+
+def test_seek_matches_the_live_match(recorded):
+    path, states = recorded
+    player = ReplayPlayer(path)
+    assert (player.first_tick, player.last_tick) == (0, 250)
+    assert len(player.chunks) > 1
+    # forward within a chunk, across chunks, then backwards
+    for tick in (10, 35, 41, 200, 250, 120, 0, 81):
+        assert pack_snapshot(player.seek(tick).snapshot()) == states[tick], tick
+
+
+def test_ticks_match_the_live_match(recorded):
+    path, states = recorded
+    player = ReplayPlayer(path)
+    seen = [game.tick for game in player.ticks(30, 130, step=25)]
+    assert seen == [30, 55, 80, 105, 130]
+    for game in player.ticks(95, 180):
+        assert pack_snapshot(game.snapshot()) == states[game.tick], game.tick
+
+
+def test_seek_clamps_to_the_recorded_range(recorded):
+    path, states = recorded
+    player = ReplayPlayer(path)
+    assert player.seek(10_000).tick == 250
+    assert player.seek(-5).tick == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"RIFF" + bytes(20))
+    with pytest.raises(ValueError):
+        ReplayPlayer(str(path))
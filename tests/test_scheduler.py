@@ -0,0 +1,90 @@
+# tests/test_scheduler.py
+import asyncio
+import time
+
+from pyrate.engine.game import Game
+from pyrate.server.scheduler import SharedScheduler, TickScheduler
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_a_failing_match_does_not_stop_the_others(capsys):
+    healthy = TickScheduler(Game(2, 1, seed=0), tick_rate=200)
+    failing = TickScheduler(Game(2, 1, seed=0), tick_rate=200)
+
+    def update():
+        raise RuntimeError("boom")
+
+    failing.game.update = update
+    shared = SharedScheduler(tick_rate=200, tick_budget=1.0)
+    shared.add(failing)
+    shared.add(healthy)
+    shared.start()
+    try:
+        wait_for(lambda: healthy.game.tick >= 20)
+    finally:
+        shared.stop()
+
+    assert failing.error == "RuntimeError: boom"
+    assert shared.schedulers == [healthy]
+    assert healthy.error is None
+    assert "boom" in capsys.readouterr().err
+    shared.remove(failing)  # deleting the match afterwards still works
+
+
+def test_tick_scheduler_records_its_error(capsys):
+    scheduler = TickScheduler(Game(2, 1, seed=0), tick_rate=200)
+    scheduler.game.update = lambda: 1 / 0
+    scheduler.start()
+    wait_for(lambda: scheduler.error is not None)
+    scheduler.stop()
+    assert scheduler.error.startswith("ZeroDivisionError")
+
+
+def test_ticks_at_a_fixed_rate_without_viewers():
+    scheduler = TickScheduler(Game(2, 1, seed=0), tick_rate=50)
+    views = []
+    scheduler.add_listener(views.append)
+    start = time.perf_counter()
+    scheduler.start()
+    time.sleep(0.5)
+    scheduler.stop()
+    elapsed = time.perf_counter() - start
+    ticks = scheduler.game.tick
+    assert 0.6 * 50 * elapsed <= ticks <= 50 * elapsed + 2
+    assert [view.tick for view in views] == list(range(1, ticks + 1))
+    assert scheduler.view.tick == ticks
+
+
+def test_next_tick_wakes_the_event_loop():
+    scheduler = TickScheduler(Game(2, 1, seed=0), tick_rate=100)
+
+    async def wait_two_ticks():
+        scheduler.start()
+        try:
+            for _ in range(2):
+                await asyncio.wait_for(scheduler.next_tick(), 1.0)
+            return scheduler.view.tick
+        finally:
+            scheduler.stop()
+
+    assert asyncio.run(wait_two_ticks()) >= 2
+
+
+def test_shared_scheduler_ticks_every_match():
+    schedulers = [TickScheduler(Game(2, 1, seed=seed), tick_rate=100) for seed in range(3)]
+    shared = SharedScheduler(tick_rate=100, tick_budget=1.0)
+    for scheduler in schedulers:
+        shared.add(scheduler)
+    shared.start()
+    try:
+        wait_for(lambda: all(scheduler.game.tick >= 10 for scheduler in schedulers))
+    finally:
+        shared.stop()
+    ticks = [scheduler.game.tick for scheduler in schedulers]
+    assert max(ticks) - min(ticks) <= 1
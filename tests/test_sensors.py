@@ -0,0 +1,44 @@
+# tests/test_sensors.py
+from pyrate.engine.game import Game
+from pyrate.server.scheduler import TickScheduler
+from pyrate.server.stream import FrameProducer, StreamSettings
+
+
+def readings(game):
+    return [game.get_ship_sensor(ship) for ship in game.player_ships]
+
+
+def test_readings_are_cached_per_tick():
+    game = Game(4, 3, seed=0)
+    game.update()
+    first = readings(game)
+    assert readings(game) == first
+    game.update()
+    assert readings(game) != first
+
+
+def test_debug_drawing_does_not_change_agent_readings():
+    drawn, plain = Game(4, 3, seed=8), Game(4, 3, seed=8)
+    for tick in range(1, 121):
+        drawn.update()
+        plain.update()
+        view = drawn.view(sensors=True)
+        assert len(view.sensor_points) == 4
+        if tick % 10 == 0:
+            assert readings(drawn) == readings(plain)
+    assert drawn.sensor_rng.getstate() == plain.sensor_rng.getstate()
+
+
+def test_stream_adds_debug_sensors_only_while_watched():
+    scheduler = TickScheduler(Game(2, 1, seed=0), tick_rate=60)
+    producer = FrameProducer(scheduler, fps=10)
+    producer.renderer.debug = True
+    settings = StreamSettings(1.0, 75, 10)
+    assert not scheduler.view_sensors
+    with producer.subscription(settings):
+        with producer.subscription(settings):
+            assert scheduler.view_sensors
+        assert scheduler.view_sensors
+    assert not scheduler.view_sensors
+    scheduler.step()
+    assert scheduler.view.sensor_points == ()
@@ -0,0 +1,69 @@
+# tests/test_shm.py
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.server.scheduler import TickScheduler
+from pyrate.server.shm import MAILBOX_SIZE, RING_SIZE, SharedMemoryAgent, SharedMemoryChannel
+
+
+@pytest.fixture
+def channel():
+    scheduler = TickScheduler(Game(2, 3, seed=0), tick_rate=60)
+    channel = SharedMemoryChannel(None, scheduler)
+    agent = SharedMemoryAgent(channel.name)
+    yield scheduler, agent
+    agent.close()
+    channel.close()
+
+
+def test_every_tick_is_published(channel):
+    scheduler, agent = channel
+    assert agent.tick == 0
+    for _ in range(3):
+        scheduler.step()
+    observation = agent.latest()
+    assert (observation.tick, observation.state) == (3, "playing")
+    assert observation.seq % 2 == 0
+    game = scheduler.game
+    assert list(observation.status["health"]) == [ship.health for ship in game.player_ships]
+    assert list(observation.n_readings) == [len(game.ships_by_uid) - 1] * 2
+    del observation
+
+
+def test_seqlock_detects_a_reused_slot(channel):
+    scheduler, agent = channel
+    observation = agent.latest()
+    for _ in range(RING_SIZE - 1):
+        scheduler.step()
+    assert agent.valid(observation)
+    scheduler.step()  # the tick RING_SIZE later rewrites the slot
+    assert not agent.valid(observation)
+    assert agent.wait(after_tick=RING_SIZE - 1, timeout=0).tick == RING_SIZE
+    assert agent.wait(after_tick=RING_SIZE, timeout=0) is None
+    del observation
+
+
+def test_commands_reach_the_next_tick(channel):
+    scheduler, agent = channel
+    queued = []
+    scheduler.game.queue_action = lambda *action: queued.append(action)
+    agent.send(1, "fire", "right")
+    agent.send(0, "accelerate")
+    scheduler.step()
+    assert queued == [(0, "accelerate", "left"), (1, "fire", "right")]  # in player id order
+    scheduler.step()
+    assert len(queued) == 2
+
+
+def test_send_rejects_bad_commands_and_full_mailboxes(channel):
+    scheduler, agent = channel
+    with pytest.raises(ValueError):
+        agent.send(0, "jump")
+    with pytest.raises(ValueError):
+        agent.send(0, "fire", "up")
+    for _ in range(MAILBOX_SIZE):
+        agent.send(0, "turn_left")
+    with pytest.raises(BufferError):
+        agent.send(0, "turn_left")
+    scheduler.step()
+    agent.send(0, "turn_left")  # drained by the tick
@@ -0,0 +1,76 @@
+# tests/test_snapshot.py
+import random
+
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.input import ACTIONS
+from pyrate.engine.snapshot import FORMAT_VERSION, pack_snapshot, unpack_snapshot
+
+
+def play(game, ticks, seed=0):
+    rng = random.Random(seed)
+    for _ in range(ticks):
+        for player_id in range(len(game.player_ships)):
+            game.queue_action(player_id, rng.choice(ACTIONS), rng.choice(("left", "right")))
+        game.update()
+
+
+def state(game):
+    return pack_snapshot(game.snapshot())
+
+
+@pytest.mark.parametrize("n_enemies", [3, 30])
+def test_restore_plays_out_like_the_original(n_enemies):
+    game = Game(4, n_enemies, min_distance=40, seed=7)
+    play(game, 60)
+    snapshot = game.snapshot()
+    play(game, 120, seed=1)
+    after = state(game)
+
+    game.restore(snapshot)
+    play(game, 120, seed=1)
+    assert state(game) == after
+
+
+def test_fork_is_independent_and_deterministic():
+    game = Game(4, 3, seed=3)
+    play(game, 30)
+    before = state(game)
+    fork = game.fork()
+    play(fork, 90, seed=2)
+    assert state(game) == before
+
+    play(game, 90, seed=2)
+    assert state(game) == state(fork)
+
+
+def test_pack_round_trip():
+    game = Game(4, 3, seed=5)
+    play(game, 200)  # with cannonballs in flight and pending actions
+    game.queue_action(0, "fire", "right")
+    data = state(game)
+    assert data[0] == FORMAT_VERSION
+    assert pack_snapshot(unpack_snapshot(data)) == data
+
+    fork = game.fork()
+    fork.restore(unpack_snapshot(data))
+    play(game, 60, seed=9)
+    play(fork, 60, seed=9)
+    assert state(game) == state(fork)
+
+
+def test_pack_more_than_255_ships():
+    game = Game(4, 300, min_distance=5, seed=1)
+    play(game, 5)
+    snapshot = game.snapshot()
+    unpacked = unpack_snapshot(pack_snapshot(snapshot))
+    assert unpacked.alive_enemies == snapshot.alive_enemies
+    assert unpacked.ships == snapshot.ships
+
+
+def test_unpack_rejects_other_versions():
+    data = bytearray(state(Game(2, 1, seed=0)))
+    data[0] = FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        unpack_snapshot(bytes(data))
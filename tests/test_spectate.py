@@ -0,0 +1,67 @@
+# tests/test_spectate.py
+import struct
+
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.server.spectate import KEYFRAME, DELTA, SpectatorEncoder
+from pyrate.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+def decode(message, ships):
+    """ Apply a message to `ships` (uid -> (flags, x, y, angle, health)) as pyrate/web/spectator.html does. """
+    kind, tick, _ = struct.unpack_from("<BIB", message, 0)
+    offset = 6
+    if kind == KEYFRAME:
+        offset += 5
+        ships.clear()
+        (count,) = struct.unpack_from("<H", message, offset)
+        offset += 2
+        for _ in range(count):
+            uid, *values, _agro = struct.unpack_from("<HBhhHBH", message, offset)
+            ships[uid] = tuple(values)
+            offset += 12
+    else:
+        (count,) = struct.unpack_from("<H", message, offset)
+        offset += 2
+        for _ in range(count):
+            uid, *values = struct.unpack_from("<HBhhHB", message, offset)
+            ships[uid] = tuple(values)
+            offset += 10
+        (sunk,) = struct.unpack_from("<H", message, offset)
+        for uid in struct.unpack_from(f"<{sunk}H", message, offset + 2):
+            del ships[uid]
+        offset += 2 + 2 * sunk
+    (projectiles,) = struct.unpack_from("<H", message, offset)
+    offset += 2 + 4 * projectiles
+    impacts = message[offset]
+    assert len(message) == offset + 1 + 5 * impacts
+    return kind, tick
+
+
+@pytest.mark.parametrize("n_enemies", [3, 300])
+def test_deltas_rebuild_the_keyframes(n_enemies):
+    game = Game(4, n_enemies, min_distance=5, seed=2)
+    encoder = SpectatorEncoder((SCREEN_WIDTH, SCREEN_HEIGHT), keyframe_interval=30)
+    reference = SpectatorEncoder((SCREEN_WIDTH, SCREEN_HEIGHT), keyframe_interval=1)
+    ships, expected = {}, {}
+    kinds = set()
+    for _ in range(90):
+        game.update()
+        view = game.view()
+        kind, tick = decode(encoder.encode(view), ships)
+        decode(reference.encode(view), expected)
+        kinds.add(kind)
+        assert tick == game.tick
+        assert ships == expected
+    assert kinds == {KEYFRAME, DELTA}
+    assert len(ships) == len(game.player_ships) + len(game.enemy_ships)
+
+
+def test_positions_out_of_the_screen():
+    game = Game(2, 1, seed=0)
+    game.enemy_ships[0].x, game.enemy_ships[0].y = -12.5, 1e6
+    ships = {}
+    decode(SpectatorEncoder((SCREEN_WIDTH, SCREEN_HEIGHT)).encode(game.view()), ships)
+    _, x, y, _, _ = ships[game.enemy_ships[0].uid]
+    assert (x, y) == (-100, 32767)
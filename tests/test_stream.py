@@ -0,0 +1,73 @@
+# tests/test_stream.py
+import asyncio
+
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.server import stream
+from pyrate.server.scheduler import TickScheduler
+from pyrate.server.stream import FrameProducer, StreamSettings
+
+
+@pytest.fixture
+def producer():
+    scheduler = TickScheduler(Game(2, 3, seed=0), tick_rate=30)
+    producer = FrameProducer(scheduler, fps=30)
+    encoded = []
+    encode_frame = producer._encode_frame
+    producer._encode_frame = lambda view, variants: encoded.append(variants) or encode_frame(view, variants)
+    producer.encoded = encoded
+    scheduler.start()
+    producer.start()
+    yield producer
+    producer.stop()
+    scheduler.stop()
+
+
+def test_viewers_share_each_encoded_frame(producer):
+    settings = StreamSettings(0.5, 60, 10)
+
+    async def watch(frames):
+        async for jpeg in producer.view(settings):
+            frames.append(jpeg)
+            if len(frames) == 5:
+                return
+
+    async def two_viewers():
+        first, second = [], []
+        await asyncio.gather(watch(first), watch(second))
+        return first, second
+
+    first, second = asyncio.run(two_viewers())
+    assert all(jpeg.startswith(b"\xff\xd8") for jpeg in first + second)
+    # the same bytes objects reach both viewers: each frame is encoded once for everyone
+    assert {id(jpeg) for jpeg in first} & {id(jpeg) for jpeg in second}
+    assert all(variants == {(0.5, 60)} for variants in producer.encoded)
+    assert producer.subscribers == 0
+    assert not producer.scheduler.view_sensors
+
+
+def test_quality_steps_down_for_a_slow_viewer_and_back_up(producer, monkeypatch):
+    monkeypatch.setattr(stream, "RECOVERY_SECONDS", 0.3)
+    settings = StreamSettings(0.25, 75, 10)
+    qualities = []
+
+    async def watch():
+        frames = 0
+        async for _ in producer.view(settings):
+            (current,) = producer._viewers  # the settings this frame was encoded with
+            qualities.append(current.quality)
+            frames += 1
+            if frames <= 4:
+                await asyncio.sleep(0.25)  # longer than a 0.1 s frame period: congested
+            elif current.quality == settings.quality or frames > 60:
+                return
+
+    asyncio.run(watch())
+    assert qualities[:4] == [75, 60, 45, 30]
+    assert qualities[-1] == 75  # recovered, one step per RECOVERY_SECONDS
+    recovery = qualities[4:]
+    assert recovery == sorted(recovery)
+    assert producer.subscribers == 0
+    # every variant encoded was one a viewer was shown
+    assert {quality for variants in producer.encoded for _, quality in variants} == set(qualities)
@@ -0,0 +1,57 @@
+# tests/test_tournament.py
+import random
+import time
+
+from pyrate.tournament import MatchResult, MatchSpec, play_match, round_robin, run_tournament, standings
+
+
+def sleepy_policy(game, player_id):
+    """ Idle, but slow to start: matches of it only finish quickly side by side. """
+    if game.tick == 0 and player_id == 0:
+        time.sleep(1.0)
+    return None
+
+
+def test_play_match_does_not_depend_on_global_random_state():
+    spec = MatchSpec(0, "dummy", "random", seed=3, n_players=2, n_enemies=2, min_distance=300, max_ticks=400)
+    random.seed(1)
+    first = play_match(spec)
+    random.seed(2)
+    state = random.getstate()
+    second = play_match(spec)
+    assert random.getstate() == state  # left alone for the rest of the process
+    assert first == second
+    other_seed = play_match(spec._replace(seed=4))
+    assert other_seed != first
+
+
+def test_round_robin_alternates_sides_and_seeds():
+    specs = round_robin(["a", "b", "c"], rounds=2, seed=10)
+    assert [(s.team_a, s.team_b) for s in specs] == [("a", "b"), ("a", "c"), ("b", "c"),
+                                                     ("b", "a"), ("c", "a"), ("c", "b")]
+    assert [s.seed for s in specs] == list(range(10, 16))
+
+
+def test_workers_play_matches_in_parallel_with_the_same_results():
+    specs = round_robin(["dummy", "random"], rounds=2, n_players=2, n_enemies=1, max_ticks=200)
+    sequential = sorted(run_tournament(specs, workers=1))
+    parallel = sorted(run_tournament(specs, workers=2))
+    assert parallel == sequential
+
+    sleepy = round_robin(["test_tournament:sleepy_policy", "idle"], rounds=2, n_players=2, n_enemies=1, max_ticks=5)
+    start = time.perf_counter()
+    results = list(run_tournament(sleepy, workers=2))
+    assert len(results) == 2
+    assert time.perf_counter() - start < 1.8  # two one-second matches, side by side
+
+
+def test_standings():
+    results = [
+        MatchResult(0, "x", "y", 0, "x", "A victory", 100, {"A": 50.0, "B": 10.0, "enemies": 0.0}),
+        MatchResult(1, "y", "x", 1, None, "timeout", 900, {"A": 5.0, "B": 5.0, "enemies": 30.0}),
+        MatchResult(2, "x", "z", 2, None, "gameover", 400, {"A": 0.0, "B": 20.0, "enemies": 90.0}),
+    ]
+    table = standings(results)
+    assert table["x"] == {"played": 3, "wins": 1, "losses": 0, "draws": 2, "damage_dealt": 55.0}
+    assert table["y"] == {"played": 2, "wins": 0, "losses": 1, "draws": 1, "damage_dealt": 15.0}
+    assert table["z"]["draws"] == 1
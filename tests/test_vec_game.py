@@ -0,0 +1,70 @@
+# tests/test_vec_game.py
+import numpy as np
+import pytest
+
+from pyrate.engine.game import Game
+from pyrate.engine.vec_game import VecGame, VEC_ACTIONS, STATE_NAMES, PLAYING
+
+# VEC_ACTIONS codes as Game.queue_action() arguments
+QUEUED = {VEC_ACTIONS.index("accelerate"): ("accelerate", "left"),
+          VEC_ACTIONS.index("decelerate"): ("decelerate", "left"),
+          VEC_ACTIONS.index("turn_left"): ("turn_left", "left"),
+          VEC_ACTIONS.index("turn_right"): ("turn_right", "left"),
+          VEC_ACTIONS.index("fire_left"): ("fire", "left"),
+          VEC_ACTIONS.index("fire_right"): ("fire", "right")}
+
+
+def assert_in_step(vec, games):
+    for b, game in enumerate(games):
+        assert STATE_NAMES[vec.state[b]] == game.state
+        assert vec.tick[b] == game.tick
+        n_players = len(game.player_ships)
+        for s, ship in enumerate(game.ships_by_uid):
+            present = s < n_players or ship in game.enemy_ships
+            assert vec.present[b, s] == present
+            if present:
+                expected = (ship.x, ship.y, ship.angle, ship.speed, ship.rotation_velocity, ship.health)
+                actual = (vec.x[b, s], vec.y[b, s], vec.angle[b, s], vec.speed[b, s],
+                          vec.rotation_velocity[b, s], vec.health[b, s])
+                assert actual == pytest.approx(expected, abs=1e-6), (game.tick, b, s)
+                assert vec.is_living[b, s] == ship.is_living
+
+
+@pytest.mark.parametrize("n_enemies, min_distance", [(0, 300), (3, 300), (10, 100)])
+def test_from_games_plays_like_the_games(n_enemies, min_distance):
+    games = [Game(4, n_enemies, min_distance=min_distance, seed=seed) for seed in range(8)]
+    for game in games[::2]:
+        for _ in range(50):  # batches can start mid-match
+            game.update()
+    vec = VecGame.from_games(games)
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        actions = rng.integers(0, len(VEC_ACTIONS), (len(games), 4))
+        for b, game in enumerate(games):
+            for player_id, code in enumerate(actions[b].tolist()):
+                if code in QUEUED:
+                    game.queue_action(player_id, *QUEUED[code])
+            game.update()
+        vec.step(actions)
+        assert_in_step(vec, games)
+
+
+def test_reset_respawns_from_the_batch_generator():
+    games = [Game(2, 3, seed=seed) for seed in range(4)]
+    vec = VecGame.from_games(games)
+    vec.reset(np.array([True, False, False, False]))
+    assert vec.match_rngs[0] is None and vec.match_rngs[1] is not None
+    assert (vec.state == PLAYING).all() and vec.tick[0] == 0
+    for _ in range(60):
+        vec.step()
+    assert vec.tick[1] == 60
+
+
+def test_seeded_batches_are_reproducible():
+    a, b = VecGame(16, seed=3), VecGame(16, seed=3)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        actions = rng.integers(0, len(VEC_ACTIONS), (16, 4))
+        a.step(actions)
+        b.step(actions)
+    assert np.array_equal(a.x, b.x) and np.array_equal(a.health, b.health)